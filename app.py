@@ -1,27 +1,36 @@
-from flask import Flask, jsonify, request, make_response, render_template, redirect, url_for
+from flask import Flask, jsonify, request, make_response, render_template, redirect, url_for, Response, stream_with_context, g
 from flask_cors import CORS
 import datetime
 import logging
 import os
 import time
 import requests
+from requests.adapters import HTTPAdapter
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
 import urllib.parse
 import re
 from io import BytesIO
-from reportlab.lib.pagesizes import letter
 from reportlab.lib import colors
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer, Table, TableStyle
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.lib.units import inch
+from reportlab.platypus import SimpleDocTemplate, Table, TableStyle
 from reportlab.pdfgen import canvas
 # Import the main scraping function
 import main as scraper # Renamed to avoid confusion with main module name
 from dotenv import load_dotenv
-from track_formatter import format_track_for_pdf
+import pdf_render
+import exporters
+import youtube_results
 import json
 import redis # Add redis import for caching checks
 # Import the Discogs API client
 import discogs
+from video_cache import TwoLevelCache
+from audio_resolver import AudioResolver
+from track_index import TrackIndex
+from circuit_breaker import CircuitOpenError, breaker_for_url
+from crawl_metrics import read_crawl_metrics
+import prometheus_metrics
+from progress import ProgressReporter, progress_key, read_progress
 
 # RQ imports
 from redis import from_url as redis_from_url
@@ -34,18 +43,64 @@ load_dotenv()
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
-# Simple in-memory cache for YouTube video searches
-video_id_cache = {}
 # Set a cache expiry time (24 hours in seconds)
 CACHE_EXPIRY = int(os.environ.get('CACHE_EXPIRY', 86400))
+# Maximum number of YouTube lookups kept in each worker's local cache tier
+VIDEO_CACHE_MAX_ENTRIES = int(os.environ.get('VIDEO_CACHE_MAX_ENTRIES', 2000))
 
 app = Flask(__name__)
 CORS(app)
 
+# YouTube search configuration
+YOUTUBE_SEARCH_URL = os.environ.get('YOUTUBE_SEARCH_URL', "https://www.youtube.com/results")
+YOUTUBE_REQUEST_TIMEOUT = int(os.environ.get('YOUTUBE_REQUEST_TIMEOUT', 10))
+# How many query variants to try per lookup, and how many to fetch at once (1 = sequential)
+YOUTUBE_SEARCH_MAX_VARIANTS = int(os.environ.get('YOUTUBE_SEARCH_MAX_VARIANTS', 20))
+YOUTUBE_SEARCH_PARALLELISM = int(os.environ.get('YOUTUBE_SEARCH_PARALLELISM', 4))
+# Threads shared by all concurrent searches in this worker
+YOUTUBE_SEARCH_POOL_SIZE = int(os.environ.get('YOUTUBE_SEARCH_POOL_SIZE', 16))
+# Batch lookups: tracks resolved at once across all batch requests, and max tracks per request
+YOUTUBE_BATCH_CONCURRENCY = int(os.environ.get('YOUTUBE_BATCH_CONCURRENCY', 4))
+YOUTUBE_BATCH_MAX_TRACKS = int(os.environ.get('YOUTUBE_BATCH_MAX_TRACKS', 100))
+# Background prefetch: max YouTube requests per prefetch job, and variants tried per track
+VIDEO_PREFETCH_BUDGET = int(os.environ.get('VIDEO_PREFETCH_BUDGET', 40))
+VIDEO_PREFETCH_MAX_VARIANTS = int(os.environ.get('VIDEO_PREFETCH_MAX_VARIANTS', 2))
+# Audio resolution: yt-dlp extractors per worker, seconds a request waits before 202, and
+# how long before a signed URL's expiry its cached entry is dropped
+AUDIO_RESOLVER_POOL_SIZE = int(os.environ.get('AUDIO_RESOLVER_POOL_SIZE', 4))
+AUDIO_RESOLVE_WAIT = int(os.environ.get('AUDIO_RESOLVE_WAIT', 20))
+AUDIO_URL_EXPIRY_MARGIN = int(os.environ.get('AUDIO_URL_EXPIRY_MARGIN', 300))
+# Audio streaming: bytes relayed per chunk, upstream connect/read timeout, pooled upstream connections
+AUDIO_STREAM_CHUNK_SIZE = int(os.environ.get('AUDIO_STREAM_CHUNK_SIZE', 64 * 1024))
+AUDIO_STREAM_TIMEOUT = int(os.environ.get('AUDIO_STREAM_TIMEOUT', 15))
+AUDIO_STREAM_POOL_SIZE = int(os.environ.get('AUDIO_STREAM_POOL_SIZE', 16))
+
+# Job progress push stream: max connection length (keep below the gunicorn timeout) and keepalive interval
+PROGRESS_STREAM_MAX_SECONDS = int(os.environ.get('PROGRESS_STREAM_MAX_SECONDS', 55))
+PROGRESS_STREAM_KEEPALIVE = int(os.environ.get('PROGRESS_STREAM_KEEPALIVE', 10))
+
+# Pooled keep-alive session and executor shared by all YouTube searches
+youtube_session = requests.Session()
+youtube_session.headers.update({
+    "User-Agent": os.environ.get("YOUTUBE_USER_AGENT", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
+})
+# Also on http:// so a plain-HTTP YOUTUBE_SEARCH_URL (the load-test replay server) uses the same pool
+youtube_adapter = HTTPAdapter(pool_connections=4, pool_maxsize=YOUTUBE_SEARCH_POOL_SIZE)
+youtube_session.mount("https://", youtube_adapter)
+youtube_session.mount("http://", youtube_adapter)
+youtube_search_executor = ThreadPoolExecutor(max_workers=YOUTUBE_SEARCH_POOL_SIZE, thread_name_prefix="yt-search")
+# Batch lookups run on their own pool: each lookup waits on youtube_search_executor
+video_batch_executor = ThreadPoolExecutor(max_workers=YOUTUBE_BATCH_CONCURRENCY, thread_name_prefix="yt-batch")
+# Pooled keep-alive session for relaying audio bytes from googlevideo
+audio_stream_session = requests.Session()
+audio_stream_session.headers.update({"User-Agent": youtube_session.headers["User-Agent"]})
+audio_stream_session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=AUDIO_STREAM_POOL_SIZE))
+
 # --- Redis & RQ Setup ---
 # Connect to Redis using the URL provided by Railway (or default)
 REDIS_URL = os.getenv('REDIS_URL', 'redis://localhost:6379/0')
 CACHE_TTL = int(os.getenv("CACHE_TTL", 86400)) # Cache TTL in seconds (default: 24 hours)
+DISCOGS_CACHE_MAX_ENTRIES = int(os.getenv("DISCOGS_CACHE_MAX_ENTRIES", 500)) # Discogs responses kept in each worker
 
 # +++ Added logging for the REDIS_URL +++
 logger.info(f"Read REDIS_URL from environment: '{REDIS_URL}'")
@@ -112,6 +167,72 @@ except Exception as e: # Generic catch-all
     logger.error(f"An unexpected error occurred during Cache Redis setup with URL '{REDIS_URL}': {e}", exc_info=True)
     redis_cache_client = None
 
+# Two-level cache for YouTube video searches and audio lookups: a bounded
+# per-worker LRU in front of Redis so workers share resolved lookups
+video_id_cache = TwoLevelCache(
+    redis_cache_client,
+    namespace="video_id_cache",
+    max_entries=VIDEO_CACHE_MAX_ENTRIES,
+    ttl=CACHE_EXPIRY
+)
+
+# Links tracks across MixesDB, Discogs and YouTube as lookups succeed
+track_index = TrackIndex(redis_cache_client)
+
+# Discogs responses are cached by the shared client in their own namespace
+discogs.configure_client(
+    cache=TwoLevelCache(
+        redis_cache_client,
+        namespace="discogs_cache",
+        max_entries=DISCOGS_CACHE_MAX_ENTRIES,
+        ttl=CACHE_TTL
+    ),
+    cache_ttl=CACHE_TTL
+)
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    """Time every request by route pattern (streamed responses: until the headers are sent)."""
+    started = g.pop('request_started', None)
+    if started is not None:
+        route = request.url_rule.rule if request.url_rule else "unmatched"
+        prometheus_metrics.observe_request(route, request.method, response.status_code, time.perf_counter() - started)
+    return response
+
+def upstream_unavailable_response(breaker, message):
+    """Fast 503 for a request that needs an upstream whose circuit breaker is open."""
+    response = jsonify({"error": message, "retry_after": breaker.retry_after()})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(breaker.retry_after())
+    return response
+
+def get_cached_artist_data(artist_name):
+    """Return the cached mixes for an artist from Redis or the tracklist store, or None on a miss."""
+    if redis_cache_client:
+        cache_key = f"artist_cache:{artist_name.lower().replace(' ', '_')}"
+        try:
+            cached_data = redis_cache_client.get(cache_key)
+            if cached_data:
+                prometheus_metrics.count_cache("artist_cache", "hits")
+                return json.loads(cached_data.decode('utf-8'))
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Redis error reading cache for {artist_name}: {e}")
+        except json.JSONDecodeError as e:
+            logger.error(f"Error decoding cached JSON for {artist_name}: {e}")
+    prometheus_metrics.count_cache("artist_cache", "misses")
+    stored = scraper.load_stored_tracklists(artist_name)
+    prometheus_metrics.count_cache("tracklist_store", "misses" if stored is None else "hits")
+    return stored
+
+@app.context_processor
+def template_limits():
+    """Server-side limits the page scripts have to respect."""
+    return {"video_batch_max_tracks": YOUTUBE_BATCH_MAX_TRACKS}
+
 @app.route("/")
 def index():
     """Render the home page with search form."""
@@ -127,9 +248,18 @@ def clear_cache():
     
     cache_key = f"artist_cache:{artist_name.lower().replace(' ', '_')}"
     
+    # Drop the durable copy too, otherwise the next search is served from it instead of re-scraping
+    try:
+        stored_deleted = scraper.tracklist_store.delete_artist(artist_name)
+    except Exception as e:
+        logger.error(f"Error clearing stored tracklists for {artist_name}: {str(e)}")
+        stored_deleted = False
+    # A forced re-scrape should not resume from pages checkpointed by an earlier crawl
+    scraper.clear_checkpoint(artist_name)
+
     if redis_cache_client:
         try:
-            deleted = redis_cache_client.delete(cache_key)
+            deleted = redis_cache_client.delete(cache_key) or stored_deleted
             if deleted:
                 logger.info(f"Cleared cache for artist: {artist_name}")
                 return jsonify({"status": "success", "message": f"Cache cleared for {artist_name}"})
@@ -138,6 +268,9 @@ def clear_cache():
         except redis.exceptions.RedisError as e:
             logger.error(f"Redis error clearing cache for {artist_name}: {e}")
             return jsonify({"error": "Failed to clear cache"}), 500
+    elif stored_deleted:
+        logger.info(f"Cleared stored tracklists for artist: {artist_name}")
+        return jsonify({"status": "success", "message": f"Cache cleared for {artist_name}"})
     else:
         return jsonify({"error": "Redis not available"}), 503
 
@@ -156,6 +289,7 @@ def start_search_job():
             cached_data = redis_cache_client.get(cache_key)
             if cached_data:
                 logger.info(f"Cache hit in /search for artist: {artist_name}. Returning cached data.")
+                prometheus_metrics.count_cache("artist_cache", "hits")
                 try:
                     # Decode bytes then parse JSON
                     artist_data = json.loads(cached_data.decode('utf-8'))
@@ -170,8 +304,25 @@ def start_search_job():
                         pass
             else:
                 logger.info(f"Cache miss in /search for artist: {artist_name}. Proceeding to queue job.")
+                prometheus_metrics.count_cache("artist_cache", "misses")
         except redis.exceptions.RedisError as e:
             logger.error(f"Redis error checking cache in /search for {artist_name}: {e}. Proceeding to queue job.")
+    
+    # --- Durable store: recent scrapes survive Redis eviction ---
+    stored_data = scraper.load_stored_tracklists(artist_name)
+    prometheus_metrics.count_cache("tracklist_store", "misses" if stored_data is None else "hits")
+    if stored_data is not None:
+        logger.info(f"Tracklist store hit in /search for artist: {artist_name}. Returning stored data.")
+        return jsonify({ "status": "cached", "data": stored_data })
+
+    # --- MixesDB down: serve stale stored data or fail fast rather than queue a doomed crawl ---
+    mixesdb_breaker = breaker_for_url(scraper.EXPLORER_BASE_URL)
+    if mixesdb_breaker.is_open():
+        stale_data = scraper.load_stored_tracklists(artist_name, max_age=None)
+        if stale_data is not None:
+            logger.info(f"MixesDB circuit open; returning stale stored data for {artist_name}")
+            return jsonify({ "status": "stale", "data": stale_data })
+        return upstream_unavailable_response(mixesdb_breaker, "MixesDB is temporarily unavailable. Please try again shortly.")
 
     # --- Queue Job if Cache Miss or Redis Error ---
     if q is None:
@@ -210,6 +361,10 @@ def start_search_job():
         logger.error(f"Error enqueuing job for {artist_name}: {str(e)}")
         return jsonify({"error": f"An error occurred while starting the search: {str(e)}"}), 500
 
+def job_meta(job):
+    """Job meta with the latest coalesced progress fields on top."""
+    return dict(job.meta, **read_progress(q.connection, job.id))
+
 @app.route("/job/<job_id>/status")
 def get_job_status(job_id):
     """Check the status of a background job."""
@@ -227,7 +382,7 @@ def get_job_status(job_id):
     response = {
         "job_id": job.id,
         "status": job.get_status(), # Returns 'queued', 'started', 'finished', 'failed', etc.
-        "meta": job.meta # Include all metadata
+        "meta": job_meta(job) # Include all metadata
     }
     
     if job.is_failed:
@@ -237,6 +392,47 @@ def get_job_status(job_id):
 
     return jsonify(response)
 
+@app.route("/job/<job_id>/events")
+def job_events(job_id):
+    """Push a job's progress as server-sent events instead of polling /status.
+    
+    Sends a `snapshot` event with the current status and meta, then a
+    `progress` event with the changed fields for every coalesced write, and
+    `done` once the job stops. Connections close after
+    PROGRESS_STREAM_MAX_SECONDS; clients reconnect (or fall back to /status).
+    Each open stream holds a web thread, which is why gunicorn runs gthread
+    workers (gunicorn.conf.py).
+    """
+    if q is None:
+        return jsonify({"error": "Background task queue is not available"}), 503
+    job = q.fetch_job(job_id)
+    if job is None:
+        return jsonify({"status": "not_found"}), 404
+    
+    def generate():
+        pubsub = q.connection.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(progress_key(job_id))
+        try:
+            yield f"event: snapshot\ndata: {json.dumps({'status': job.get_status(), 'meta': job_meta(job)})}\n\n"
+            stop_at = time.time() + PROGRESS_STREAM_MAX_SECONDS
+            while time.time() < stop_at:
+                message = pubsub.get_message(timeout=PROGRESS_STREAM_KEEPALIVE)
+                if message and message['type'] == 'message':
+                    yield f"event: progress\ndata: {message['data'].decode('utf-8')}\n\n"
+                    continue
+                status = job.get_status(refresh=True)
+                if status in ('finished', 'failed', 'stopped', 'canceled'):
+                    yield f"event: done\ndata: {json.dumps({'status': status})}\n\n"
+                    break
+                yield ": keepalive\n\n"
+        finally:
+            pubsub.close()
+    
+    response = Response(stream_with_context(generate()), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @app.route("/job/<job_id>/result")
 def get_job_result(job_id):
     """Fetch the result of a completed background job."""
@@ -276,7 +472,11 @@ def get_job_result(job_id):
         })
     else:
         # For non-PDF jobs, return the full result
-        return jsonify({"status": "finished", "data": job.result})
+        response = {"status": "finished", "data": job.result}
+        if job.meta.get('partial'):
+            # The crawl hit its deadline; the next search resumes it
+            response.update({"partial": True, "coverage": job.meta.get('coverage', {})})
+        return jsonify(response)
 
 # --- PDF Generation Background Job Routes ---
 @app.route("/start_pdf_job", methods=['POST'])
@@ -364,6 +564,30 @@ def background_pdf():
         logger.error(f"Error showing background PDF page for {artist_name}: {str(e)}")
         return render_template('index.html', artist_name=artist_name, error=f"An error occurred: {str(e)}", year=datetime.datetime.now().year)
 
+# --- Lightweight Export Routes ---
+@app.route("/export/<fmt>")
+def export_tracklists(fmt):
+    """Stream the cached tracklists for an artist as CSV, NDJSON, plain text or M3U."""
+    artist_name = request.args.get("artist_name", "")
+    if not artist_name:
+        return jsonify({"error": "Artist name is required"}), 400
+
+    if fmt not in exporters.EXPORT_FORMATS:
+        return jsonify({"error": f"Unsupported export format '{fmt}'", "formats": sorted(exporters.EXPORT_FORMATS)}), 400
+
+    # Exports are served from the cached artist record only, never from a scrape
+    mixes = get_cached_artist_data(artist_name)
+    if mixes is None:
+        return jsonify({"error": f"No cached tracklists for '{artist_name}'. Run a search first."}), 404
+
+    generator, mimetype, extension = exporters.EXPORT_FORMATS[fmt]
+    filename = f"tracklists_{artist_name.replace(' ', '_')}.{extension}"
+    logger.info(f"Streaming {fmt} export for {artist_name} ({len(mixes)} mixes)")
+
+    response = Response(stream_with_context(generator(artist_name, mixes)), mimetype=mimetype)
+    response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
 # --- PDF Generation Functions ---
 def generate_pdf_background(artist_name):
     """Background job function for PDF generation.
@@ -374,12 +598,10 @@ def generate_pdf_background(artist_name):
         # Access the current job to update progress
         from rq.job import get_current_job
         job = get_current_job()
+        progress = ProgressReporter(job)
         
         # Set initial progress
-        if job:
-            job.meta['progress'] = 5
-            job.meta['status'] = 'Fetching artist data...'
-            job.save_meta()
+        progress.transition(progress=5, status='Fetching artist data...')
         
         # Fetch the data
         mixes = scraper.main(artist_name)
@@ -391,21 +613,18 @@ def generate_pdf_background(artist_name):
         logger.info(f"Found {len(mixes)} total mixes for {artist_name}. Generating complete PDF with all mixes.")
         
         # Update progress after fetching data
-        if job:
-            job.meta['progress'] = 30
-            job.meta['status'] = f'Found {len(mixes)} mixes. Starting PDF generation...'
-            job.meta['total_mixes'] = len(mixes)
-            job.meta['current_mix'] = 0
-            job.save_meta()
+        progress.transition(
+            progress=30,
+            status=f'Found {len(mixes)} mixes. Starting PDF generation...',
+            total_mixes=len(mixes),
+            current_mix=0,
+        )
         
         # Generate the PDF with all mixes (removed the mix limitation)
         pdf_data = generate_pdf(artist_name, mixes, job)
         
         # Final progress update
-        if job:
-            job.meta['progress'] = 100
-            job.meta['status'] = 'PDF generation complete!'
-            job.save_meta()
+        progress.transition(progress=100, status='PDF generation complete!')
         
         # Return both the PDF data and the artist name
         return {
@@ -417,15 +636,21 @@ def generate_pdf_background(artist_name):
         
     except Exception as e:
         # Update progress on error
-        if 'job' in locals() and job:
-            job.meta['error'] = str(e)
-            job.save_meta()
+        if 'progress' in locals():
+            progress.transition(error=str(e))
         logger.error(f"Error in background PDF generation for {artist_name}: {str(e)}")
         raise
 
 # --- Keep existing PDF generation function ---
 def generate_pdf(artist_name, mixes, job=None):
     """Generate a PDF document with all tracklists for an artist."""
+    # Large catalogs can be rendered in parallel shards when enabled
+    if pdf_render.PDF_SHARD_MODE and len(mixes) >= pdf_render.PDF_SHARD_MIN_MIXES:
+        try:
+            return generate_pdf_sharded(artist_name, mixes, job)
+        except ImportError as e:
+            logger.warning(f"Sharded PDF rendering unavailable ({e}). Falling back to a single build.")
+
     buffer = BytesIO()
     
     # Use a different approach to handle large documents without losing content
@@ -452,34 +677,16 @@ def generate_pdf(artist_name, mixes, job=None):
     doc.addPageTemplates([template])
     
     # Add styles for PDF content
-    styles = getSampleStyleSheet()
-    styles.add(ParagraphStyle(name='MixTitle', parent=styles['Heading2'], spaceAfter=12))
-    styles.add(ParagraphStyle(name='TrackItem', parent=styles['Normal'], leftIndent=20, spaceAfter=3))
+    styles = pdf_render.build_pdf_styles()
     
     # Store all content in a single list that will be built once at the end
-    all_content = []
-    
-    # Create PDF title and header information
-    title = Paragraph(f"Tracklists for {artist_name}", styles['Title'])
-    all_content.append(title)
-    all_content.append(Spacer(1, 0.25 * inch))
-    
-    # Calculate stats once to avoid repeated calculations
-    mixes_with_tracklists = sum(1 for mix in mixes if mix.get("has_tracklist", False))
-    total_tracks = sum(len(mix.get("tracks", [])) for mix in mixes)
-    
-    summary = Paragraph(f"Found {total_tracks} tracks across {mixes_with_tracklists} mixes with tracklists (total of {len(mixes)} mixes)", styles['Normal'])
-    all_content.append(summary)
-    all_content.append(Spacer(1, 0.25 * inch))
-    generated = Paragraph(f"Generated on {datetime.datetime.now().strftime('%Y-%m-%d at %H:%M:%S')}", styles['Italic'])
-    all_content.append(generated)
-    all_content.append(Spacer(1, 0.5 * inch))
+    # Title, summary and generation timestamp come first
+    total_tracks, _, _ = totals = pdf_render.header_totals(mixes)
+    all_content = pdf_render.build_header_flowables(artist_name, totals, styles)
     
     # Update progress at the start of PDF generation
-    if job:
-        job.meta['progress'] = 35
-        job.meta['status'] = 'Creating PDF document structure...'
-        job.save_meta()
+    progress = ProgressReporter(job)
+    progress.transition(progress=35, status='Creating PDF document structure...')
     
     # Calculate progress increment per mix
     progress_increment = 60 / max(len(mixes), 1)  # 35% to 95%
@@ -487,35 +694,19 @@ def generate_pdf(artist_name, mixes, job=None):
     
     # Process each mix and add to all_content
     for i, mix in enumerate(mixes):
-        title_text = mix.get("title", "Untitled Mix")
-        if mix.get("date"):
-            title_text = f"{mix.get('date')} - {title_text}"
-        all_content.append(Paragraph(title_text, styles['MixTitle']))
-        
-        # Update progress and status periodically
-        if job and i % max(1, len(mixes) // 10) == 0:  # Update every ~10% of mixes
+        # The reporter coalesces these into a write every PROGRESS_FLUSH_INTERVAL_MS
+        if job:
             current_progress = min(35 + progress_increment * i, 95)
-            job.meta['progress'] = round(current_progress)
-            job.meta['status'] = f'Processing mix {i+1} of {len(mixes)}: {title_text}'
-            job.meta['current_mix'] = i + 1
-            job.save_meta()
-        
-        tracks = mix.get("tracks", [])
-        if tracks:
-            # Process all tracks for this mix
-            for j, track in enumerate(tracks):
-                track_text = f"{j + 1}. {format_track_for_pdf(track)}"
-                all_content.append(Paragraph(track_text, styles['TrackItem']))
-        else:
-            all_content.append(Paragraph("No tracklist available", styles['TrackItem']))
+            progress.update(
+                progress=round(current_progress),
+                status=f'Processing mix {i+1} of {len(mixes)}: {pdf_render.mix_title_text(mix)}',
+                current_mix=i + 1,
+            )
         
-        all_content.append(Spacer(1, 0.2 * inch))
+        all_content.extend(pdf_render.build_mix_flowables(mix, styles))
     
     # Final progress update before building the document
-    if job:
-        job.meta['progress'] = 95
-        job.meta['status'] = 'Finalizing PDF document...'
-        job.save_meta()
+    progress.transition(progress=95, status='Finalizing PDF document...')
     
     try:
         # Build the document once with all content
@@ -530,18 +721,41 @@ def generate_pdf(artist_name, mixes, job=None):
     buffer.close()
     return pdf_data
 
+def generate_pdf_sharded(artist_name, mixes, job=None):
+    """Generate the PDF by rendering chunks of mixes in a process pool and merging them."""
+    progress = ProgressReporter(job)
+    progress.transition(progress=35, status='Rendering PDF shards in parallel...', pdf_shards=[])
+    shards_done = []
+
+    def on_shard_done(done, total, timing):
+        # Shards finish out of order, so progress tracks the completed count
+        shards_done.append(timing)
+        progress.update(
+            progress=round(35 + 55 * done / total),
+            status=f'Rendered PDF shard {done} of {total}',
+            pdf_shards=list(shards_done),
+        )
+
+    start_time = time.time()
+    pdf_data, shard_timings = pdf_render.render_pdf_sharded(artist_name, mixes, on_shard_done=on_shard_done)
+    elapsed = time.time() - start_time
+
+    total_pages = sum(t["pages"] for t in shard_timings)
+    logger.info(f"Successfully built sharded PDF with {total_pages} pages across {len(mixes)} mixes in {elapsed:.2f} seconds")
+
+    progress.transition(
+        progress=95,
+        status='Finalizing PDF document...',
+        pdf_shards=shard_timings,
+        pdf_render_time=round(elapsed, 3),
+    )
+
+    return pdf_data
+
 # Function to add page numbers to PDF pages
 def add_page_number(canvas, doc):
     """Add page number to each page of the PDF"""
-    canvas.saveState()
-    canvas.setFont("Helvetica", 8)
-    page_num = canvas.getPageNumber()
-    canvas.drawRightString(
-        letter[0] - 24, 
-        24, 
-        f"Page {page_num} of {doc.page}"
-    )
-    canvas.restoreState()
+    pdf_render.draw_page_number(canvas, canvas.getPageNumber(), doc.page)
 
 # Original /search route is removed as it's replaced by the job submission logic.
 # Original /api/list might still be useful if you want synchronous access,
@@ -620,6 +834,120 @@ def direct_pdf_download():
     logger.info(f"Redirecting direct PDF download for {artist_name} to background processing")
     return redirect(url_for('background_pdf', artist_name=artist_name))
 
+class SearchAttempts:
+    """Counts the YouTube requests one search actually sends.
+    
+    Variants claim a request before sending it; once stop() is called
+    (another variant won) claims fail, so queued look-ahead variants are
+    skipped and never counted.
+    """
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stopped = False
+        self.count = 0
+    
+    def claim(self):
+        """Count a request about to be sent; False if the search has stopped."""
+        with self._lock:
+            if self._stopped:
+                return False
+            self.count += 1
+            return True
+    
+    def release(self):
+        """Uncount a claimed request that was not sent after all."""
+        with self._lock:
+            self.count -= 1
+    
+    def stop(self):
+        """Refuse further claims. Returns the number of requests sent; safe to call again."""
+        with self._lock:
+            self._stopped = True
+            return self.count
+
+def fetch_youtube_results(search_query, attempts=None):
+    """Fetch one YouTube results page and parse it into video candidates.
+    
+    Skips the request entirely if attempts (a SearchAttempts) has stopped
+    because another variant won, or while YouTube's breaker is open.
+    """
+    if attempts is not None and not attempts.claim():
+        return []
+    
+    breaker = breaker_for_url(YOUTUBE_SEARCH_URL)
+    if not breaker.allow():
+        if attempts is not None:
+            attempts.release()
+        return []
+    
+    encoded_query = urllib.parse.quote(search_query)
+    request_start = time.perf_counter()
+    try:
+        response = youtube_session.get(
+            f"{YOUTUBE_SEARCH_URL}?search_query={encoded_query}",
+            timeout=YOUTUBE_REQUEST_TIMEOUT
+        )
+    except requests.exceptions.RequestException as e:
+        logger.warning(f"YouTube search request failed for '{search_query}': {e}")
+        prometheus_metrics.observe_upstream("youtube", "timeout" if isinstance(e, requests.exceptions.Timeout) else "connection")
+        breaker.record_failure()
+        return []
+    prometheus_metrics.observe_upstream("youtube", response.status_code, time.perf_counter() - request_start)
+    
+    # 429 is YouTube throttling us, which the breaker should back off from too
+    if response.status_code >= 500 or response.status_code == 429:
+        breaker.record_failure()
+    else:
+        breaker.record_success()
+    if response.status_code != 200:
+        return []
+    
+    candidates = youtube_results.parse_results_page(response.text)
+    logger.info(f"Found {len(candidates)} video candidates for '{search_query}'")
+    return candidates
+
+def run_search_queries(search_queries, max_variants=None, parallelism=None):
+    """Try search query variants in priority order and return the first that finds videos.
+    
+    With YOUTUBE_SEARCH_PARALLELISM > 1 a sliding window of variants is
+    fetched concurrently, but results are still accepted in priority order
+    so the outcome matches the sequential search. Once a variant wins, the
+    remaining ones are cancelled.
+    Returns (candidates, used_query, attempts) where attempts is the number
+    of YouTube requests actually sent; look-ahead variants skipped after a
+    win (or while the breaker is open) are not counted.
+    """
+    queries = search_queries[:max_variants or YOUTUBE_SEARCH_MAX_VARIANTS]
+    parallelism = parallelism or YOUTUBE_SEARCH_PARALLELISM
+    attempts = SearchAttempts()
+    
+    if parallelism <= 1:
+        for search_query in queries:
+            candidates = fetch_youtube_results(search_query, attempts)
+            if candidates:
+                return candidates, search_query, attempts.stop()
+        return [], None, attempts.stop()
+    
+    futures = {}
+    try:
+        for index, search_query in enumerate(queries):
+            # Keep up to `parallelism` variants in flight ahead of the one we wait on
+            for ahead in range(index, min(index + parallelism, len(queries))):
+                if ahead not in futures:
+                    futures[ahead] = youtube_search_executor.submit(fetch_youtube_results, queries[ahead], attempts)
+            
+            candidates = futures[index].result()
+            if candidates:
+                logger.info(f"Search variant {index + 1}/{len(queries)} returned results: {search_query}")
+                return candidates, search_query, attempts.stop()
+        return [], None, attempts.stop()
+    finally:
+        # Stop queued variants from starting; in-flight ones finish and are discarded
+        attempts.stop()
+        for future in futures.values():
+            future.cancel()
+
 @app.route("/search_video")
 def search_video():
     """Search for a YouTube video and return the video ID."""
@@ -629,16 +957,46 @@ def search_video():
     if not query:
         return jsonify({"error": "Search query is required"}), 400
     
-    # Check cache first
-    cache_key = query.lower() + ":" + source
-    current_time = time.time()
+    # The raw tracklist entry, when sent, is a second cache key shared with prefetch and batch lookups
+    track = request.args.get("track")
     
-    if cache_key in video_id_cache:
-        cached_item = video_id_cache[cache_key]
-        # If the cache hasn't expired
-        if current_time - cached_item["timestamp"] < CACHE_EXPIRY:
+    payload, status_code = resolve_video(query, source, track=track)
+    return jsonify(payload), status_code
+
+def video_cache_key(query, source):
+    """Cache key shared by the single and batch video lookups."""
+    return query.lower() + ":" + source
+
+def resolve_video(query, source="djset", track=None, max_variants=None, parallelism=None):
+    """Resolve a track query to a YouTube video ID.
+    
+    Runs outside the request context so batch lookups and background jobs
+    can call it. track is the raw tracklist entry the query came from; the
+    result is cached under both. max_variants and parallelism override the
+    YouTube search settings for this call. Returns (payload, status_code).
+    """
+    # Check cache first
+    cache_keys = [video_cache_key(query, source)]
+    if track and track != query:
+        cache_keys.append(video_cache_key(track, source))
+    for cache_key in cache_keys:
+        cached_item = video_id_cache.get(cache_key)
+        if cached_item:
             logger.info(f"Cache hit for query: {query} (source: {source})")
-            return jsonify({"videoId": cached_item["video_id"]})
+            return {"videoId": cached_item["video_id"]}, 200
+    
+    # The index matches on normalised track text, so punctuation and
+    # bracketed label differences between sources still hit
+    indexed_video_id = track_index.lookup_video(track or query, source)
+    if indexed_video_id:
+        logger.info(f"Track index hit for query: {query}")
+        for cache_key in cache_keys:
+            video_id_cache.set(cache_key, {"video_id": indexed_video_id})
+        return {"videoId": indexed_video_id, "indexed": True}, 200
+    
+    youtube_breaker = breaker_for_url(YOUTUBE_SEARCH_URL)
+    if youtube_breaker.is_open():
+        return {"error": "YouTube is temporarily unavailable", "retry_after": youtube_breaker.retry_after()}, 503
     
     try:
         logger.info(f"Searching YouTube for: {query} (source: {source})")
@@ -885,333 +1243,276 @@ def search_video():
         
         logger.info(f"Search queries to try: {search_queries}")
         
-        # Try each search query in order until we get good results
-        video_ids = []
-        used_query = None
-        search_url = None
-        
-        for search_query in search_queries:
-            encoded_query = urllib.parse.quote(search_query)
-            
-            # Make request to YouTube search
-            headers = {
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
-            }
-            response = requests.get(
-                f"https://www.youtube.com/results?search_query={encoded_query}",
-                headers=headers
-            )
-            
-            if response.status_code == 200:
-                # Extract video IDs using multiple pattern matching approaches
-                video_ids = []
-                patterns = [
-                    '"videoId":"', 
-                    'watch?v=',
-                    '/embed/',
-                    '/v/'
-                ]
-                
-                for pattern in patterns:
-                    start_idx = response.text.find(pattern)
-                    if start_idx != -1:
-                        start_idx += len(pattern)
-                        
-                        # Determine end of video ID based on which pattern was found
-                        if pattern == '"videoId":"':
-                            end_idx = response.text.find('"', start_idx)
-                        else:
-                            # For URL patterns, look for ending delimiters
-                            end_idx = next((response.text.find(c, start_idx) for c in ['"', '&', '#', '?', ' '] 
-                                          if response.text.find(c, start_idx) != -1), len(response.text))
-                        
-                        if end_idx != -1:
-                            found_id = response.text[start_idx:end_idx]
-                            # Basic validation - YouTube IDs are usually 11 characters
-                            if len(found_id) == 11:
-                                video_ids.append(found_id)
-                                logger.info(f"Found video ID using pattern '{pattern}': {found_id}")
-                
-                # If no IDs found with patterns, try regex as a fallback
-                if not video_ids:
-                    regex_matches = re.findall(r'watch\?v=([a-zA-Z0-9_-]{11})', response.text)
-                    if regex_matches:
-                        video_ids = regex_matches
-                        logger.info(f"Found {len(video_ids)} video IDs using regex fallback")
-                
-                # If we found any video IDs with our robust extraction
-                if video_ids:
-                    used_query = search_query
-                    search_url = f"https://www.youtube.com/results?search_query={encoded_query}"
-                    break
+        # Try the query variants (concurrently when enabled) until one returns results
+        candidates, used_query, attempts = run_search_queries(search_queries, max_variants, parallelism)
+        search_url = f"{YOUTUBE_SEARCH_URL}?search_query={urllib.parse.quote(used_query)}" if used_query else None
         
         # If no results found with any query, return an error
-        if not video_ids:
-            return jsonify({"error": "No videos found for any search query"}), 404
-        
-        # Get unique video IDs - remove duplicates
-        unique_video_ids = list(dict.fromkeys(video_ids))
-        
-        # Filter out YouTube Mix/Playlist results to avoid long DJ mixes
-        filtered_ids = [vid for vid in unique_video_ids if "list=" not in response.text.split(vid)[1].split("<")[0]]
-        
-        # If no filtered IDs, use the unique IDs
-        if not filtered_ids:
-            filtered_ids = unique_video_ids
-        
-        # Look for exact matches in surrounding text with much larger context window
-        best_match_id = None
-        match_score = 0
+        if not candidates:
+            return {"error": "No videos found for any search query", "attempts": attempts}, 404
         
+        # Candidates are unique and already exclude playlists and radio mixes
         # Only perform advanced matching if we have both artist and title
-        if artist and title and len(filtered_ids) > 1:
-            # Check more results for precise matching
-            for vid_index, vid in enumerate(filtered_ids[:15]):  # Check top 15 results for thoroughness
-                # Find where this video ID appears in the response
-                vid_pos = response.text.find(vid)
-                if vid_pos > 0:
-                    # Get a much larger chunk of text around the ID for better context matching
-                    surrounding_text = response.text[max(0, vid_pos-400):min(len(response.text), vid_pos+400)].lower()
-                    
-                    # Calculate a match score for this result
-                    score = 0
-                    
-                    # Check for exact artist match
-                    if artist.lower() in surrounding_text:
-                        score += 20
-                        # Bonus for exact match with word boundaries
-                        if re.search(r'\b' + re.escape(artist.lower()) + r'\b', surrounding_text):
-                            score += 10
-                    
-                    # Check for exact title match
-                    if title.lower() in surrounding_text:
-                        score += 20
-                        # Bonus for exact match with word boundaries
-                        if re.search(r'\b' + re.escape(title.lower()) + r'\b', surrounding_text):
-                            score += 10
-                    
-                    # Enhanced checks for electronic music and discogs releases
-                    if catalog_num and catalog_num.lower() in surrounding_text:
-                        score += 25  # Catalog numbers are highly specific identifiers
-                    
-                    # Check for label information
-                    if label_info and label_info.lower() in surrounding_text:
-                        score += 15
-                    
-                    # For Discogs sources, give more weight to catalog number and label matches
-                    if source == "discogs":
-                        if catalog_num and catalog_num.lower() in surrounding_text:
-                            score += 15  # Extra boost for catalog match in discogs searches
-                        
-                        # Check for release year
-                        if release_year and release_year in surrounding_text:
-                            score += 10
-                            
-                        # Additional content indicators for Discogs searches
-                        good_indicators = ['official', 'full track', 'release', 'records', 'vinyl', 'album', 'single', 'EP', '12 inch', 'original mix']
-                        bad_indicators = ['mix compilation', 'megamix', 'mixtape', 'playlist', 'dj mix', 'full album', 'preview', 'live set', 'radio show']
-                        
-                        # Bonus for good indicators
-                        for indicator in good_indicators:
-                            if indicator in surrounding_text:
-                                score += 5
-                                
-                        # Penalty for bad indicators
-                        for indicator in bad_indicators:
-                            if indicator in surrounding_text:
-                                score -= 15
-                                
-                        # Special handling for electronic music labels and formats
-                        electronic_indicators = ['techno', 'house', 'minimal', 'electronic', 'underground', 'vinyl', '12"']
-                        for indicator in electronic_indicators:
-                            if indicator in surrounding_text and (label_info and indicator in label_info.lower()):
-                                score += 8  # Boost for matching electronic music context
-                                
-                        # Boost for exact catalog number patterns commonly used in electronic music
-                        if catalog_num:
-                            # Check for catalog patterns like "ABC001", "XYZ-123", etc.
-                            catalog_pattern = re.compile(r'\b' + re.escape(catalog_num) + r'\b', re.IGNORECASE)
-                            if catalog_pattern.search(surrounding_text):
-                                score += 20  # Strong boost for exact catalog match
-                                
-                        # Check for track duration indicators (full tracks vs previews/clips)
-                        duration_indicators = ['full track', 'complete', 'uncut', 'original length']
-                        preview_indicators = ['preview', 'snippet', 'clip', '30 second', 'sample']
-                        
-                        for indicator in duration_indicators:
-                            if indicator in surrounding_text:
-                                score += 8
-                                
-                        for indicator in preview_indicators:
-                            if indicator in surrounding_text:
-                                score -= 12  # Penalize previews/clips
-                                
-                        # Boost for official channel uploads
-                        official_channel_indicators = ['official', 'records', 'music', 'label']
-                        for indicator in official_channel_indicators:
-                            if indicator in surrounding_text:
-                                score += 6
-                    else:
-                        # Regular DJ set logic (existing code)
-                        # Check for release year
-                        if release_year and release_year in surrounding_text:
-                            score += 10
-                            
-                        # Additional content indicators for Discogs searches
-                        good_indicators = ['official', 'full track', 'release', 'records', 'vinyl', 'album']
-                        bad_indicators = ['mix compilation', 'megamix', 'mixtape', 'playlist', 'dj mix', 'full album', 'preview']
-                        
-                        # Bonus for good indicators
-                        for indicator in good_indicators:
-                            if indicator in surrounding_text:
-                                score += 5
-                                
-                        # Penalty for bad indicators
-                        for indicator in bad_indicators:
-                            if indicator in surrounding_text:
-                                score -= 15
-                    
-                    # Higher score for results that are closer to the top
-                    score += max(0, 10 - vid_index)
-                    
-                    # Penalize videos with common issues
-                    if "playlist" in surrounding_text or "mix compilation" in surrounding_text:
-                        score -= 10
-                    
-                    # Update if this is the best match so far
-                    if score > match_score:
-                        match_score = score
-                        best_match_id = vid
-                        logger.info(f"Found better match: video ID {vid} with score {score}")
-            
-            # Only use the best match if it has a minimum score
-            # For Discogs, require a higher score threshold since we need more precision
-            min_score = 40 if source == "discogs" else 30
-            
-            if best_match_id and match_score >= min_score:
-                video_id = best_match_id
-                logger.info(f"Using best match: video ID {best_match_id} with score {match_score}")
-            else:
-                # Default to the first filtered ID
-                video_id = filtered_ids[0]
-                logger.info(f"No good exact match found, using first result: {video_id}")
+        if artist and title and len(candidates) > 1:
+            video_id = youtube_results.pick_best_candidate(
+                candidates, artist, title,
+                catalog_num=catalog_num,
+                label_info=label_info,
+                release_year=release_year,
+                source=source
+            )
         else:
             # For queries without artist/title separation, use the first result
-            video_id = filtered_ids[0]
+            video_id = candidates[0]["id"]
         
         # Save to cache
-        video_id_cache[cache_key] = {
-            "video_id": video_id,
-            "timestamp": current_time
-        }
+        for cache_key in cache_keys:
+            video_id_cache.set(cache_key, {"video_id": video_id})
+        track_index.link_video(track or query, video_id, source)
         
         # Return the video ID and search URL
-        return jsonify({
+        return {
             "videoId": video_id,
             "query": used_query or enhanced_query,
-            "searchUrl": search_url or f"https://www.youtube.com/results?search_query={urllib.parse.quote(enhanced_query)}"
-        })
+            "searchUrl": search_url or f"{YOUTUBE_SEARCH_URL}?search_query={urllib.parse.quote(enhanced_query)}",
+            "attempts": attempts
+        }, 200
     
     except Exception as e:
         logger.error(f"Error searching YouTube: {str(e)}")
-        return jsonify({"error": f"An error occurred while searching YouTube: {str(e)}"}), 500
+        return {"error": f"An error occurred while searching YouTube: {str(e)}"}, 500
+
+@app.route("/search_videos", methods=['POST'])
+def search_videos():
+    """Resolve a whole list of tracks to YouTube video IDs in one round trip.
+    
+    Expects JSON {"tracks": [...], "source": "djset"}. Each track is either
+    a query string or {"query": ..., "track": ...}, the same pair a single
+    /search_video lookup sends, so both paths share cache keys. Streams one
+    NDJSON line per track as it resolves: cache hits first, then scraped
+    results in completion order. Duplicate queries are resolved once.
+    """
+    body = request.get_json(silent=True) or {}
+    tracks = body.get("tracks")
+    source = body.get("source", "djset")
+    
+    if not isinstance(tracks, list) or not tracks:
+        return jsonify({"error": "A non-empty list of tracks is required"}), 400
+    if len(tracks) > YOUTUBE_BATCH_MAX_TRACKS:
+        return jsonify({"error": f"At most {YOUTUBE_BATCH_MAX_TRACKS} tracks can be resolved per request"}), 400
+    
+    def query_and_track(entry):
+        if isinstance(entry, dict):
+            query, track = entry.get("query"), entry.get("track")
+        else:
+            query, track = entry, None
+        if not isinstance(query, str) or not query.strip():
+            return None, None
+        return query, track if isinstance(track, str) and track.strip() else None
+    
+    # Group positions by cache key so repeated tracks share one lookup
+    pending = {}
+    for index, entry in enumerate(tracks):
+        query, track = query_and_track(entry)
+        if query:
+            pending.setdefault(video_cache_key(query, source), []).append(index)
+    
+    logger.info(f"Batch video lookup for {len(tracks)} tracks ({len(pending)} unique, source: {source})")
+    
+    def generate():
+        # Answer invalid entries and cache hits immediately
+        for index, entry in enumerate(tracks):
+            if query_and_track(entry)[0] is None:
+                yield json.dumps({"index": index, "track": entry, "error": "Search query is required"}) + "\n"
+        
+        misses = {}
+        for cache_key, indices in pending.items():
+            query, track = query_and_track(tracks[indices[0]])
+            # Same keys resolve_video checks: the query, then the raw tracklist entry
+            cached_item = video_id_cache.get(cache_key)
+            if not cached_item and track and track != query:
+                cached_item = video_id_cache.get(video_cache_key(track, source))
+            if cached_item:
+                for index in indices:
+                    yield json.dumps({"index": index, "track": tracks[index], "videoId": cached_item["video_id"], "cached": True}) + "\n"
+            else:
+                misses[video_batch_executor.submit(resolve_video, query, source, track=track)] = indices
+        
+        # Scrape the rest with bounded concurrency, streaming each as it lands
+        for future in as_completed(misses):
+            indices = misses[future]
+            try:
+                payload, _ = future.result()
+            except Exception as e:
+                payload = {"error": str(e)}
+            for index in indices:
+                line = dict(payload, index=index, track=tracks[index])
+                line["cached"] = False
+                yield json.dumps(line) + "\n"
+    
+    return Response(stream_with_context(generate()), mimetype="application/x-ndjson")
+
+# --- Background Video Prefetch ---
+def prefetch_video_ids(tracks, budget=VIDEO_PREFETCH_BUDGET):
+    """Background job: warm the shared video cache for a list of tracklist entries.
+    
+    Enqueued on the low-priority queue after a scrape finishes. Stops once
+    `budget` YouTube requests have been spent. Lookups are sequential and
+    try at most VIDEO_PREFETCH_MAX_VARIANTS variants per track to stay polite.
+    """
+    from rq.job import get_current_job
+    progress = ProgressReporter(get_current_job())
+    
+    stats = {"resolved": 0, "cached": 0, "not_found": 0, "requests_used": 0, "skipped": 0}
+    for i, track in enumerate(tracks):
+        remaining = budget - stats["requests_used"]
+        if remaining <= 0:
+            stats["skipped"] = len(tracks) - i
+            logger.info(f"Video prefetch budget of {budget} requests spent, skipping {stats['skipped']} tracks")
+            break
+        
+        payload, status_code = resolve_video(
+            track, "djset", track=track,
+            max_variants=min(VIDEO_PREFETCH_MAX_VARIANTS, remaining),
+            parallelism=1
+        )
+        attempts = payload.get("attempts", 0)
+        stats["requests_used"] += attempts
+        if status_code == 200 and attempts == 0:
+            stats["cached"] += 1
+        elif status_code == 200:
+            stats["resolved"] += 1
+        else:
+            stats["not_found"] += 1
+        
+        progress.update(progress=round(100 * (i + 1) / len(tracks)), **stats)
+    
+    progress.transition(progress=100, **stats)
+    logger.info(f"Video prefetch finished for {len(tracks)} tracks: {stats}")
+    return stats
 
 # --- YouTube Audio Proxy Endpoint ---
+# Long-lived yt-dlp extractors shared by all requests in this worker
+audio_resolver = AudioResolver(
+    cache=video_id_cache,
+    pool_size=AUDIO_RESOLVER_POOL_SIZE,
+    expiry_margin=AUDIO_URL_EXPIRY_MARGIN,
+    max_ttl=CACHE_EXPIRY
+)
+
 @app.route("/audio_proxy")
 def audio_proxy():
-    """Proxies audio from YouTube videos that can't be embedded."""
+    """Proxies audio from YouTube videos that can't be embedded.
+    
+    Extraction runs on the audio resolver's pool. If it does not finish
+    within AUDIO_RESOLVE_WAIT seconds the request returns 202 and the
+    client polls again; the pending extraction is shared, not restarted.
+    """
     video_id = request.args.get("video_id")
     if not video_id:
         return jsonify({"error": "Video ID is required"}), 400
     
     # Check cache first
-    cache_key = f"audio_proxy_{video_id}"
-    current_time = time.time()
-    
-    if cache_key in video_id_cache:
-        cached_item = video_id_cache[cache_key]
-        # If the cache hasn't expired
-        if current_time - cached_item["timestamp"] < CACHE_EXPIRY:
-            logger.info(f"Cache hit for audio proxy: {video_id}")
-            return jsonify(cached_item["data"])
+    cached_data = audio_resolver.get_cached(video_id)
+    if cached_data:
+        logger.info(f"Cache hit for audio proxy: {video_id}")
+        return jsonify(dict(cached_data, stream_url=url_for("audio_stream", video_id=video_id)))
     
+    future = audio_resolver.submit(video_id)
     try:
-        # Use yt-dlp to extract YouTube video information
-        import yt_dlp as youtube_dl
-        
-        # Configure yt-dlp options
-        ydl_opts = {
-            'format': 'bestaudio/best',
-            'noplaylist': True,
-            'quiet': True,
-            'no_warnings': True,
-            'extract_flat': False,
-            'skip_download': True,
-            # Add additional options to improve extraction reliability
-            'socket_timeout': 15,
-            'retries': 3,
-            'ignoreerrors': True,
-            'geo_bypass': True,
-            'nocheckcertificate': True,
-        }
-        
-        with youtube_dl.YoutubeDL(ydl_opts) as ydl:
-            # Extract information without downloading
-            info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
-            
-            if not info:
-                return jsonify({"error": "Could not extract video information"}), 404
-            
-            # Get the best audio format URL
-            formats = info.get('formats', [])
-            
-            # First try to find audio-only formats (more efficient)
-            audio_formats = [f for f in formats if f.get('acodec') != 'none' and f.get('vcodec') == 'none']
-            
-            # Prepare response data
-            result_data = {
-                "success": True,
-                "title": info.get('title', ''),
-                "duration": info.get('duration', 0),
-                "uploader": info.get('uploader', '')
-            }
-            
-            if audio_formats:
-                # Sort by quality (typically bitrate)
-                audio_formats.sort(key=lambda x: x.get('abr', 0), reverse=True)
-                best_audio = audio_formats[0]
-                audio_url = best_audio['url']
-                
-                # Add format info to response
-                result_data.update({
-                    "audio_url": audio_url,
-                    "format": best_audio.get('format_note', 'unknown'),
-                    "bitrate": best_audio.get('abr', 0)
-                })
-            else:
-                # Fall back to any format with audio if no audio-only formats
-                for format in formats:
-                    if format.get('acodec') != 'none':
-                        result_data.update({
-                            "audio_url": format['url'],
-                            "format": format.get('format_note', 'unknown'),
-                            "is_video": True
-                        })
-                        break
-                else:
-                    return jsonify({"error": "No suitable audio format found"}), 404
-            
-            # Cache the result
-            video_id_cache[cache_key] = {
-                "data": result_data,
-                "timestamp": current_time
-            }
-            
-            return jsonify(result_data)
-                
+        result_data, status_code = future.result(timeout=AUDIO_RESOLVE_WAIT)
+    except FuturesTimeoutError:
+        logger.info(f"Audio extraction for {video_id} still running, asking client to retry")
+        return jsonify({"pending": True, "video_id": video_id, "retry_after": 2}), 202
     except Exception as e:
         logger.error(f"Error proxying YouTube audio: {str(e)}")
         return jsonify({"error": f"Failed to extract audio: {str(e)}"}), 500
+    
+    if status_code == 200:
+        result_data = dict(result_data, stream_url=url_for("audio_stream", video_id=video_id))
+    return jsonify(result_data), status_code
+
+# Upstream headers relayed to the client by /audio_stream
+AUDIO_STREAM_HEADERS = ("Content-Type", "Content-Length", "Content-Range", "Accept-Ranges", "Last-Modified", "ETag")
+VIDEO_ID_RE = re.compile(r'^[a-zA-Z0-9_-]{11}$')
+
+def open_audio_upstream(video_id, range_header=None):
+    """Open a streaming upstream response for a video's audio.
+    
+    Signed URLs can expire or be bound to another IP, so a 403/410 drops
+    the cached URL and resolves a fresh one once. Returns
+    (upstream_response, None) or (None, (error_payload, status_code)).
+    """
+    for attempt in range(2):
+        payload = audio_resolver.get_cached(video_id)
+        if not payload:
+            try:
+                payload, status_code = audio_resolver.submit(video_id).result(timeout=AUDIO_RESOLVE_WAIT)
+            except FuturesTimeoutError:
+                return None, ({"pending": True, "video_id": video_id, "retry_after": 2}, 503)
+            if status_code != 200:
+                return None, (payload, status_code)
+        
+        headers = {"Range": range_header} if range_header else {}
+        try:
+            upstream = audio_stream_session.get(payload["audio_url"], headers=headers, stream=True, timeout=AUDIO_STREAM_TIMEOUT)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Error opening audio stream for {video_id}: {str(e)}")
+            return None, ({"error": "Could not reach audio host"}, 502)
+        
+        if upstream.status_code in (403, 410) and attempt == 0:
+            logger.info(f"Audio URL for {video_id} rejected with {upstream.status_code}, re-resolving")
+            upstream.close()
+            audio_resolver.invalidate(video_id)
+            continue
+        return upstream, None
+    
+    return None, ({"error": "Audio host rejected the stream"}, 502)
+
+@app.route("/audio_stream/<video_id>")
+def audio_stream(video_id):
+    """Relay a video's audio bytes through this server, honouring HTTP Range.
+    
+    Bytes are passed through in fixed-size chunks over a pooled upstream
+    connection, so memory per stream stays constant and a seek only fetches
+    the requested range.
+    """
+    if not VIDEO_ID_RE.match(video_id):
+        return jsonify({"error": "Invalid video ID"}), 400
+    
+    upstream, error = open_audio_upstream(video_id, request.headers.get("Range"))
+    if error:
+        payload, status_code = error
+        response = jsonify(payload)
+        if status_code == 503:
+            response.headers["Retry-After"] = str(payload["retry_after"])
+        return response, status_code
+    
+    if upstream.status_code not in (200, 206, 416):
+        logger.error(f"Audio host returned {upstream.status_code} for {video_id}")
+        upstream.close()
+        return jsonify({"error": f"Audio host returned {upstream.status_code}"}), 502
+    
+    def generate():
+        try:
+            for chunk in upstream.iter_content(chunk_size=AUDIO_STREAM_CHUNK_SIZE):
+                if chunk:
+                    yield chunk
+        finally:
+            # Hand the connection back to the pool even if the client disconnects
+            upstream.close()
+    
+    headers = {name: upstream.headers[name] for name in AUDIO_STREAM_HEADERS if name in upstream.headers}
+    headers.setdefault("Accept-Ranges", "bytes")
+    headers["Cache-Control"] = "no-store"
+    return Response(stream_with_context(generate()), status=upstream.status_code, headers=headers, direct_passthrough=True)
+
+@app.route("/video_cache/stats")
+def video_cache_stats():
+    """Report hit/miss/eviction counters for this worker's YouTube lookup cache."""
+    stats = video_id_cache.stats()
+    stats["audio_resolver"] = audio_resolver.stats()
+    return jsonify(stats)
 
 # --- Discogs API Routes ---
 @app.route("/discogs/search_label")
@@ -1224,34 +1525,11 @@ def search_label():
         return jsonify({"error": "Label name is required"}), 400
     
     try:
-        # Cache key for label search
-        cache_key = f"discogs_label_search:{label_name.lower().replace(' ', '_')}:{page}"
-        
-        # Check cache first if Redis is available
-        if redis_cache_client:
-            try:
-                cached_data = redis_cache_client.get(cache_key)
-                if cached_data:
-                    logger.info(f"Cache hit for Discogs label search: {label_name}, page {page}")
-                    return jsonify(json.loads(cached_data.decode('utf-8')))
-            except Exception as e:
-                logger.error(f"Redis error in label search: {str(e)}")
-        
-        # Cache miss or Redis not available, perform the search
+        # Responses are cached by the Discogs client
         data = discogs.search_labels(label_name, page=page)
-        
-        # Cache the results if Redis is available
-        if redis_cache_client:
-            try:
-                redis_cache_client.setex(
-                    cache_key,
-                    CACHE_TTL,
-                    json.dumps(data).encode('utf-8')
-                )
-            except Exception as e:
-                logger.error(f"Redis error caching label search: {str(e)}")
-        
         return jsonify(data)
+    except CircuitOpenError:
+        return upstream_unavailable_response(breaker_for_url(discogs.DISCOGS_API_URL), "Discogs is temporarily unavailable. Please try again shortly.")
     except Exception as e:
         logger.error(f"Error in Discogs label search: {str(e)}")
         return jsonify({"error": f"Failed to search Discogs: {str(e)}"}), 500
@@ -1265,20 +1543,6 @@ def label_releases(label_id):
     sort_order = request.args.get('sort_order', 'desc')
     
     try:
-        # Cache key for label releases
-        cache_key = f"discogs_label_releases:{label_id}:{page}:{per_page}:{sort}:{sort_order}"
-        
-        # Check cache first if Redis is available
-        if redis_cache_client:
-            try:
-                cached_data = redis_cache_client.get(cache_key)
-                if cached_data:
-                    logger.info(f"Cache hit for Discogs label releases: {label_id}, page {page}")
-                    return jsonify(json.loads(cached_data.decode('utf-8')))
-            except Exception as e:
-                logger.error(f"Redis error in label releases: {str(e)}")
-        
-        # Cache miss or Redis not available, fetch the releases
         data = discogs.get_label_releases(
             label_id, 
             page=page, 
@@ -1286,59 +1550,189 @@ def label_releases(label_id):
             sort=sort,
             sort_order=sort_order
         )
-        
-        # Cache the results if Redis is available
-        if redis_cache_client:
-            try:
-                redis_cache_client.setex(
-                    cache_key,
-                    CACHE_TTL,
-                    json.dumps(data).encode('utf-8')
-                )
-            except Exception as e:
-                logger.error(f"Redis error caching label releases: {str(e)}")
-        
         return jsonify(data)
+    except CircuitOpenError:
+        return upstream_unavailable_response(breaker_for_url(discogs.DISCOGS_API_URL), "Discogs is temporarily unavailable. Please try again shortly.")
     except Exception as e:
         logger.error(f"Error in Discogs label releases: {str(e)}")
         return jsonify({"error": f"Failed to get Discogs releases: {str(e)}"}), 500
 
-@app.route("/discogs/release/<int:release_id>")
-def release_details(release_id):
-    """Get detailed information about a specific release"""
+def build_label_catalog(label_id, refresh=False):
+    """Background job: fetch or top up a label's full catalog in the Discogs cache."""
+    from rq.job import get_current_job
+    progress = ProgressReporter(get_current_job())
+    
+    def on_progress(pages_done, pages_total):
+        progress.update(
+            progress=round(100 * pages_done / max(pages_total, 1)),
+            status=f"Fetched {pages_done} of {pages_total} pages",
+        )
+    
+    catalog, added = discogs.get_label_catalog(label_id, refresh=refresh, on_progress=on_progress)
+    progress.transition(progress=100, status=f"Fetched {catalog['pages']} pages")
+    track_index.index_catalog(catalog)
+    # The catalog itself lives in the Discogs cache; keep the job result small
+    return {"label_id": label_id, "items": len(catalog["releases"]), "pages": catalog["pages"], "added": added}
+
+@app.route("/discogs/label/<int:label_id>/catalog")
+def label_catalog(label_id):
+    """Get a label's full catalog as one merged, sorted record.
+    
+    Served from cache when available. Otherwise (or with ?refresh=1, which
+    tops up the cached record) the fetch runs as a background job and this
+    returns 202 with its job_id; poll /job/<job_id>/status, then request
+    the catalog again. A refresh asked for while a plain fetch is pending
+    gets its own job, which runs once that fetch is done.
+    """
+    refresh = request.args.get('refresh', '0') == '1'
+    
     try:
-        # Cache key for release details
-        cache_key = f"discogs_release:{release_id}"
+        if not refresh:
+            catalog = discogs.get_cached_label_catalog(label_id)
+            if catalog:
+                logger.info(f"Cache hit for Discogs label catalog: {label_id}")
+                return jsonify(catalog)
         
-        # Check cache first if Redis is available
-        if redis_cache_client:
-            try:
-                cached_data = redis_cache_client.get(cache_key)
-                if cached_data:
-                    logger.info(f"Cache hit for Discogs release: {release_id}")
-                    return jsonify(json.loads(cached_data.decode('utf-8')))
-            except Exception as e:
-                logger.error(f"Redis error in release details: {str(e)}")
-        
-        # Cache miss or Redis not available, fetch the release details
-        data = discogs.get_release_details(release_id)
-        
-        # Cache the results if Redis is available
-        if redis_cache_client:
-            try:
-                redis_cache_client.setex(
-                    cache_key,
-                    CACHE_TTL,
-                    json.dumps(data).encode('utf-8')
-                )
-            except Exception as e:
-                logger.error(f"Redis error caching release details: {str(e)}")
+        if q is None:
+            # No background queue: build inline
+            catalog, added = discogs.get_label_catalog(label_id, refresh=refresh)
+            track_index.index_catalog(catalog)
+            return jsonify(catalog)
         
+        # One catalog job per label and mode; concurrent requests share it
+        done_states = ('finished', 'failed', 'stopped', 'canceled')
+        job_id = f"label_catalog_{label_id}_refresh" if refresh else f"label_catalog_{label_id}"
+        job = q.fetch_job(job_id)
+        if job is None or job.get_status() in done_states:
+            # A refresh runs after a pending plain fetch of the label, topping up its result
+            pending = q.fetch_job(f"label_catalog_{label_id}") if refresh else None
+            depends_on = None
+            if pending is not None and pending.get_status() not in done_states:
+                try:
+                    # Refresh even if the pending fetch fails (RQ >= 1.13)
+                    from rq.job import Dependency
+                    depends_on = Dependency(jobs=[pending], allow_failure=True)
+                except ImportError:
+                    depends_on = pending
+            job = q.enqueue(
+                'app.build_label_catalog',
+                label_id,
+                refresh,
+                job_id=job_id,
+                depends_on=depends_on,
+                job_timeout=1800,
+                result_ttl=600,
+                description=f"Discogs catalog{' refresh' if refresh else ''}: label {label_id}"
+            )
+            logger.info(f"Enqueued Discogs catalog {'refresh ' if refresh else ''}job for label {label_id}")
+        return jsonify({"job_id": job.id, "status": job.get_status()}), 202
+    except CircuitOpenError:
+        return upstream_unavailable_response(breaker_for_url(discogs.DISCOGS_API_URL), "Discogs is temporarily unavailable. Please try again shortly.")
+    except Exception as e:
+        logger.error(f"Error in Discogs label catalog: {str(e)}")
+        return jsonify({"error": f"Failed to get Discogs catalog: {str(e)}"}), 500
+
+@app.route("/discogs/release/<int:release_id>")
+def release_details(release_id):
+    """Get detailed information about a specific release
+    
+    ?fields= takes a comma separated list of field groups (or 'all');
+    it defaults to what the release modal shows.
+    """
+    try:
+        fields = discogs.parse_fields(request.args.get('fields') or discogs.DEFAULT_RELEASE_FIELDS)
+    except ValueError as e:
+        return jsonify({"error": str(e)}), 400
+    
+    try:
+        data = discogs.get_release_details(release_id, fields=fields)
+        if data:
+            track_index.index_release(data)
         return jsonify(data)
+    except CircuitOpenError:
+        return upstream_unavailable_response(breaker_for_url(discogs.DISCOGS_API_URL), "Discogs is temporarily unavailable. Please try again shortly.")
     except Exception as e:
         logger.error(f"Error in Discogs release details: {str(e)}")
         return jsonify({"error": f"Failed to get Discogs release: {str(e)}"}), 500
 
+@app.route("/track_index/lookup", methods=['POST'])
+def track_index_lookup():
+    """Resolve tracklist lines to known YouTube video and Discogs release IDs.
+    
+    Expects JSON {"tracks": ["Artist - Title", ...], "source": "djset"} and
+    answers from the local index only, without calling YouTube or Discogs.
+    """
+    body = request.get_json(silent=True) or {}
+    tracks = body.get("tracks")
+    if not isinstance(tracks, list) or not all(isinstance(t, str) for t in tracks):
+        return jsonify({"error": "tracks must be a list of strings"}), 400
+    if len(tracks) > YOUTUBE_BATCH_MAX_TRACKS:
+        return jsonify({"error": f"At most {YOUTUBE_BATCH_MAX_TRACKS} tracks per request"}), 400
+    
+    results = track_index.annotate(tracks, body.get("source", "djset"))
+    return jsonify({"results": [dict(result, track=track) for track, result in zip(tracks, results)]})
+
+@app.route("/search_tracks")
+def search_tracks():
+    """Full-text search over every scraped tracklist, e.g. "who played this track".
+    
+    Answers from the local index only; never contacts MixesDB. Optional
+    `artist` restricts results to one artist, `limit` caps the rows (max 200).
+    """
+    query = request.args.get("q", "").strip()
+    if not query:
+        return jsonify({"error": "Query parameter 'q' is required"}), 400
+    limit = max(1, min(request.args.get("limit", 50, type=int), 200))
+    
+    try:
+        start = time.time()
+        data = scraper.track_search_index.search(query, limit=limit, artist_name=request.args.get("artist") or None)
+        data["query"] = query
+        data["took_ms"] = round((time.time() - start) * 1000, 2)
+        data["index"] = scraper.track_search_index.stats()
+        return jsonify(data)
+    except Exception as e:
+        logger.error(f"Error in track search for '{query}': {str(e)}")
+        return jsonify({"error": f"Track search failed: {str(e)}"}), 500
+
+@app.route("/track_index/stats")
+def track_index_stats():
+    """Report how many tracks, catalog numbers and videos the index holds."""
+    return jsonify(track_index.stats())
+
+@app.route("/discogs/stats")
+def discogs_stats():
+    """Report request, retry, throttling and cache counters for this worker's Discogs client."""
+    client = discogs.get_client()
+    stats = dict(client.stats)
+    if client.cache:
+        stats["cache"] = client.cache.stats()
+    return jsonify(stats)
+
+@app.route("/circuit_breakers")
+def circuit_breakers():
+    """Report the shared circuit breaker state of each upstream."""
+    breakers = [
+        breaker_for_url(scraper.EXPLORER_BASE_URL),
+        breaker_for_url(YOUTUBE_SEARCH_URL),
+        breaker_for_url(discogs.DISCOGS_API_URL),
+    ]
+    return jsonify({"breakers": [breaker.status() for breaker in breakers]})
+
+@app.route("/metrics")
+def prometheus_scrape():
+    """Prometheus metrics: per-route latency, cache and upstream counters, RQ queues and workers, crawl totals."""
+    rendered = prometheus_metrics.render_metrics(redis_conn, [q.name, scraper.LOW_PRIORITY_QUEUE] if q else [])
+    if rendered is None:
+        return jsonify({"error": "Metrics are disabled (needs prometheus_client and METRICS_ENABLED=1)"}), 404
+    body, content_type = rendered
+    return Response(body, content_type=content_type)
+
+@app.route("/metrics/crawl")
+def crawl_metrics():
+    """Report stage timings, counters and fetch latencies summed over every recorded scrape job."""
+    return jsonify(read_crawl_metrics(redis_conn))
+
 # Main entry point for development server (not used by Gunicorn)
 if __name__ == "__main__":
     port = int(os.environ.get("PORT", 8080))
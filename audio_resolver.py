@@ -0,0 +1,197 @@
+import logging
+import queue
+import threading
+import time
+import urllib.parse
+from concurrent.futures import ThreadPoolExecutor
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+YDL_OPTS = {
+    'format': 'bestaudio/best',
+    'noplaylist': True,
+    'quiet': True,
+    'no_warnings': True,
+    'extract_flat': False,
+    'skip_download': True,
+    # Add additional options to improve extraction reliability
+    'socket_timeout': 15,
+    'retries': 3,
+    'ignoreerrors': True,
+    'geo_bypass': True,
+    'nocheckcertificate': True,
+}
+
+
+def url_expiry(audio_url):
+    """Return the unix timestamp from a signed googlevideo URL's `expire` param, or None."""
+    try:
+        query = urllib.parse.parse_qs(urllib.parse.urlparse(audio_url).query)
+        return int(query["expire"][0])
+    except (KeyError, IndexError, ValueError):
+        pass
+    # Some URLs carry parameters as path segments: /expire/1700000000/...
+    parts = urllib.parse.urlparse(audio_url).path.split('/')
+    if 'expire' in parts:
+        try:
+            return int(parts[parts.index('expire') + 1])
+        except (IndexError, ValueError):
+            pass
+    return None
+
+
+def pick_audio_format(info):
+    """Build the response payload for the best audio format in a yt-dlp info dict.
+
+    Returns (payload, status_code).
+    """
+    formats = info.get('formats', [])
+
+    # First try to find audio-only formats (more efficient)
+    audio_formats = [f for f in formats if f.get('acodec') != 'none' and f.get('vcodec') == 'none']
+
+    result_data = {
+        "success": True,
+        "title": info.get('title', ''),
+        "duration": info.get('duration', 0),
+        "uploader": info.get('uploader', '')
+    }
+
+    if audio_formats:
+        # Sort by quality (typically bitrate)
+        audio_formats.sort(key=lambda x: x.get('abr') or 0, reverse=True)
+        best_audio = audio_formats[0]
+        result_data.update({
+            "audio_url": best_audio['url'],
+            "format": best_audio.get('format_note', 'unknown'),
+            "bitrate": best_audio.get('abr', 0),
+            "mime_type": f"audio/{best_audio.get('audio_ext') or best_audio.get('ext') or 'webm'}"
+        })
+    else:
+        # Fall back to any format with audio if no audio-only formats
+        for format in formats:
+            if format.get('acodec') != 'none' and format.get('url'):
+                result_data.update({
+                    "audio_url": format['url'],
+                    "format": format.get('format_note', 'unknown'),
+                    "is_video": True,
+                    "mime_type": f"video/{format.get('ext') or 'mp4'}"
+                })
+                break
+        else:
+            return {"error": "No suitable audio format found"}, 404
+
+    result_data["expires_at"] = url_expiry(result_data["audio_url"])
+    return result_data, 200
+
+
+class AudioResolver:
+    """Resolves YouTube video IDs to signed audio URLs outside the request thread.
+
+    Keeps a pool of long-lived YoutubeDL instances so extractor setup is paid
+    once per instance rather than per request. Extractions run on a thread
+    pool and concurrent requests for the same video_id share one extraction.
+    Successful results are cached until shortly before the signed URL expires.
+    """
+
+    def __init__(self, cache=None, pool_size=4, expiry_margin=300, max_ttl=86400):
+        self.cache = cache
+        self.pool_size = pool_size
+        self.expiry_margin = expiry_margin
+        self.max_ttl = max_ttl
+        self._executor = ThreadPoolExecutor(max_workers=pool_size, thread_name_prefix="audio-resolver")
+        self._extractors = queue.Queue()
+        self._extractors_created = 0
+        self._pool_lock = threading.Lock()
+        self._in_flight = {}  # video_id -> Future
+        self._in_flight_lock = threading.Lock()
+
+    @staticmethod
+    def cache_key(video_id):
+        return f"audio_proxy_{video_id}"
+
+    def _checkout_extractor(self):
+        """Take an idle YoutubeDL from the pool, creating one if the pool is not full yet."""
+        try:
+            return self._extractors.get_nowait()
+        except queue.Empty:
+            pass
+        with self._pool_lock:
+            if self._extractors_created < self.pool_size:
+                import yt_dlp as youtube_dl
+                self._extractors_created += 1
+                return youtube_dl.YoutubeDL(YDL_OPTS)
+        return self._extractors.get()
+
+    def cache_ttl(self, payload):
+        """Seconds to cache a resolved payload: until the URL expires, minus a safety margin."""
+        expires_at = payload.get("expires_at")
+        if not expires_at:
+            return self.max_ttl
+        return max(0, min(self.max_ttl, int(expires_at - time.time() - self.expiry_margin)))
+
+    def get_cached(self, video_id):
+        """Return a cached payload for video_id, or None."""
+        if not self.cache:
+            return None
+        return self.cache.get(self.cache_key(video_id))
+
+    def invalidate(self, video_id):
+        """Drop a cached payload, e.g. after the upstream rejects its URL."""
+        if self.cache:
+            self.cache.delete(self.cache_key(video_id))
+
+    def _extract(self, video_id):
+        start = time.time()
+        ydl = self._checkout_extractor()
+        try:
+            info = ydl.extract_info(f"https://www.youtube.com/watch?v={video_id}", download=False)
+        except Exception as e:
+            logger.error(f"Error extracting audio for {video_id}: {str(e)}")
+            return {"error": f"Failed to extract audio: {str(e)}"}, 500
+        finally:
+            self._extractors.put(ydl)
+
+        if not info:
+            return {"error": "Could not extract video information"}, 404
+
+        payload, status_code = pick_audio_format(info)
+        if status_code == 200 and self.cache:
+            ttl = self.cache_ttl(payload)
+            self.cache.set(self.cache_key(video_id), payload, ttl=ttl)
+            logger.info(f"Resolved audio for {video_id} in {time.time() - start:.2f}s, cached for {ttl}s")
+        return payload, status_code
+
+    def _run(self, video_id):
+        try:
+            return self._extract(video_id)
+        finally:
+            with self._in_flight_lock:
+                self._in_flight.pop(video_id, None)
+
+    def submit(self, video_id):
+        """Start resolving video_id, or join an extraction already in flight.
+
+        Returns a Future whose result is (payload, status_code).
+        """
+        with self._in_flight_lock:
+            future = self._in_flight.get(video_id)
+            if future is None:
+                # _run removes the entry under the same lock, so it cannot
+                # finish cleaning up before the entry is registered here
+                future = self._executor.submit(self._run, video_id)
+                self._in_flight[video_id] = future
+            return future
+
+    def stats(self):
+        """Return pool and in-flight counters."""
+        with self._in_flight_lock:
+            in_flight = len(self._in_flight)
+        return {
+            "pool_size": self.pool_size,
+            "extractors_created": self._extractors_created,
+            "extractors_idle": self._extractors.qsize(),
+            "in_flight": in_flight,
+        }
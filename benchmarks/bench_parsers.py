@@ -0,0 +1,218 @@
+#!/usr/bin/env python3
+"""
+Benchmark the scraper's parsers on the offline fixture corpus.
+
+Usage:
+    python benchmarks/bench_parsers.py [--fixtures DIR] [--repeat N] [--only SUBSTRING]
+                                       [--json report.json] [--compare baseline.json] [--threshold PCT]
+
+Runs every case on the pages in benchmarks/fixtures (see make_fixtures.py):
+    parse_html               BeautifulSoup parse of each page
+    parse_category_page      category listing, including each linked mix page
+                             (served from the in-process request cache, no network)
+    parse_tracklists_explorer
+    extract_mix_tracklist    each mix page layout, on an already parsed page
+    clean_item               every track line in the corpus
+    search_video_scoring     parse a YouTube results page and pick the best candidate
+    search_video_scoring_legacy
+                             the same with the legacy string scan instead of the
+                             page's JSON, to compare the two parsers
+
+For each case it reports the median and best time per run, items per second,
+and the peak and retained memory of one run (tracemalloc). Logging is
+silenced so its cost is not measured.
+
+--json writes the results; --compare prints the change against an earlier
+report and exits with status 1 if any case got slower (median) or allocated
+more (peak) by more than --threshold percent, so it can gate a deploy.
+"""
+import argparse
+import glob
+import json
+import logging
+import os
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Keep benchmark runs off Redis: no shared breaker state is read per mix
+os.environ.setdefault("CIRCUIT_BREAKER_ENABLED", "0")
+logging.disable(logging.CRITICAL)
+
+import main
+import youtube_results
+from clean_item import clean_item
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+
+def load_fixtures(directory, prefix):
+    """Return {name: html} for the fixture pages starting with prefix."""
+    pages = {}
+    for path in sorted(glob.glob(os.path.join(directory, f"{prefix}_*.html"))):
+        with open(path, encoding="utf-8") as f:
+            pages[os.path.splitext(os.path.basename(path))[0]] = f.read()
+    return pages
+
+
+def build_cases(directory):
+    """Return a list of (name, func, items) benchmark cases for the corpus."""
+    categories = load_fixtures(directory, "category")
+    explorers = load_fixtures(directory, "explorer")
+    mixes = load_fixtures(directory, "mix")
+    youtube = load_fixtures(directory, "youtube")
+    if not (categories or explorers or mixes or youtube):
+        raise SystemExit(f"No fixtures in {directory}; run benchmarks/make_fixtures.py first")
+    cases = []
+
+    for name, html in {**categories, **explorers, **mixes}.items():
+        cases.append((f"parse_html[{name}]", lambda html=html: main.parse_html(html), 1))
+
+    mix_pages = list(mixes.values())
+    for name, html in categories.items():
+        soup = main.parse_html(html)
+        # Every linked mix is answered from request_cache with one of the mix fixtures, in turn
+        links = [a.get("href", "") for ul in soup.find("div", id="mw-content-text").find_all("ul") for a in ul.find_all("a")]
+        for index, href in enumerate(links):
+            url = href if href.startswith("http") else f"https://www.mixesdb.com{href}"
+            page = mix_pages[index % len(mix_pages)] if mix_pages else "<html></html>"
+            main.request_cache[url] = (time.time(), main.checkpointed_response(url, page.encode("utf-8")))
+        cases.append((f"parse_category_page[{name}]", lambda soup=soup: main.parse_category_page(soup, "Ben UFO"), len(links)))
+
+    for name, html in explorers.items():
+        soup = main.parse_html(html)
+        cases.append((f"parse_tracklists_explorer[{name}]", lambda soup=soup: main.parse_tracklists_explorer(soup),
+                      len(soup.find_all("div", class_="explorerResult"))))
+
+    track_lines = []
+    for name, html in mixes.items():
+        soup = main.parse_html(html)
+        mix_url = f"https://www.mixesdb.com/w/{name}"
+        track_lines.extend(track["track"] for track in main.extract_mix_tracklist(soup, mix_url))
+        cases.append((f"extract_mix_tracklist[{name}]", lambda soup=soup, mix_url=mix_url: main.extract_mix_tracklist(soup, mix_url), 1))
+    for html in explorers.values():
+        for mix in main.parse_tracklists_explorer(main.parse_html(html)):
+            track_lines.extend(track["track"] for track in mix["tracks"])
+    if track_lines:
+        cases.append(("clean_item", lambda: [clean_item(line) for line in track_lines], len(track_lines)))
+
+    for name, html in youtube.items():
+        for case, parse in (("search_video_scoring", youtube_results.parse_results_page),
+                            ("search_video_scoring_legacy", youtube_results.legacy_extract_candidates)):
+            def score_page(html=html, parse=parse):
+                candidates = parse(html)
+                if candidates:
+                    youtube_results.pick_best_candidate(candidates, "Ben UFO", "Signal Drift", source="discogs")
+            cases.append((f"{case}[{name}]", score_page, 1))
+    return cases
+
+
+def run_case(func, items, repeat):
+    """Time func and measure its allocations. Returns a result dict."""
+    func()  # Warm-up: imports, regex compilation, caches
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    before, _ = tracemalloc.get_traced_memory()
+    result = func()
+    after, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+
+    median = statistics.median(timings)
+    return {
+        "median_ms": round(median * 1000, 3),
+        "best_ms": round(min(timings) * 1000, 3),
+        "items_per_sec": round(items / median, 1) if median else None,
+        "peak_kb": round((peak - before) / 1024, 1),
+        "retained_kb": round((after - before) / 1024, 1),
+    }
+
+
+def print_results(results):
+    print(f"{'Case':<58} {'Median ms':>10} {'Best ms':>9} {'Items/s':>10} {'Peak KB':>9} {'Kept KB':>8}")
+    print("-" * 108)
+    for name, r in results.items():
+        print(f"{name:<58} {r['median_ms']:>10.2f} {r['best_ms']:>9.2f} {r['items_per_sec'] or 0:>10.0f} "
+              f"{r['peak_kb']:>9.0f} {r['retained_kb']:>8.0f}")
+
+
+def change(new, old):
+    return (new - old) / old * 100 if old else 0.0
+
+
+def compare(results, baseline, threshold):
+    """Print the change of each case against a baseline report. Returns the names of regressed cases."""
+    regressions = []
+    print(f"\n{'Case':<58} {'Median ms':>18} {'Change':>8} {'Peak KB':>16} {'Change':>8}")
+    print("-" * 112)
+    for name, r in results.items():
+        old = baseline.get(name)
+        if old is None:
+            print(f"{name:<58} {'(new)':>18}")
+            continue
+        time_change = change(r["median_ms"], old["median_ms"])
+        peak_change = change(r["peak_kb"], old["peak_kb"])
+        regressed = time_change > threshold or peak_change > threshold
+        if regressed:
+            regressions.append(name)
+        print(f"{name:<58} {old['median_ms']:>8.2f} ->{r['median_ms']:>8.2f} {time_change:>+7.1f}% "
+              f"{old['peak_kb']:>7.0f} ->{r['peak_kb']:>7.0f} {peak_change:>+7.1f}%{'  REGRESSION' if regressed else ''}")
+    for name in baseline:
+        if name not in results:
+            print(f"{name:<58} {'(missing)':>18}")
+    return regressions
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark the scraper's parsers on the fixture corpus.")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Directory of fixture pages")
+    parser.add_argument("--repeat", type=int, default=5, help="Timed runs per case")
+    parser.add_argument("--only", help="Run only cases whose name contains this")
+    parser.add_argument("--json", help="Write the results to this report file")
+    parser.add_argument("--compare", help="Compare against an earlier report")
+    parser.add_argument("--threshold", type=float, default=10.0, help="Percent slowdown or growth that counts as a regression")
+    args = parser.parse_args(argv)
+
+    cases = build_cases(args.fixtures)
+    results = {}
+    for name, func, items in cases:
+        if args.only and args.only not in name:
+            continue
+        results[name] = run_case(func, items, args.repeat)
+    print_results(results)
+
+    if args.json:
+        report = {
+            "created_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "repeat": args.repeat,
+            "results": results,
+        }
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"\nWrote {args.json}")
+
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f:
+            baseline = json.load(f)["results"]
+        if args.only:
+            baseline = {name: r for name, r in baseline.items() if args.only in name}
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} case(s) regressed by more than {args.threshold:.0f}%")
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""
+Generate the synthetic fixture corpus used by bench_parsers.py.
+
+Usage:
+    python benchmarks/make_fixtures.py [output_dir]
+
+Writes deterministic (seeded) pages that follow the markup the scraper
+parses: a MixesDB category listing, an Explorer results page, mix pages in
+each tracklist layout fetch_mix_tracklist handles, and a YouTube results
+page with embedded ytInitialData. Saved real pages can sit next to them; bench_parsers.py picks up every
+category_*, explorer_*, mix_* and youtube_* file.
+"""
+import json
+import os
+import random
+import sys
+from html import escape
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SEED = 49
+
+ARTISTS = ["Ben UFO", "Pearson Sound", "Objekt", "Call Super", "Joy Orbison", "Peverelist", "Shanti Celeste",
+           "DJ Stingray", "Beatrice Dillon", "Batu", "Avalon Emerson", "Helena Hauff", "Kassem Mosse", "Anz"]
+WORDS = ["Signal", "Drift", "Pressure", "Tidal", "Night", "Bleep", "Concrete", "Orbit", "Haze", "Static",
+         "Motion", "Echo", "Carbon", "Pulse", "Glass", "Fracture", "Lantern", "Voltage", "Meridian", "Dub"]
+LABELS = ["Hessle Audio", "Hemlock", "Livity Sound", "Timedance", "Ilian Tape", "Tresor", "Whities", "PAN"]
+DATES = ["2016-03-12", "2017-06-22", "2018-11-03", "2019-01-27", "2020-08-15", "2021-05-09", "2022-12-31"]
+
+WIKI_HEAD = """<!DOCTYPE html>
+<html class="client-nojs" lang="en" dir="ltr"><head><meta charset="UTF-8"/><title>{title} - MixesDB</title>
+<link rel="stylesheet" href="/w/load.php?lang=en&amp;modules=site.styles&amp;only=styles&amp;skin=vector"/>
+<script>var RLCONF={{"wgPageName":"{page}","wgNamespaceNumber":14}};</script></head>
+<body class="mediawiki ltr skin-vector"><div id="mw-page-base"></div><div id="content" class="mw-body">
+<h1 id="firstHeading" class="firstHeading">{title}</h1><div id="bodyContent" class="vector-body">
+<div id="mw-content-text" class="mw-body-content">"""
+WIKI_FOOT = """</div><div id="catlinks" class="catlinks"><ul><li><a href="/w/Category:Artist">Artist</a></li>
+<li><a href="/w/Category:Electronic">Electronic</a></li></ul></div></div></div>
+<div id="mw-navigation"><div id="mw-panel"><ul><li><a href="/w/Main_Page">Main page</a></li>
+<li><a href="/w/MixesDB:Explorer">Explorer</a></li><li><a href="/w/Special:Random">Random mix</a></li></ul></div></div>
+<div id="footer"><ul><li>This page was last edited on 1 January 2024.</li></ul></div></body></html>
+"""
+
+
+def track_line(rng, number=None):
+    """A tracklist line in MixesDB style: [time] Artist - Title (Remix) [Label - CAT]."""
+    artist = rng.choice(ARTISTS)
+    title = " ".join(rng.sample(WORDS, rng.randint(1, 3)))
+    remix = f" ({rng.choice(ARTISTS)} Remix)" if rng.random() < 0.2 else ""
+    label = rng.choice(LABELS)
+    catalog = f"{label.split()[0][:4].upper()}{rng.randint(1, 120):03d}"
+    prefix = f"[{number:02d}] " if number is not None else f"[{rng.randint(0, 120):03d}] "
+    if rng.random() < 0.1:
+        return f"{prefix}?"
+    return f"{prefix}{artist} - {title}{remix} [{label} - {catalog}]"
+
+
+def mix_title(rng, index):
+    date = rng.choice(DATES)
+    return date, f"{date} - {rng.choice(ARTISTS)} @ {rng.choice(WORDS)} {rng.choice(['Radio', 'Club', 'Festival'])} #{index}"
+
+
+def mix_href(title):
+    return "/w/" + title.replace(" ", "_").replace("#", "")
+
+
+def category_page(rng, mixes=200):
+    items = []
+    for i in range(mixes):
+        date, title = mix_title(rng, i)
+        items.append(f'<li><a href="{escape(mix_href(title))}" title="{escape(title)}">{escape(title)}</a> ({date})</li>')
+    body = ('<div id="mw-pages"><h2>Pages in category "Ben UFO"</h2>'
+            f'<p>The following {mixes} pages are in this category.</p>'
+            '<div class="mw-category"><div class="mw-category-group"><ul>' + "\n".join(items) + '</ul></div></div>'
+            '<a href="/w/index.php?title=Category:Ben_UFO&amp;pagefrom=2017#mw-pages">next page</a></div>')
+    return WIKI_HEAD.format(title="Category:Ben UFO", page="Category:Ben_UFO") + body + WIKI_FOOT
+
+
+def explorer_page(rng, results=100, total=737):
+    blocks = []
+    for i in range(results):
+        date, title = mix_title(rng, i)
+        tracks = "".join(f"<li>{escape(track_line(rng))}</li>" for _ in range(rng.randint(0, 25)))
+        blocks.append(
+            f'<div class="explorerResult"><div class="explorerTitle"><a href="{escape(mix_href(title))}">{escape(title)}</a> ({date})</div>'
+            f'<div class="explorerDetails"><span class="cat">Ben UFO</span></div>'
+            + (f'<div class="explorerTracklist"><ol>{tracks}</ol></div>' if tracks else '') + '</div>'
+        )
+    body = (f'<div class="rc_headin">Results 1 - {results} of {total}</div>'
+            '<form id="explorerForm"><input name="do" value="mx"/></form>' + "\n".join(blocks))
+    return WIKI_HEAD.format(title="MixesDB:Explorer/Mixes", page="MixesDB:Explorer/Mixes") + body + WIKI_FOOT
+
+
+def mix_page(rng, layout, tracks=30):
+    """A mix page whose tracklist uses one of the layouts extract_mix_tracklist recognises."""
+    lines = [track_line(rng, n) for n in range(1, tracks + 1)]
+    intro = ('<table class="infobox"><tr><th>Date</th><td>2019-01-27</td></tr><tr><th>Venue</th><td>Club</td></tr></table>'
+             '<p>Recorded live. Thanks to everyone who came down.</p>'
+             '<div class="mixPlayer"><a href="https://www.mixcloud.com/x/">Listen</a></div>')
+    if layout == "tracklist_section":
+        tracklist = '<h2><span class="mw-headline" id="Tracklist">Tracklist</span></h2><ol>' + \
+            "".join(f'<li class="list-track">{escape(line)}</li>' for line in lines) + '</ol>'
+    elif layout == "soundcloud_text":
+        tracklist = '<div class="mixPlayer"><iframe src="https://w.soundcloud.com/player/?url=x"></iframe></div>' + \
+            "<p>" + "<br/>\n".join(escape(line.split('] ', 1)[-1]) for line in lines) + "</p>"
+    elif layout == "tracklist_div":
+        tracklist = '<h2><span class="mw-headline" id="Tracks">Tracks</span></h2><div class="tracklist"><ol>' + \
+            "".join(f"<li>{escape(line)}</li>" for line in lines) + '</ol></div>'
+    elif layout == "header_table":
+        tracklist = '<table class="wikitable"><tr><th>Time</th><th>Track</th></tr>' + \
+            "".join(f"<tr><td>{n:02d}:00</td><td>{escape(line.split('] ', 1)[-1])}</td></tr>" for n, line in enumerate(lines)) + '</table>'
+    elif layout == "paragraph_text":
+        tracklist = "<p>" + "<br/>\n".join(escape(line.split('] ', 1)[-1]) for line in lines) + "</p>"
+    elif layout == "pre_text":
+        tracklist = "<pre>" + "\n".join(f"{n}. {escape(line.split('] ', 1)[-1])}" for n, line in enumerate(lines, 1)) + "</pre>"
+    else:
+        raise ValueError(f"Unknown mix page layout: {layout}")
+    comments = "".join(f'<div class="comment"><p>{escape(" ".join(rng.sample(WORDS, 6)))}</p></div>' for _ in range(20))
+    # Real mix pages carry long category and related-mix link lists around the tracklist
+    related = '<div class="relatedMixes"><ul>' + "".join(
+        f'<li><a href="{escape(mix_href(title))}">{escape(title)}</a></li>' for title in (mix_title(rng, i)[1] for i in range(150))
+    ) + '</ul></div>'
+    body = intro + tracklist + '<h2><span class="mw-headline" id="Comments">Comments</span></h2>' + comments + related
+    return WIKI_HEAD.format(title="2019-01-27 - Ben UFO @ Club", page="Mix") + body + WIKI_FOOT
+
+
+def youtube_page(rng, videos=20):
+    def text(value):
+        return {"runs": [{"text": value}]}
+
+    contents = []
+    for i in range(videos):
+        artist, title = rng.choice(ARTISTS), " ".join(rng.sample(WORDS, 2))
+        video_id = "".join(rng.choice("abcdefghijklmnopqrstuvwxyzABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789_-") for _ in range(11))
+        contents.append({"videoRenderer": {
+            "videoId": video_id,
+            "thumbnail": {"thumbnails": [{"url": f"https://i.ytimg.com/vi/{video_id}/hq720.jpg", "width": 720, "height": 404}]},
+            "title": text(f"{artist} - {title}"),
+            "ownerText": text(f"{rng.choice(LABELS)}"),
+            "lengthText": {"simpleText": f"{rng.randint(3, 9)}:{rng.randint(0, 59):02d}"},
+            "viewCountText": {"simpleText": f"{rng.randint(1000, 900000)} views"},
+            "detailedMetadataSnippets": [{"snippetText": text(" ".join(rng.sample(WORDS, 10)))}],
+            "ownerBadges": [{"metadataBadgeRenderer": {"tooltip": "Official Artist Channel"}}] if i % 4 == 0 else [],
+            "navigationEndpoint": {"commandMetadata": {"webCommandMetadata": {"url": f"/watch?v={video_id}"}}},
+        }})
+        if i % 5 == 4:
+            contents.append({"shelfRenderer": {"title": text("People also watched"), "content": {"items": []}}})
+    data = {"contents": {"twoColumnSearchResultsRenderer": {"primaryContents": {"sectionListRenderer": {
+        "contents": [{"itemSectionRenderer": {"contents": contents}}]}}}},
+        "estimatedResults": "12345", "responseContext": {"serviceTrackingParams": [{"params": [{"key": "k", "value": "v"}] * 40}]}}
+    player_js = "".join(f"var yt_{i}=function(a){{return a*{i}}};" for i in range(4000))
+    return (f"<!DOCTYPE html><html><head><script>{player_js}</script></head><body>"
+            f"<script nonce=\"x\">var ytInitialData = {json.dumps(data)};</script>"
+            "<div id=\"content\"></div></body></html>")
+
+
+def main(output_dir=FIXTURES_DIR):
+    rng = random.Random(SEED)
+    os.makedirs(output_dir, exist_ok=True)
+    pages = {
+        "category_ben_ufo.html": category_page(rng),
+        "explorer_ben_ufo.html": explorer_page(rng),
+        "youtube_results.html": youtube_page(rng),
+    }
+    for layout in ("tracklist_section", "tracklist_div", "header_table", "soundcloud_text", "paragraph_text", "pre_text"):
+        pages[f"mix_{layout}.html"] = mix_page(rng, layout)
+    for name, html in pages.items():
+        with open(os.path.join(output_dir, name), "w", encoding="utf-8") as f:
+            f.write(html)
+        print(f"{name:<32} {len(html) / 1024:>7.1f} KB")
+
+
+if __name__ == "__main__":
+    main(*sys.argv[1:2])
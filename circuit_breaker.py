@@ -0,0 +1,215 @@
+import logging
+import os
+import threading
+import time
+from urllib.parse import urlparse
+
+import redis
+import requests
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Breaker configuration, shared by every upstream host
+CIRCUIT_BREAKER_ENABLED = os.environ.get("CIRCUIT_BREAKER_ENABLED", "1") == "1"
+CIRCUIT_WINDOW = int(os.environ.get("CIRCUIT_WINDOW", 60))  # Seconds per error-rate bucket (the last two are counted)
+CIRCUIT_MIN_REQUESTS = int(os.environ.get("CIRCUIT_MIN_REQUESTS", 10))  # Requests needed before the rate can trip
+CIRCUIT_ERROR_RATE = float(os.environ.get("CIRCUIT_ERROR_RATE", 0.5))  # Failure ratio that opens the breaker
+CIRCUIT_OPEN_SECONDS = int(os.environ.get("CIRCUIT_OPEN_SECONDS", 60))  # Time open before a half-open probe
+CIRCUIT_PROBE_TIMEOUT = int(os.environ.get("CIRCUIT_PROBE_TIMEOUT", 30))  # A probe that never reports back frees its slot after this
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """Raised instead of calling an upstream whose breaker is open."""
+
+
+class CircuitBreaker:
+    """Error-rate circuit breaker for one upstream host, shared through Redis.
+
+    Every web and worker process sees the same state under circuit:<host>:
+      stats:<bucket>  hash of ok/err counts per CIRCUIT_WINDOW bucket
+      open_until      unix time the breaker stays open until
+      probe           lock held by the single half-open probe request
+    Once the last two buckets hold at least min_requests calls with an
+    error rate of error_rate or more, the breaker opens and callers fail
+    fast. After open_seconds one caller is let through as a probe: success
+    closes the breaker, failure re-opens it. Without Redis, or on Redis
+    errors, the breaker stays closed.
+    """
+
+    def __init__(self, redis_client, host, window=CIRCUIT_WINDOW, min_requests=CIRCUIT_MIN_REQUESTS,
+                 error_rate=CIRCUIT_ERROR_RATE, open_seconds=CIRCUIT_OPEN_SECONDS, probe_timeout=CIRCUIT_PROBE_TIMEOUT):
+        self.redis_client = redis_client
+        self.host = host
+        self.window = window
+        self.min_requests = min_requests
+        self.error_rate = error_rate
+        self.open_seconds = open_seconds
+        self.probe_timeout = probe_timeout
+        self.prefix = f"circuit:{host}"
+
+    def _key(self, name):
+        return f"{self.prefix}:{name}"
+
+    def _bucket_keys(self, now):
+        bucket = int(now // self.window)
+        return self._key(f"stats:{bucket}"), self._key(f"stats:{bucket - 1}")
+
+    def _open_until(self):
+        value = self.redis_client.get(self._key("open_until"))
+        return float(value) if value else None
+
+    def state(self):
+        """Return "closed", "open" or "half_open"."""
+        if not self.redis_client:
+            return CLOSED
+        try:
+            open_until = self._open_until()
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Redis error reading circuit breaker for {self.host}: {e}")
+            return CLOSED
+        if open_until is None:
+            return CLOSED
+        return OPEN if time.time() < open_until else HALF_OPEN
+
+    def is_open(self):
+        """True while calls are being rejected (open, or half-open with the probe taken)."""
+        state = self.state()
+        if state != HALF_OPEN:
+            return state == OPEN
+        try:
+            return bool(self.redis_client.exists(self._key("probe")))
+        except redis.exceptions.RedisError:
+            return False
+
+    def retry_after(self):
+        """Seconds until the breaker lets a probe through, for Retry-After headers."""
+        try:
+            open_until = self._open_until() if self.redis_client else None
+        except redis.exceptions.RedisError:
+            return 0
+        return max(0, int(open_until - time.time()) + 1) if open_until else 0
+
+    def allow(self):
+        """Return True if a call may go ahead; half-open lets exactly one probe through."""
+        state = self.state()
+        if state == CLOSED:
+            return True
+        if state == OPEN:
+            return False
+        try:
+            return bool(self.redis_client.set(self._key("probe"), time.time(), nx=True, ex=self.probe_timeout))
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Redis error taking circuit probe for {self.host}: {e}")
+            return True
+
+    def check(self):
+        """Raise CircuitOpenError unless a call may go ahead."""
+        if not self.allow():
+            raise CircuitOpenError(f"Circuit breaker open for {self.host}; retry in {self.retry_after()}s")
+
+    def _trip(self, reason):
+        open_until = time.time() + self.open_seconds
+        pipe = self.redis_client.pipeline()
+        # The key outlives open_until so the half-open state is visible; it is dropped on close
+        pipe.set(self._key("open_until"), open_until, ex=self.open_seconds * 10)
+        pipe.delete(self._key("probe"))
+        pipe.execute()
+        logger.warning(f"Circuit breaker for {self.host} opened for {self.open_seconds}s: {reason}")
+
+    def record_success(self):
+        """Count a successful call; a successful probe closes the breaker."""
+        if not self.redis_client:
+            return
+        try:
+            if self.state() != CLOSED:
+                current, previous = self._bucket_keys(time.time())
+                self.redis_client.delete(self._key("open_until"), self._key("probe"), current, previous)
+                logger.info(f"Circuit breaker for {self.host} closed after a successful probe")
+                return
+            current, _ = self._bucket_keys(time.time())
+            pipe = self.redis_client.pipeline()
+            pipe.hincrby(current, "ok", 1)
+            pipe.expire(current, self.window * 2)
+            pipe.execute()
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Redis error recording circuit success for {self.host}: {e}")
+
+    def record_failure(self):
+        """Count a failed call; trips the breaker on a failed probe or once the error rate is too high."""
+        if not self.redis_client:
+            return
+        try:
+            state = self.state()
+            if state == HALF_OPEN:
+                self._trip("half-open probe failed")
+                return
+            if state == OPEN:
+                return
+            current, previous = self._bucket_keys(time.time())
+            pipe = self.redis_client.pipeline()
+            pipe.hincrby(current, "err", 1)
+            pipe.expire(current, self.window * 2)
+            pipe.hgetall(current)
+            pipe.hgetall(previous)
+            _, _, current_counts, previous_counts = pipe.execute()
+            ok = sum(int(counts.get(b"ok", 0)) for counts in (current_counts, previous_counts))
+            err = sum(int(counts.get(b"err", 0)) for counts in (current_counts, previous_counts))
+            if ok + err >= self.min_requests and err / (ok + err) >= self.error_rate:
+                self._trip(f"{err} of the last {ok + err} calls failed")
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Redis error recording circuit failure for {self.host}: {e}")
+
+    def status(self):
+        """Return the breaker state and the error counts in the current window."""
+        status = {"host": self.host, "state": self.state(), "retry_after": self.retry_after(), "ok": 0, "err": 0}
+        if not self.redis_client:
+            return status
+        try:
+            for key in self._bucket_keys(time.time()):
+                counts = self.redis_client.hgetall(key)
+                status["ok"] += int(counts.get(b"ok", 0))
+                status["err"] += int(counts.get(b"err", 0))
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Redis error reading circuit stats for {self.host}: {e}")
+        return status
+
+
+# Breakers are shared per host; see configure_breakers
+_redis_client = None
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+
+def configure_breakers(redis_client):
+    """Point every breaker at a Redis client (None disables them)."""
+    global _redis_client
+    with _breakers_lock:
+        _redis_client = redis_client if CIRCUIT_BREAKER_ENABLED else None
+        _breakers.clear()
+
+
+def get_breaker(host):
+    """Return the shared breaker for an upstream host."""
+    with _breakers_lock:
+        breaker = _breakers.get(host)
+        if breaker is None:
+            breaker = _breakers[host] = CircuitBreaker(_redis_client, host)
+        return breaker
+
+
+def breaker_for_url(url):
+    """Return the shared breaker for the host of a URL."""
+    return get_breaker(urlparse(url).netloc)
+
+
+def breaker_statuses():
+    """Return the status of every breaker used by this process."""
+    with _breakers_lock:
+        breakers = list(_breakers.values())
+    return [breaker.status() for breaker in breakers]
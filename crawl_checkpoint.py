@@ -0,0 +1,110 @@
+import json
+import logging
+import time
+import zlib
+
+import redis
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class CrawlCheckpoint:
+    """Redis-backed progress of one artist crawl, so a restarted job can resume.
+
+    Keeps three hashes under crawl_checkpoint:<artist_key>:
+      pages  listing page URL (category/explorer) -> zlib-compressed HTML
+      mixes  mix URL -> JSON tracklist parsed from the mix page
+      meta   started_at / updated_at / job_id bookkeeping
+    Every write refreshes the TTL, so abandoned checkpoints expire on their
+    own. Redis errors are logged and the crawl carries on without resuming.
+    """
+
+    def __init__(self, redis_client, artist_name, ttl=21600):
+        self.redis_client = redis_client
+        self.artist_name = artist_name
+        self.ttl = ttl
+        self.prefix = f"crawl_checkpoint:{artist_name.lower().replace(' ', '_')}"
+
+    def _key(self, kind):
+        return f"{self.prefix}:{kind}"
+
+    def _write(self, kind, field, value):
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.hset(self._key(kind), field, value)
+            pipe.hset(self._key("meta"), "updated_at", time.time())
+            for name in ("pages", "mixes", "meta"):
+                pipe.expire(self._key(name), self.ttl)
+            pipe.execute()
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Redis error writing crawl checkpoint for {self.artist_name}: {e}")
+
+    def _read(self, kind, field):
+        try:
+            return self.redis_client.hget(self._key(kind), field)
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Redis error reading crawl checkpoint for {self.artist_name}: {e}")
+            return None
+
+    def start(self, job_id=None):
+        """Record that a crawl (re)started. Returns the summary of what is already checkpointed."""
+        summary = self.summary()
+        try:
+            mapping = {"updated_at": time.time()}
+            if job_id:
+                mapping["job_id"] = job_id
+            if not summary["started_at"]:
+                mapping["started_at"] = time.time()
+            self.redis_client.hset(self._key("meta"), mapping=mapping)
+            self.redis_client.expire(self._key("meta"), self.ttl)
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Redis error starting crawl checkpoint for {self.artist_name}: {e}")
+        return summary
+
+    def get_page(self, url):
+        """Return the checkpointed HTML bytes for a listing page, or None."""
+        cached = self._read("pages", url)
+        if cached is None:
+            return None
+        try:
+            return zlib.decompress(cached)
+        except zlib.error:
+            return None
+
+    def save_page(self, url, content):
+        self._write("pages", url, zlib.compress(content))
+
+    def get_mix(self, mix_url):
+        """Return the checkpointed tracklist for a mix page, or None."""
+        cached = self._read("mixes", mix_url)
+        if cached is None:
+            return None
+        try:
+            return json.loads(cached.decode('utf-8'))
+        except ValueError:
+            return None
+
+    def save_mix(self, mix_url, tracklist):
+        self._write("mixes", mix_url, json.dumps(tracklist).encode('utf-8'))
+
+    def summary(self):
+        """Return how many pages and mixes are checkpointed and when the crawl started."""
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.hlen(self._key("pages"))
+            pipe.hlen(self._key("mixes"))
+            pipe.hget(self._key("meta"), "started_at")
+            pages, mixes, started_at = pipe.execute()
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Redis error reading crawl checkpoint for {self.artist_name}: {e}")
+            return {"pages": 0, "mixes": 0, "started_at": None}
+        return {"pages": pages, "mixes": mixes, "started_at": float(started_at) if started_at else None}
+
+    def clear(self):
+        """Drop the checkpoint once the crawl's results are safely stored."""
+        try:
+            self.redis_client.delete(*(self._key(kind) for kind in ("pages", "mixes", "meta")))
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Redis error clearing crawl checkpoint for {self.artist_name}: {e}")
@@ -0,0 +1,176 @@
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+import redis
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+CRAWL_METRICS_ENABLED = os.environ.get("CRAWL_METRICS_ENABLED", "1") == "1"
+CRAWL_METRICS_KEY = "crawl_metrics"  # Redis hash with the totals of every recorded job
+# Upper bounds (seconds) of the fetch latency histogram buckets; slower fetches land in +Inf
+FETCH_LATENCY_BUCKETS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+
+
+def latency_bucket(seconds):
+    """Return the histogram bucket label for a fetch latency."""
+    for bound in FETCH_LATENCY_BUCKETS:
+        if seconds <= bound:
+            return str(bound)
+    return "+Inf"
+
+
+def sorted_buckets(buckets):
+    """Order latency bucket labels by their bound, +Inf last."""
+    return sorted(buckets, key=lambda bucket: float("inf") if bucket == "+Inf" else float(bucket))
+
+
+class CrawlMetrics:
+    """Stage timers and counters for one scrape job.
+
+    stage(name) times a block in wall-clock and thread CPU seconds; stages
+    nest (extract includes clean_item) and are summed across the Explorer
+    threads, so they can add up to more than the job's elapsed time.
+    count() keeps plain counters (requests, bytes, cache hits),
+    observe_fetch() the fetch latency histogram, observe_upstream() request
+    outcomes per upstream and strategy() how each mix tracklist was
+    extracted. Thread-safe.
+    """
+
+    def __init__(self):
+        self.started_at = time.time()
+        self.stages = {}
+        self.counters = {}
+        self.latency = {}
+        self.strategies = {}
+        self.upstream = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name):
+        """Time a block of work under a stage name."""
+        wall, cpu = time.perf_counter(), time.thread_time()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - wall, time.thread_time() - cpu)
+
+    def add_time(self, name, seconds, cpu_seconds=0.0):
+        """Add time spent outside a stage() block, e.g. a sleep measured by the caller."""
+        with self._lock:
+            stage = self.stages.setdefault(name, {"count": 0, "seconds": 0.0, "cpu_seconds": 0.0})
+            stage["count"] += 1
+            stage["seconds"] += seconds
+            stage["cpu_seconds"] += cpu_seconds
+
+    def count(self, name, amount=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + amount
+
+    def observe_fetch(self, seconds, nbytes):
+        """Record one HTTP fetch: its latency and the bytes it downloaded."""
+        bucket = latency_bucket(seconds)
+        with self._lock:
+            self.latency[bucket] = self.latency.get(bucket, 0) + 1
+            self.counters["requests"] = self.counters.get("requests", 0) + 1
+            self.counters["bytes_downloaded"] = self.counters.get("bytes_downloaded", 0) + nbytes
+            stage = self.stages.setdefault("fetch", {"count": 0, "seconds": 0.0, "cpu_seconds": 0.0})
+            stage["count"] += 1
+            stage["seconds"] += seconds
+
+    def observe_upstream(self, upstream, outcome):
+        """Count one upstream request; outcome is an HTTP status or an error kind."""
+        with self._lock:
+            outcomes = self.upstream.setdefault(upstream, {})
+            outcomes[str(outcome)] = outcomes.get(str(outcome), 0) + 1
+
+    def strategy(self, name):
+        """Record which extraction strategy produced a mix tracklist."""
+        with self._lock:
+            self.strategies[name] = self.strategies.get(name, 0) + 1
+
+    def snapshot(self):
+        """Return the metrics as a JSON-serialisable dict (stored in job.meta)."""
+        with self._lock:
+            return {
+                "elapsed_seconds": round(time.time() - self.started_at, 3),
+                "stages": {
+                    name: {"count": s["count"], "seconds": round(s["seconds"], 3), "cpu_seconds": round(s["cpu_seconds"], 3)}
+                    for name, s in self.stages.items()
+                },
+                "counters": dict(self.counters),
+                "fetch_latency": {bucket: self.latency[bucket] for bucket in sorted_buckets(self.latency)},
+                "strategies": dict(self.strategies),
+                "upstream_requests": {upstream: dict(outcomes) for upstream, outcomes in self.upstream.items()},
+            }
+
+    def record(self, redis_client, outcome="completed"):
+        """Add this job's metrics to the totals shared by every worker."""
+        if not (CRAWL_METRICS_ENABLED and redis_client):
+            return
+        snapshot = self.snapshot()
+        try:
+            pipe = redis_client.pipeline()
+            pipe.hincrby(CRAWL_METRICS_KEY, "jobs", 1)
+            pipe.hincrby(CRAWL_METRICS_KEY, f"outcome:{outcome}", 1)
+            pipe.hincrbyfloat(CRAWL_METRICS_KEY, "elapsed_seconds", snapshot["elapsed_seconds"])
+            for name, stage in snapshot["stages"].items():
+                pipe.hincrby(CRAWL_METRICS_KEY, f"stage:{name}:count", stage["count"])
+                pipe.hincrbyfloat(CRAWL_METRICS_KEY, f"stage:{name}:seconds", stage["seconds"])
+                pipe.hincrbyfloat(CRAWL_METRICS_KEY, f"stage:{name}:cpu_seconds", stage["cpu_seconds"])
+            for name, value in snapshot["counters"].items():
+                pipe.hincrby(CRAWL_METRICS_KEY, f"counter:{name}", value)
+            for bucket, value in snapshot["fetch_latency"].items():
+                pipe.hincrby(CRAWL_METRICS_KEY, f"latency:{bucket}", value)
+            for name, value in snapshot["strategies"].items():
+                pipe.hincrby(CRAWL_METRICS_KEY, f"strategy:{name}", value)
+            for upstream, outcomes in snapshot["upstream_requests"].items():
+                for outcome, value in outcomes.items():
+                    pipe.hincrby(CRAWL_METRICS_KEY, f"upstream:{upstream}:{outcome}", value)
+            pipe.execute()
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Redis error recording crawl metrics: {e}")
+
+
+def read_crawl_metrics(redis_client):
+    """Return the crawl metrics totals of every recorded job, shaped like a snapshot."""
+    totals = {"jobs": 0, "outcomes": {}, "elapsed_seconds": 0.0, "stages": {}, "counters": {},
+              "fetch_latency": {}, "strategies": {}, "upstream_requests": {}}
+    if not redis_client:
+        return totals
+    try:
+        raw = redis_client.hgetall(CRAWL_METRICS_KEY)
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Redis error reading crawl metrics: {e}")
+        return totals
+
+    latency = {}
+    for field, value in raw.items():
+        field = field.decode('utf-8')
+        value = float(value)
+        kind, _, name = field.partition(":")
+        if kind == "jobs":
+            totals["jobs"] = int(value)
+        elif kind == "elapsed_seconds":
+            totals["elapsed_seconds"] = round(value, 3)
+        elif kind == "outcome":
+            totals["outcomes"][name] = int(value)
+        elif kind == "stage":
+            stage_name, _, measure = name.rpartition(":")
+            stage = totals["stages"].setdefault(stage_name, {"count": 0, "seconds": 0.0, "cpu_seconds": 0.0})
+            stage[measure] = int(value) if measure == "count" else round(value, 3)
+        elif kind == "counter":
+            totals["counters"][name] = int(value)
+        elif kind == "latency":
+            latency[name] = int(value)
+        elif kind == "strategy":
+            totals["strategies"][name] = int(value)
+        elif kind == "upstream":
+            upstream, _, outcome = name.partition(":")
+            totals["upstream_requests"].setdefault(upstream, {})[outcome] = int(value)
+    totals["fetch_latency"] = {bucket: latency[bucket] for bucket in sorted_buckets(latency)}
+    return totals
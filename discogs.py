@@ -1,11 +1,30 @@
 import requests
+from requests.adapters import HTTPAdapter
 import os
 import logging
+import random
+import re
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from circuit_breaker import breaker_for_url
+from prometheus_metrics import count_cache, observe_upstream
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+# Client configuration
+DISCOGS_API_URL = os.getenv('DISCOGS_API_URL', 'https://api.discogs.com').rstrip('/')  # Point at loadtest/replay_server.py for load tests
+DISCOGS_TIMEOUT = int(os.getenv('DISCOGS_TIMEOUT', 15))  # Seconds per request
+DISCOGS_MAX_RETRIES = int(os.getenv('DISCOGS_MAX_RETRIES', 3))  # Retries on 429/5xx/connection errors
+DISCOGS_RATE_LIMIT = int(os.getenv('DISCOGS_RATE_LIMIT', 60))  # Authenticated requests per minute
+DISCOGS_RATELIMIT_RESERVE = int(os.getenv('DISCOGS_RATELIMIT_RESERVE', 5))  # Start spacing requests below this budget
+DISCOGS_POOL_SIZE = int(os.getenv('DISCOGS_POOL_SIZE', 8))  # Keep-alive connections
+DISCOGS_BULK_CONCURRENCY = int(os.getenv('DISCOGS_BULK_CONCURRENCY', 4))  # Label pages fetched at once in bulk mode
+DISCOGS_BULK_PER_PAGE = 100  # Largest page size Discogs accepts
+
 def get_discogs_token():
     token = os.getenv('DISCOGS_TOKEN')
     if not token:
@@ -16,29 +35,178 @@ def get_discogs_user_agent():
     user_agent = os.getenv('DISCOGS_USER_AGENT', 'TheDigger/1.0 +@https://github.com/Moodyw03/thedigger25')
     return user_agent
 
-def discogs_request(endpoint, params=None):
-    """Make a request to the Discogs API with proper authentication"""
-    token = get_discogs_token()
-    user_agent = get_discogs_user_agent()
+class DiscogsClient:
+    """Keep-alive Discogs API client with rate-limit aware throttling and caching.
     
-    if not token:
-        raise ValueError("Discogs API token not configured. Please set DISCOGS_TOKEN in your environment.")
+    Discogs allows DISCOGS_RATE_LIMIT requests per moving minute and reports
+    the remaining budget in X-Discogs-Ratelimit-* headers. Requests are sent
+    freely while the budget is healthy and spaced out evenly once it drops
+    to DISCOGS_RATELIMIT_RESERVE. 429s and transient 5xx responses are retried
+    with exponential backoff, honouring Retry-After. Responses are stored in
+    an optional cache (anything with get/set, e.g. TwoLevelCache). While the
+    shared Discogs circuit breaker is open, requests fail fast with
+    CircuitOpenError.
+    """
     
-    headers = {
-        'Authorization': f'Discogs token={token}',
-        'User-Agent': user_agent
-    }
+    RETRY_STATUSES = (429, 502, 503, 504)
+    
+    def __init__(self, cache=None, cache_ttl=86400, timeout=DISCOGS_TIMEOUT, max_retries=DISCOGS_MAX_RETRIES,
+                 rate_limit=DISCOGS_RATE_LIMIT, reserve=DISCOGS_RATELIMIT_RESERVE, pool_size=DISCOGS_POOL_SIZE):
+        self.cache = cache
+        self.cache_ttl = cache_ttl
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.rate_limit = rate_limit
+        self.reserve = reserve
+        self.session = requests.Session()
+        # Also on http:// so a plain-HTTP DISCOGS_API_URL (the load-test replay server) uses the same pool
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        self._lock = threading.Lock()
+        self._remaining = rate_limit
+        self._next_request_at = 0.0
+        self.stats = {"requests": 0, "cache_hits": 0, "retries": 0, "throttled_seconds": 0.0}
+    
+    def _headers(self):
+        token = get_discogs_token()
+        if not token:
+            raise ValueError("Discogs API token not configured. Please set DISCOGS_TOKEN in your environment.")
+        return {
+            'Authorization': f'Discogs token={token}',
+            'User-Agent': get_discogs_user_agent()
+        }
+    
+    def _wait_for_slot(self):
+        """Block until the next request fits in the Discogs budget."""
+        with self._lock:
+            now = time.time()
+            start_at = max(now, self._next_request_at)
+            if self._remaining <= self.reserve:
+                # Budget nearly spent: space requests across the one-minute window
+                self._next_request_at = start_at + 60.0 / self.rate_limit
+            else:
+                self._next_request_at = start_at
+            # Assume this request consumes budget until the response says otherwise
+            self._remaining -= 1
+            delay = start_at - now
+            if delay > 0:
+                self.stats["throttled_seconds"] += delay
+        if delay > 0:
+            time.sleep(delay)
     
-    url = f'https://api.discogs.com/{endpoint}'
+    def _update_budget(self, response):
+        """Adopt the limit and remaining budget reported by Discogs."""
+        try:
+            limit = int(response.headers['X-Discogs-Ratelimit'])
+            remaining = int(response.headers['X-Discogs-Ratelimit-Remaining'])
+        except (KeyError, ValueError):
+            return
+        with self._lock:
+            self.rate_limit = limit or self.rate_limit
+            self._remaining = remaining
     
-    try:
-        logger.info(f"Making Discogs API request to: {url}")
-        response = requests.get(url, headers=headers, params=params)
-        response.raise_for_status()
-        return response.json()
-    except requests.exceptions.RequestException as e:
-        logger.error(f"Discogs API request failed: {str(e)}")
-        raise
+    def _backoff(self, attempt, response=None):
+        """Sleep before a retry, preferring the server's Retry-After."""
+        delay = None
+        if response is not None:
+            try:
+                delay = float(response.headers.get('Retry-After', ''))
+            except ValueError:
+                delay = None
+        if delay is None:
+            delay = min(60, (2 ** attempt) + random.uniform(0, 1))
+        with self._lock:
+            self.stats["retries"] += 1
+            if response is not None and response.status_code == 429:
+                # Out of budget: hold back every thread, not just this one
+                self._remaining = 0
+                self._next_request_at = max(self._next_request_at, time.time() + delay)
+        time.sleep(delay)
+    
+    @staticmethod
+    def cache_key(endpoint, params=None):
+        query = '&'.join(f"{k}={params[k]}" for k in sorted(params)) if params else ''
+        return f"{endpoint}?{query}".lower()
+    
+    def get(self, endpoint, params=None, use_cache=True, cache_ttl=None):
+        """GET an API endpoint and return the decoded JSON."""
+        key = self.cache_key(endpoint, params)
+        if use_cache and self.cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info(f"Cache hit for Discogs request: {endpoint}")
+                self.stats["cache_hits"] += 1
+                count_cache("discogs_client", "hits")
+                return cached
+            count_cache("discogs_client", "misses")
+        
+        url = f'{DISCOGS_API_URL}/{endpoint}'
+        headers = self._headers()
+        breaker = breaker_for_url(DISCOGS_API_URL)
+        for attempt in range(self.max_retries + 1):
+            breaker.check()
+            self._wait_for_slot()
+            try:
+                logger.info(f"Making Discogs API request to: {url}")
+                self.stats["requests"] += 1
+                request_start = time.perf_counter()
+                response = self.session.get(url, headers=headers, params=params, timeout=self.timeout)
+                observe_upstream("discogs", response.status_code, time.perf_counter() - request_start)
+            except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                observe_upstream("discogs", "timeout" if isinstance(e, requests.exceptions.Timeout) else "connection")
+                breaker.record_failure()
+                if attempt < self.max_retries:
+                    logger.warning(f"Discogs request to {url} failed ({str(e)}), retrying")
+                    self._backoff(attempt)
+                    continue
+                logger.error(f"Discogs API request failed: {str(e)}")
+                raise
+            
+            self._update_budget(response)
+            # Rate limiting is handled by the budget; only server errors count against the breaker
+            if response.status_code >= 500:
+                breaker.record_failure()
+            else:
+                breaker.record_success()
+            if response.status_code in self.RETRY_STATUSES and attempt < self.max_retries:
+                logger.warning(f"Discogs returned {response.status_code} for {url}, retrying (attempt {attempt + 1}/{self.max_retries})")
+                self._backoff(attempt, response)
+                continue
+            
+            try:
+                response.raise_for_status()
+            except requests.exceptions.RequestException as e:
+                logger.error(f"Discogs API request failed: {str(e)}")
+                raise
+            data = response.json()
+            if use_cache and self.cache:
+                self.cache.set(key, data, ttl=cache_ttl or self.cache_ttl)
+            return data
+
+
+# Shared client used by the module-level helpers; see configure_client
+_client = None
+_client_lock = threading.Lock()
+
+def configure_client(**kwargs):
+    """Replace the shared client, e.g. to attach a cache. Returns the new client."""
+    global _client
+    with _client_lock:
+        _client = DiscogsClient(**kwargs)
+    return _client
+
+def get_client():
+    """Return the shared client, creating an uncached one on first use."""
+    global _client
+    with _client_lock:
+        if _client is None:
+            _client = DiscogsClient()
+        return _client
+
+def discogs_request(endpoint, params=None):
+    """Make a request to the Discogs API with proper authentication"""
+    return get_client().get(endpoint, params)
 
 def search_labels(query, page=1, per_page=10):
     """Search for labels matching the query"""
@@ -60,77 +228,285 @@ def get_label_releases(label_id, page=1, per_page=100, sort='year', sort_order='
     }
     return discogs_request(f'labels/{label_id}/releases', params)
 
-def get_release_details(release_id):
-    """Get detailed information about a specific release"""
-    release_data = discogs_request(f'releases/{release_id}')
-    
-    # Enhanced metadata processing for better YouTube search
-    if release_data:
-        # Clean and normalize artist names for better search
-        if 'artists' in release_data:
-            # Get primary artist name, handling various formats
-            artists = release_data['artists']
-            if artists:
-                primary_artist = artists[0].get('name', '')
-                # Remove common suffixes that might interfere with search
-                primary_artist = primary_artist.replace(' (2)', '').replace(' (3)', '').strip()
-                release_data['primary_artist'] = primary_artist
-        
-        # Extract and clean catalog number for better matching
-        if 'labels' in release_data and release_data['labels']:
-            for label in release_data['labels']:
-                if 'catno' in label and label['catno']:
-                    # Clean catalog number (remove extra spaces, normalize format)
-                    catalog = label['catno'].strip().upper()
-                    # Store cleaned catalog number
-                    label['catno_clean'] = catalog
-        
-        # Extract format information for better context
-        if 'formats' in release_data:
-            formats = release_data['formats']
-            format_info = []
-            for fmt in formats:
-                if 'name' in fmt:
-                    format_info.append(fmt['name'])
-                if 'descriptions' in fmt:
-                    format_info.extend(fmt['descriptions'])
-            
-            # Create a search-friendly format string
-            release_data['format_string'] = ' '.join(format_info).lower()
-            
-            # Detect if it's vinyl/electronic format
-            vinyl_indicators = ['vinyl', '12"', 'ep', 'single', 'maxi-single']
-            release_data['is_vinyl'] = any(indicator in release_data['format_string'] for indicator in vinyl_indicators)
-        
-        # Enhanced genre/style processing for electronic music detection
-        if 'genres' in release_data:
-            genres = [g.lower() for g in release_data['genres']]
-            electronic_genres = ['electronic', 'techno', 'house', 'ambient', 'drum & bass', 'dubstep', 'experimental']
-            release_data['is_electronic'] = any(genre in electronic_genres for genre in genres)
-        
-        if 'styles' in release_data:
-            styles = [s.lower() for s in release_data['styles']]
-            electronic_styles = ['techno', 'house', 'minimal', 'ambient', 'deep house', 'tech house', 'progressive house']
-            if not release_data.get('is_electronic'):
-                release_data['is_electronic'] = any(style in electronic_styles for style in styles)
+# Release field groups that can be requested from get_release_details
+RELEASE_FIELD_GROUPS = {
+    'core': ('id', 'title', 'artists_sort', 'artists', 'labels', 'year', 'released', 'country',
+             'formats', 'genres', 'styles', 'uri', 'resource_url'),
+    'tracklist': ('tracklist',),
+    'cover': (),  # First image only, see project_release
+    'notes': ('notes',),
+    'images': ('images',),
+    'videos': ('videos',),
+    'credits': ('extraartists',),
+    'companies': ('companies', 'identifiers'),
+}
+# What the release modal renders
+DEFAULT_RELEASE_FIELDS = ('core', 'tracklist', 'cover', 'notes')
+
+VINYL_INDICATORS = ['vinyl', '12"', 'ep', 'single', 'maxi-single']
+ELECTRONIC_GENRES = ['electronic', 'techno', 'house', 'ambient', 'drum & bass', 'dubstep', 'experimental']
+ELECTRONIC_STYLES = ['techno', 'house', 'minimal', 'ambient', 'deep house', 'tech house', 'progressive house']
+ARTIST_SUFFIX_RE = re.compile(r'\s\((?:2|3)\)')
+MIX_SUFFIX_RE = re.compile(r'\((?:Original|Club) Mix\)')
+REMIX_RE = re.compile(r'\(([^)]+)\s+remix\)', re.IGNORECASE)
+
+def parse_fields(fields):
+    """Normalise a fields argument (comma string, iterable or None) to a tuple of groups.
+    
+    None means every group. Raises ValueError for unknown groups.
+    """
+    if fields is None:
+        return tuple(RELEASE_FIELD_GROUPS)
+    if isinstance(fields, str):
+        fields = [f.strip() for f in fields.split(',') if f.strip()]
+    if 'all' in fields:
+        return tuple(RELEASE_FIELD_GROUPS)
+    unknown = [f for f in fields if f not in RELEASE_FIELD_GROUPS]
+    if unknown:
+        raise ValueError(f"Unknown release field groups: {', '.join(unknown)}")
+    return tuple(f for f in RELEASE_FIELD_GROUPS if f in fields)
+
+def enrich_core(release):
+    """Derive the search-friendly core fields used for YouTube matching."""
+    enriched = {}
+    
+    # Clean and normalize artist names for better search
+    artists = release.get('artists')
+    if artists:
+        # Remove common suffixes that might interfere with search
+        enriched['primary_artist'] = ARTIST_SUFFIX_RE.sub('', artists[0].get('name', '')).strip()
+    
+    # Clean catalog numbers (remove extra spaces, normalize format) for better matching
+    if release.get('labels'):
+        enriched['labels'] = [
+            dict(label, catno_clean=label['catno'].strip().upper()) if label.get('catno') else label
+            for label in release['labels']
+        ]
+    
+    # Create a search-friendly format string
+    if 'formats' in release:
+        format_info = []
+        for fmt in release['formats']:
+            if 'name' in fmt:
+                format_info.append(fmt['name'])
+            format_info.extend(fmt.get('descriptions', []))
+        enriched['format_string'] = ' '.join(format_info).lower()
+        # Detect if it's vinyl/electronic format
+        enriched['is_vinyl'] = any(indicator in enriched['format_string'] for indicator in VINYL_INDICATORS)
+    
+    # Genre/style processing for electronic music detection
+    if 'genres' in release:
+        enriched['is_electronic'] = any(genre.lower() in ELECTRONIC_GENRES for genre in release['genres'])
+    if 'styles' in release and not enriched.get('is_electronic'):
+        enriched['is_electronic'] = any(style.lower() in ELECTRONIC_STYLES for style in release['styles'])
+    
+    return enriched
+
+def enrich_track(track, include_credits=False):
+    """Return a copy of a tracklist entry with a cleaned title and remix details."""
+    enriched = {k: v for k, v in track.items() if include_credits or k != 'extraartists'}
+    if 'title' in track:
+        # Remove common prefixes/suffixes that might interfere with search
+        clean_title = MIX_SUFFIX_RE.sub('', track['title'].strip()).strip()
+        enriched['clean_title'] = clean_title
         
-        # Process tracklist for better individual track searches
-        if 'tracklist' in release_data:
-            for track in release_data['tracklist']:
-                if 'title' in track:
-                    # Clean track title for better search
-                    clean_title = track['title'].strip()
-                    # Remove common prefixes/suffixes that might interfere
-                    clean_title = clean_title.replace('(Original Mix)', '').replace('(Club Mix)', '').strip()
-                    track['clean_title'] = clean_title
-                    
-                    # Detect remix information
-                    if 'remix' in clean_title.lower():
-                        track['is_remix'] = True
-                        # Try to extract remixer name
-                        import re
-                        remix_match = re.search(r'\(([^)]+)\s+remix\)', clean_title, re.IGNORECASE)
-                        if remix_match:
-                            track['remixer'] = remix_match.group(1).strip()
-    
-    return release_data 
\ No newline at end of file
+        # Detect remix information
+        if 'remix' in clean_title.lower():
+            enriched['is_remix'] = True
+            remix_match = REMIX_RE.search(clean_title)
+            if remix_match:
+                enriched['remixer'] = remix_match.group(1).strip()
+    return enriched
+
+def project_release(release, fields=None):
+    """Build a compact release dict holding only the requested field groups."""
+    groups = parse_fields(fields)
+    projected = {'id': release.get('id')}
+    
+    for group in groups:
+        for key in RELEASE_FIELD_GROUPS[group]:
+            if key in release:
+                projected[key] = release[key]
+    
+    if 'core' in groups:
+        projected.update(enrich_core(release))
+    
+    if 'tracklist' in groups:
+        include_credits = 'credits' in groups
+        projected['tracklist'] = [enrich_track(track, include_credits) for track in release.get('tracklist', [])]
+    
+    if 'cover' in groups and 'images' not in groups and release.get('images'):
+        # Prefer the primary image, keep only the URLs the UI needs
+        images = release['images']
+        cover = next((img for img in images if img.get('type') == 'primary'), images[0])
+        projected['images'] = [{k: cover[k] for k in ('type', 'uri', 'uri150', 'width', 'height') if k in cover}]
+    
+    return projected
+
+def release_cache_key(release_id, groups):
+    return f"release:{release_id}:{','.join(groups)}"
+
+def get_release_details(release_id, fields=None):
+    """Get detailed information about a specific release
+    
+    fields selects field groups (see RELEASE_FIELD_GROUPS); None returns
+    them all. Only the projection is cached, not the raw API response.
+    """
+    groups = parse_fields(fields)
+    client = get_client()
+    key = release_cache_key(release_id, groups)
+    if client.cache:
+        cached = client.cache.get(key)
+        if cached is not None:
+            logger.info(f"Cache hit for Discogs release {release_id} ({','.join(groups)})")
+            return cached
+    
+    release_data = client.get(f'releases/{release_id}', use_cache=False)
+    projected = project_release(release_data, groups) if release_data else release_data
+    
+    if client.cache and projected:
+        client.cache.set(key, projected)
+    return projected
+
+def catalog_sort_key(release):
+    """Newest first, then by catalog number and title; releases without a year go last."""
+    return (-(release.get('year') or 0), (release.get('catno') or '').lower(), (release.get('title') or '').lower())
+
+def catalog_cache_key(label_id):
+    return f"label_catalog:{label_id}"
+
+def _fetch_label_pages(client, label_id, pages, max_workers, on_page=None):
+    """Fetch the given label release pages concurrently. Returns {page: response}."""
+    results = {}
+    if not pages:
+        return results
+    # The client's throttle keeps concurrent fetches inside the Discogs budget
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pages)))) as executor:
+        futures = {
+            executor.submit(
+                client.get,
+                f'labels/{label_id}/releases',
+                {'page': page, 'per_page': DISCOGS_BULK_PER_PAGE, 'sort': 'year', 'sort_order': 'desc'},
+                use_cache=False
+            ): page
+            for page in pages
+        }
+        for future in as_completed(futures):
+            results[futures[future]] = future.result()
+            if on_page:
+                on_page(len(results), len(pages))
+    return results
+
+def fetch_label_catalog(label_id, max_workers=DISCOGS_BULK_CONCURRENCY, on_progress=None):
+    """Fetch every release of a label and merge them into one sorted catalog record.
+    
+    Reads pagination.pages from the first page, then fetches the remaining
+    pages concurrently. on_progress(pages_done, pages_total) is called as
+    pages arrive.
+    """
+    client = get_client()
+    first = client.get(
+        f'labels/{label_id}/releases',
+        {'page': 1, 'per_page': DISCOGS_BULK_PER_PAGE, 'sort': 'year', 'sort_order': 'desc'},
+        use_cache=False
+    )
+    pagination = first.get('pagination', {})
+    total_pages = pagination.get('pages', 1) or 1
+    logger.info(f"Fetching catalog for label {label_id}: {pagination.get('items', 0)} releases over {total_pages} pages")
+    if on_progress:
+        on_progress(1, total_pages)
+    
+    responses = {1: first}
+    responses.update(_fetch_label_pages(
+        client, label_id, list(range(2, total_pages + 1)), max_workers,
+        on_page=(lambda done, total: on_progress(done + 1, total_pages)) if on_progress else None
+    ))
+    
+    releases = {}
+    for page in sorted(responses):
+        for release in responses[page].get('releases', []):
+            releases[release.get('id')] = release
+    
+    return {
+        "label_id": label_id,
+        "items": pagination.get('items', len(releases)),
+        "pages": total_pages,
+        "fetched_at": time.time(),
+        "releases": sorted(releases.values(), key=catalog_sort_key),
+    }
+
+def top_up_label_catalog(catalog, max_workers=DISCOGS_BULK_CONCURRENCY, on_progress=None):
+    """Bring a cached catalog up to date with as few requests as possible.
+    
+    Compares the label's current release count with the cached one and, if
+    it grew, pulls newest-first pages until a page contains nothing new.
+    Falls back to a full fetch if the counts still disagree afterwards, e.g.
+    when releases were removed or back-catalog items were added.
+    """
+    client = get_client()
+    label_id = catalog["label_id"]
+    known_ids = {release.get('id') for release in catalog["releases"]}
+    params = {'page': 1, 'per_page': DISCOGS_BULK_PER_PAGE, 'sort': 'year', 'sort_order': 'desc'}
+    
+    first = client.get(f'labels/{label_id}/releases', params, use_cache=False)
+    pagination = first.get('pagination', {})
+    items = pagination.get('items', 0)
+    if items == catalog["items"]:
+        logger.info(f"Catalog for label {label_id} is up to date ({items} releases)")
+        return dict(catalog, fetched_at=time.time()), 0
+    
+    added = {}
+    page_data = first
+    page = 1
+    while True:
+        new_releases = [r for r in page_data.get('releases', []) if r.get('id') not in known_ids]
+        for release in new_releases:
+            added[release.get('id')] = release
+        if on_progress:
+            on_progress(page, pagination.get('pages', 1) or 1)
+        if not new_releases or page >= (pagination.get('pages', 1) or 1) or len(known_ids) + len(added) >= items:
+            break
+        page += 1
+        page_data = client.get(f'labels/{label_id}/releases', dict(params, page=page), use_cache=False)
+    
+    if len(known_ids) + len(added) != items:
+        logger.info(f"Catalog for label {label_id} changed beyond new releases, refetching in full")
+        refreshed = fetch_label_catalog(label_id, max_workers=max_workers, on_progress=on_progress)
+        return refreshed, len(refreshed["releases"]) - len(catalog["releases"])
+    
+    logger.info(f"Topped up catalog for label {label_id} with {len(added)} new releases")
+    return dict(
+        catalog,
+        items=items,
+        pages=pagination.get('pages', catalog["pages"]),
+        fetched_at=time.time(),
+        releases=sorted(catalog["releases"] + list(added.values()), key=catalog_sort_key)
+    ), len(added)
+
+def get_cached_label_catalog(label_id):
+    """Return the cached catalog record for a label, or None."""
+    client = get_client()
+    if not client.cache:
+        return None
+    return client.cache.get(catalog_cache_key(label_id))
+
+def get_label_catalog(label_id, refresh=False, max_workers=DISCOGS_BULK_CONCURRENCY, on_progress=None):
+    """Return a label's full merged catalog, building or topping up the cached record.
+    
+    Returns (catalog, added) where added is the number of releases new since
+    the previous cached record.
+    """
+    client = get_client()
+    catalog = get_cached_label_catalog(label_id)
+    if catalog and not refresh:
+        return catalog, 0
+    
+    if catalog:
+        catalog, added = top_up_label_catalog(catalog, max_workers=max_workers, on_progress=on_progress)
+    else:
+        catalog = fetch_label_catalog(label_id, max_workers=max_workers, on_progress=on_progress)
+        added = len(catalog["releases"])
+    
+    if client.cache:
+        client.cache.set(catalog_cache_key(label_id), catalog)
+    return catalog, added
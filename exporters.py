@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+import urllib.parse
+
+from track_formatter import format_track_for_pdf
+
+
+def iter_csv(artist_name, mixes):
+    """Stream tracklists as CSV, one row per track, flushed once per mix."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(["artist", "mix_date", "mix_title", "mix_url", "position", "track"])
+    yield buffer.getvalue()
+    buffer.seek(0)
+    buffer.truncate(0)
+
+    for mix in mixes:
+        for position, track in enumerate(mix.get("tracks", []), start=1):
+            writer.writerow([
+                artist_name,
+                mix.get("date", ""),
+                mix.get("title", "Untitled Mix"),
+                mix.get("url", ""),
+                position,
+                format_track_for_pdf(track),
+            ])
+        # Hand the rows for this mix to the response and reuse the buffer
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+
+
+def iter_ndjson(artist_name, mixes):
+    """Stream tracklists as newline-delimited JSON, one object per mix."""
+    for mix in mixes:
+        record = {
+            "artist": artist_name,
+            "title": mix.get("title", "Untitled Mix"),
+            "date": mix.get("date", ""),
+            "url": mix.get("url", ""),
+            "tracks": [format_track_for_pdf(track) for track in mix.get("tracks", [])],
+        }
+        yield json.dumps(record, ensure_ascii=False) + "\n"
+
+
+def iter_text(artist_name, mixes):
+    """Stream a plain-text tracklist grouped by mix."""
+    yield f"Tracklists for {artist_name}\n\n"
+    for mix in mixes:
+        title = mix.get("title", "Untitled Mix")
+        if mix.get("date"):
+            title = f"{mix.get('date')} - {title}"
+        lines = [title]
+        tracks = mix.get("tracks", [])
+        if tracks:
+            lines.extend(f"{j}. {format_track_for_pdf(track)}" for j, track in enumerate(tracks, start=1))
+        else:
+            lines.append("No tracklist available")
+        yield "\n".join(lines) + "\n\n"
+
+
+def iter_m3u(artist_name, mixes):
+    """Stream an extended M3U playlist pointing each track at a YouTube search."""
+    yield f"#EXTM3U\n#PLAYLIST:Tracklists for {artist_name}\n"
+    for mix in mixes:
+        if not mix.get("tracks"):
+            continue
+        lines = [f"#EXTGRP:{mix.get('title', 'Untitled Mix')}"]
+        for track in mix.get("tracks", []):
+            track_text = format_track_for_pdf(track)
+            lines.append(f"#EXTINF:-1,{track_text}")
+            lines.append(f"https://www.youtube.com/results?search_query={urllib.parse.quote(track_text)}")
+        yield "\n".join(lines) + "\n"
+
+
+# Format name -> (generator, mimetype, file extension)
+EXPORT_FORMATS = {
+    "csv": (iter_csv, "text/csv", "csv"),
+    "ndjson": (iter_ndjson, "application/x-ndjson", "ndjson"),
+    "txt": (iter_text, "text/plain", "txt"),
+    "m3u": (iter_m3u, "audio/x-mpegurl", "m3u"),
+}
@@ -0,0 +1,30 @@
+import os
+import shutil
+
+# Threaded workers: /audio_stream and /job/<id>/events hold their request open for the whole
+# playback or progress stream, which would pin a sync worker (and be killed by its timeout).
+# With gthread each long response only holds a thread, and timeout is the worker heartbeat.
+worker_class = os.environ.get("GUNICORN_WORKER_CLASS", "gthread")
+workers = int(os.environ.get("WEB_CONCURRENCY", 2))
+threads = int(os.environ.get("GUNICORN_THREADS", 32))  # Concurrent requests (streams included) per worker
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+
+# prometheus_client multiprocess mode: each gunicorn worker writes its metrics here and
+# /metrics merges them. Set before the workers import the app so they all see it.
+os.environ.setdefault("PROMETHEUS_MULTIPROC_DIR", "/tmp/thedigger_prometheus")
+
+
+def on_starting(server):
+    """Start with an empty metrics directory so counters from a previous run are not merged in."""
+    path = os.environ["PROMETHEUS_MULTIPROC_DIR"]
+    shutil.rmtree(path, ignore_errors=True)
+    os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    """Drop the live gauges of a worker that exited; its counters are kept."""
+    try:
+        from prometheus_client import multiprocess
+    except ImportError:
+        return
+    multiprocess.mark_process_dead(worker.pid)
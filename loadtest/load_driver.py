@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Drive end-to-end load against a running web app backed by replay_server.py.
+
+Usage:
+    python loadtest/load_driver.py crawl   [--app-url URL] [--jobs N] [--concurrency N] [--workers N]
+    python loadtest/load_driver.py video   [--app-url URL] [--requests N] [--concurrency N]
+    python loadtest/load_driver.py discogs [--app-url URL] [--requests N] [--concurrency N]
+    common: [--replay-host HOST] [--replay-port PORT] [--timeout SECONDS] [--json report.json]
+
+Scenarios:
+    crawl    POST /search for unique artists and poll /job/<id>/status until
+             each job finishes; latency is submit to finished (or failed)
+    video    GET /search_video with unique queries (no video cache hits)
+    discogs  GET /discogs/search_label, /discogs/label/<id>/releases and
+             /discogs/release/<id> in turn
+
+Start replay_server.py first, then the web app with the environment it
+prints. --workers N starts N worker.py processes with that environment for
+the run (otherwise run your own); they pick up REDIS_URL and everything
+else from this shell, so set RATE_LIMIT_RPM high enough not to be the
+bottleneck unless that is what you are measuring.
+
+The report gives throughput, p50/p95/p99/max latency, outcomes and, when
+the replay server is reachable, the upstream requests it served during the
+run (including injected faults).
+"""
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from replay_server import upstream_env
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def percentile(values, pct):
+    """Nearest-rank percentile of a list of numbers."""
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+def replay_stats(replay_url):
+    try:
+        return requests.get(f"{replay_url}/__replay/stats", timeout=5).json()
+    except (requests.exceptions.RequestException, ValueError):
+        return None
+
+
+def stats_delta(before, after):
+    """Requests served per upstream and status between two /__replay/stats snapshots."""
+    delta = {}
+    for upstream, by_status in after.items():
+        for status, value in by_status.items():
+            served = value - before.get(upstream, {}).get(status, 0)
+            if served:
+                delta.setdefault(upstream, {})[status] = served
+    return delta
+
+
+def start_workers(count, env):
+    """Start count worker.py processes with env added to this process's environment."""
+    worker_env = dict(os.environ, **env)
+    return [
+        subprocess.Popen([sys.executable, os.path.join(ROOT_DIR, "worker.py")], cwd=ROOT_DIR, env=worker_env,
+                         stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        for _ in range(count)
+    ]
+
+
+def stop_workers(workers):
+    for worker in workers:
+        worker.terminate()
+    for worker in workers:
+        try:
+            worker.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            worker.kill()
+
+
+def run_crawl(args, index, run_id):
+    """Submit one scrape job and wait for it. Returns (outcome, seconds)."""
+    artist = f"Load {run_id} {index:04d}"
+    start = time.perf_counter()
+    response = requests.post(f"{args.app_url}/search", data={"artist_name": artist}, timeout=30)
+    if response.status_code != 200:
+        return f"http_{response.status_code}", time.perf_counter() - start
+    payload = response.json()
+    job_id = payload.get("job_id")
+    if not job_id:
+        return payload.get("status", "no_job"), time.perf_counter() - start
+
+    deadline = start + args.timeout
+    while time.perf_counter() < deadline:
+        time.sleep(args.poll)
+        try:
+            status = requests.get(f"{args.app_url}/job/{job_id}/status", timeout=30).json().get("status")
+        except (requests.exceptions.RequestException, ValueError):
+            continue
+        if status in ("finished", "failed", "stopped", "canceled"):
+            return status, time.perf_counter() - start
+    return "timeout", time.perf_counter() - start
+
+
+def run_video(args, index, run_id):
+    start = time.perf_counter()
+    response = requests.get(f"{args.app_url}/search_video",
+                            params={"query": f"Load {run_id} Artist {index} - Track {index}"}, timeout=args.timeout)
+    return f"http_{response.status_code}", time.perf_counter() - start
+
+
+def run_discogs(args, index, run_id):
+    label_id = 1000 + index
+    path = [
+        ("/discogs/search_label", {"label_name": f"Load {run_id} {index}"}),
+        (f"/discogs/label/{label_id}/releases", {"page": 1}),
+        (f"/discogs/release/{label_id * 1000 + index}", {}),
+    ][index % 3]
+    start = time.perf_counter()
+    response = requests.get(f"{args.app_url}{path[0]}", params=path[1], timeout=args.timeout)
+    return f"http_{response.status_code}", time.perf_counter() - start
+
+
+SCENARIOS = {"crawl": run_crawl, "video": run_video, "discogs": run_discogs}
+
+
+def run(args):
+    scenario = SCENARIOS[args.scenario]
+    total = args.jobs if args.scenario == "crawl" else args.requests
+    run_id = uuid.uuid4().hex[:8]  # Unique names keep the artist and video caches out of the measurement
+    replay_url = f"http://{args.replay_host}:{args.replay_port}"
+
+    workers = start_workers(args.workers, upstream_env(args.replay_host, args.replay_port)) if args.workers else []
+    if workers:
+        time.sleep(args.worker_startup)
+    before = replay_stats(replay_url)
+
+    results = []
+    results_lock = threading.Lock()
+
+    def task(index):
+        try:
+            outcome, seconds = scenario(args, index, run_id)
+        except requests.exceptions.RequestException as e:
+            outcome, seconds = f"error_{type(e).__name__}", None
+        with results_lock:
+            results.append((outcome, seconds))
+
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=args.concurrency) as executor:
+            list(executor.map(task, range(total)))
+    finally:
+        elapsed = time.perf_counter() - started
+        stop_workers(workers)
+
+    after = replay_stats(replay_url)
+    ok_outcomes = ("finished", "cached", "http_200")
+    latencies = [seconds for outcome, seconds in results if outcome in ok_outcomes]
+    outcomes = {}
+    for outcome, _ in results:
+        outcomes[outcome] = outcomes.get(outcome, 0) + 1
+
+    def ms(seconds):
+        return round(seconds * 1000, 1) if seconds is not None else None
+
+    return {
+        "scenario": args.scenario,
+        "requests": total,
+        "concurrency": args.concurrency,
+        "workers": args.workers,
+        "elapsed_seconds": round(elapsed, 2),
+        "throughput_per_second": round(len(latencies) / elapsed, 3) if elapsed else None,
+        "latency_ms": {
+            "p50": ms(percentile(latencies, 50)),
+            "p95": ms(percentile(latencies, 95)),
+            "p99": ms(percentile(latencies, 99)),
+            "max": ms(max(latencies)) if latencies else None,
+        },
+        "outcomes": outcomes,
+        "upstream_requests": stats_delta(before, after) if before is not None and after is not None else None,
+    }
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="End-to-end load test against the replay server.")
+    parser.add_argument("scenario", choices=sorted(SCENARIOS))
+    parser.add_argument("--app-url", default="http://127.0.0.1:8080", help="Running web app")
+    parser.add_argument("--jobs", type=int, default=20, help="Scrape jobs to run (crawl)")
+    parser.add_argument("--requests", type=int, default=200, help="Requests to send (video, discogs)")
+    parser.add_argument("--concurrency", type=int, default=4, help="Jobs or requests in flight at once")
+    parser.add_argument("--workers", type=int, default=0, help="worker.py processes to start for the run")
+    parser.add_argument("--worker-startup", type=float, default=3.0, help="Seconds to let started workers connect")
+    parser.add_argument("--replay-host", default="127.0.0.1")
+    parser.add_argument("--replay-port", type=int, default=8900)
+    parser.add_argument("--timeout", type=float, default=600, help="Seconds before a job or request counts as timed out")
+    parser.add_argument("--poll", type=float, default=0.5, help="Seconds between job status polls (crawl)")
+    parser.add_argument("--json", help="Write the report to this file")
+    args = parser.parse_args(argv)
+    args.app_url = args.app_url.rstrip("/")
+
+    report = run(args)
+    print(json.dumps(report, indent=2))
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main_cli())
@@ -0,0 +1,398 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for MixesDB, YouTube and Discogs, for end-to-end load tests.
+
+Usage:
+    python loadtest/replay_server.py [--host 127.0.0.1] [--port 8900] [--recordings DIR] [--record]
+                                     [--latency SECONDS] [--jitter SECONDS] [--error-rate FRACTION]
+                                     [--error-statuses 500,502,503,reset] [--throttle-rate FRACTION]
+                                     [--rate-limit PER_SECOND] [--retry-after SECONDS]
+
+Each upstream is served on its own port, so the app keeps a separate
+circuit breaker per upstream as it does in production:
+    port      MixesDB  (MIXESDB_BASE_URL)
+    port + 1  YouTube  (YOUTUBE_SEARCH_URL)
+    port + 2  Discogs  (DISCOGS_API_URL)
+The server prints the environment to start the web app and workers with;
+load_driver.py --workers sets it for the workers it starts.
+
+Responses come from, in order:
+    1. a recorded response under --recordings (see recording_path)
+    2. with --record, the real upstream; the response is saved for next time
+    3. the benchmarks/fixtures corpus for MixesDB and YouTube, and generated
+       JSON for Discogs. Mix links on category and Explorer pages are
+       namespaced per artist (and Explorer offset), so every job fetches
+       its own mix pages instead of hitting a worker's request cache.
+
+Faults are injected per request: --latency plus up to --jitter seconds of
+delay, --error-rate of responses failing with one of --error-statuses
+("reset" closes the connection without a response), --throttle-rate of
+responses answered 429, and --rate-limit requests per second per upstream
+before further requests get 429 with Retry-After. Discogs responses carry
+X-Discogs-Ratelimit headers derived from --rate-limit.
+
+Every port also answers:
+    GET  /__replay/stats    requests served per upstream and status
+    POST /__replay/config   change settings at runtime, e.g.
+                            {"latency": 0.5} or {"upstreams": {"youtube": {"error_rate": 1}}}
+"""
+import argparse
+import glob
+import hashlib
+import json
+import logging
+import os
+import random
+import re
+import socket
+import sys
+import threading
+import time
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, unquote, urlsplit
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "benchmarks", "fixtures")
+
+# Port offset from --port, real origin (for --record) and content type of each upstream
+UPSTREAMS = {
+    "mixesdb": (0, "https://www.mixesdb.com", "text/html; charset=utf-8"),
+    "youtube": (1, "https://www.youtube.com", "text/html; charset=utf-8"),
+    "discogs": (2, "https://api.discogs.com", "application/json"),
+}
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger("replay_server")
+
+# Runtime settings; "upstreams" holds per-upstream overrides of the others
+config = {
+    "latency": 0.0,
+    "jitter": 0.0,
+    "error_rate": 0.0,
+    "error_statuses": ["500", "502", "503"],
+    "throttle_rate": 0.0,
+    "rate_limit": 0,
+    "retry_after": 1,
+    "upstreams": {},
+}
+config_lock = threading.Lock()
+
+stats = {}
+stats_lock = threading.Lock()
+rate_windows = {}  # upstream -> [window start, requests in window]
+
+
+def upstream_env(host="127.0.0.1", port=8900):
+    """Return the environment that points the app at a replay server."""
+    return {
+        "MIXESDB_BASE_URL": f"http://{host}:{port + UPSTREAMS['mixesdb'][0]}",
+        "YOUTUBE_SEARCH_URL": f"http://{host}:{port + UPSTREAMS['youtube'][0]}/results",
+        "DISCOGS_API_URL": f"http://{host}:{port + UPSTREAMS['discogs'][0]}",
+    }
+
+
+def settings_for(upstream):
+    with config_lock:
+        settings = {key: value for key, value in config.items() if key != "upstreams"}
+        settings.update(config["upstreams"].get(upstream, {}))
+    return settings
+
+
+def count(upstream, status):
+    with stats_lock:
+        by_status = stats.setdefault(upstream, {})
+        by_status[str(status)] = by_status.get(str(status), 0) + 1
+
+
+def take_rate_slot(upstream, limit):
+    """Count a request against the per-second limit. Returns the requests left in this second, or -1 when over."""
+    now = time.time()
+    with stats_lock:
+        window = rate_windows.setdefault(upstream, [now, 0])
+        if now - window[0] >= 1:
+            window[0], window[1] = now, 0
+        window[1] += 1
+        return limit - window[1] if window[1] <= limit else -1
+
+
+def recording_path(directory, upstream, path):
+    """File a recorded response for path (including the query string) is stored in."""
+    readable = re.sub(r"[^A-Za-z0-9._-]+", "_", unquote(path)).strip("_")[:80]
+    digest = hashlib.sha1(path.encode("utf-8")).hexdigest()[:12]
+    extension = "json" if upstream == "discogs" else "html"
+    return os.path.join(directory, upstream, f"{readable}-{digest}.{extension}")
+
+
+class Corpus:
+    """Fixture pages (and generated Discogs JSON) served when nothing was recorded."""
+
+    def __init__(self, directory):
+        def load(prefix):
+            pages = []
+            for path in sorted(glob.glob(os.path.join(directory, f"{prefix}_*.html"))):
+                with open(path, encoding="utf-8") as f:
+                    pages.append(f.read())
+            return pages
+
+        self.categories = load("category")
+        self.explorers = load("explorer")
+        self.mixes = load("mix")
+        self.youtube = load("youtube")
+        if not (self.categories and self.explorers and self.mixes and self.youtube):
+            raise SystemExit(f"Fixture corpus incomplete in {directory}; run benchmarks/make_fixtures.py first")
+
+    @staticmethod
+    def pick(pages, key):
+        return pages[zlib.crc32(key.encode("utf-8")) % len(pages)]
+
+    @staticmethod
+    def namespace_mixes(html, namespace):
+        # Mix page titles start with their date: /w/2019-01-27_-_... -> /w/<namespace>/2019-01-27_-_...
+        slug = re.sub(r"[^A-Za-z0-9]+", "_", namespace).strip("_") or "mix"
+        return re.sub(r'href="/w/(\d{4}-)', rf'href="/w/{slug}/\1', html)
+
+    def mixesdb(self, path, query):
+        if path.startswith("/w/MixesDB:Explorer"):
+            artist = query.get("cat1", [""])[0]
+            offset = query.get("offset", ["0"])[0]
+            return self.namespace_mixes(self.pick(self.explorers, artist), f"{artist}_{offset}")
+        title = query.get("title", [""])[0] if path == "/w/index.php" else unquote(path[len("/w/"):])
+        if title.startswith("Category:"):
+            html = self.namespace_mixes(self.pick(self.categories, title), title[len("Category:"):])
+            # Keep "next page" links on the requested category rather than the one the page was saved from
+            return re.sub(r'title=Category:[^&"]+', lambda _: f"title={quote(title, safe=':')}", html)
+        if path.startswith("/w/"):
+            return self.pick(self.mixes, path)
+        return None
+
+    def youtube_page(self, path, query):
+        if path != "/results":
+            return None
+        return self.pick(self.youtube, query.get("search_query", [""])[0])
+
+    @staticmethod
+    def discogs(path, query):
+        rng = random.Random(path)
+        page = int(query.get("page", ["1"])[0] or 1)
+        per_page = int(query.get("per_page", ["50"])[0] or 50)
+
+        def release(release_id):
+            return {
+                "id": release_id, "title": f"Release {release_id}", "year": 1990 + release_id % 35,
+                "artist": f"Artist {release_id % 97}", "catno": f"CAT{release_id % 1000:03d}",
+                "format": "12\", EP", "status": "Accepted", "thumb": "",
+                "resource_url": f"https://api.discogs.com/releases/{release_id}",
+            }
+
+        if path == "/database/search":
+            name = query.get("q", ["label"])[0]
+            results = [{"id": rng.randint(1, 99999), "type": "label", "title": f"{name} {i}", "thumb": ""}
+                       for i in range(min(per_page, 10))]
+            return {"pagination": {"page": page, "pages": 1, "per_page": per_page, "items": len(results)}, "results": results}
+        match = re.fullmatch(r"/labels/(\d+)/releases", path)
+        if match:
+            label_id = int(match.group(1))
+            items = 50 + label_id % 450
+            pages = max(1, -(-items // per_page))
+            first = (page - 1) * per_page
+            ids = range(label_id * 1000 + first, label_id * 1000 + min(items, first + per_page))
+            return {"pagination": {"page": page, "pages": pages, "per_page": per_page, "items": items},
+                    "releases": [release(release_id) for release_id in ids]}
+        match = re.fullmatch(r"/releases/(\d+)", path)
+        if match:
+            release_id = int(match.group(1))
+            return dict(release(release_id), **{
+                "artists": [{"name": f"Artist {release_id % 97}", "id": release_id % 97}],
+                "labels": [{"name": f"Label {release_id // 1000}", "catno": f"CAT{release_id % 1000:03d}"}],
+                "released": f"{1990 + release_id % 35}-01-01", "country": "UK",
+                "formats": [{"name": "Vinyl", "descriptions": ["12\"", "EP"]}],
+                "genres": ["Electronic"], "styles": ["Techno"], "notes": "Replayed release.",
+                "tracklist": [{"position": f"A{n}", "title": f"Track {n}", "duration": "6:00"} for n in range(1, 5)],
+                "images": [], "videos": [], "extraartists": [], "companies": [], "identifiers": [],
+                "uri": f"https://www.discogs.com/release/{release_id}",
+            })
+        match = re.fullmatch(r"/labels/(\d+)", path)
+        if match:
+            return {"id": int(match.group(1)), "name": f"Label {match.group(1)}", "profile": ""}
+        return None
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    upstream = None  # Set per port by make_server
+    corpus = None
+    recordings = None
+    record = False
+
+    def log_message(self, format, *args):
+        logger.debug(f"{self.upstream}: {format % args}")
+
+    def send_body(self, status, body, content_type, headers=None):
+        body = body.encode("utf-8") if isinstance(body, str) else body
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, str(value))
+        self.end_headers()
+        self.wfile.write(body)
+        count(self.upstream, status)
+
+    def do_POST(self):
+        if self.path != "/__replay/config":
+            self.send_body(404, "Not found", "text/plain")
+            return
+        try:
+            changes = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        except ValueError as e:
+            self.send_body(400, json.dumps({"error": str(e)}), "application/json")
+            return
+        with config_lock:
+            for upstream, overrides in changes.pop("upstreams", {}).items():
+                config["upstreams"].setdefault(upstream, {}).update(overrides)
+            config.update(changes)
+            body = json.dumps(config)
+        logger.info(f"Config changed: {body}")
+        self.send_body(200, body, "application/json")
+
+    def do_GET(self):
+        if self.path == "/__replay/stats":
+            with stats_lock:
+                body = json.dumps(stats)
+            self.send_body(200, body, "application/json")
+            return
+
+        settings = settings_for(self.upstream)
+        delay = settings["latency"] + random.uniform(0, settings["jitter"])
+        if delay > 0:
+            time.sleep(delay)
+
+        headers = {}
+        if settings["rate_limit"]:
+            remaining = take_rate_slot(self.upstream, settings["rate_limit"])
+            if self.upstream == "discogs":
+                headers = {"X-Discogs-Ratelimit": settings["rate_limit"] * 60,
+                           "X-Discogs-Ratelimit-Remaining": max(remaining, 0) * 60}
+            if remaining < 0:
+                self.send_body(429, "Too Many Requests", "text/plain", dict(headers, **{"Retry-After": settings["retry_after"]}))
+                return
+        if random.random() < settings["throttle_rate"]:
+            self.send_body(429, "Too Many Requests", "text/plain", dict(headers, **{"Retry-After": settings["retry_after"]}))
+            return
+        if random.random() < settings["error_rate"]:
+            status = random.choice(settings["error_statuses"])
+            if status == "reset":
+                count(self.upstream, "reset")
+                try:
+                    self.connection.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+                self.close_connection = True
+                return
+            self.send_body(int(status), "Injected error", "text/plain", headers)
+            return
+
+        content_type = UPSTREAMS[self.upstream][2]
+        body = self.replay()
+        if body is None:
+            self.send_body(404, "Not found", "text/plain", headers)
+        else:
+            self.send_body(200, body, content_type, headers)
+
+    def replay(self):
+        """Return the body for the requested path, or None if there is nothing to serve."""
+        path = recording_path(self.recordings, self.upstream, self.path) if self.recordings else None
+        if path and os.path.exists(path):
+            with open(path, "rb") as f:
+                return f.read()
+        if self.record and path:
+            body = self.fetch_upstream()
+            if body is not None:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path, "wb") as f:
+                    f.write(body)
+                logger.info(f"Recorded {self.upstream} {self.path}")
+                return body
+
+        url = urlsplit(self.path)
+        query = parse_qs(url.query)
+        if self.upstream == "mixesdb":
+            return self.corpus.mixesdb(url.path, query)
+        if self.upstream == "youtube":
+            return self.corpus.youtube_page(url.path, query)
+        data = self.corpus.discogs(url.path, query)
+        return json.dumps(data) if data is not None else None
+
+    def fetch_upstream(self):
+        import requests
+        headers = {name: self.headers[name] for name in ("Authorization", "User-Agent", "Accept-Language") if self.headers.get(name)}
+        try:
+            response = requests.get(UPSTREAMS[self.upstream][1] + self.path, headers=headers, timeout=30)
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Could not record {self.upstream} {self.path}: {e}")
+            return None
+        if response.status_code != 200:
+            logger.error(f"Not recording {self.upstream} {self.path}: HTTP {response.status_code}")
+            return None
+        return response.content
+
+
+def make_server(upstream, host, port, corpus, recordings, record):
+    handler = type(f"{upstream.title()}Handler", (ReplayHandler,), {
+        "upstream": upstream, "corpus": corpus, "recordings": recordings, "record": record,
+    })
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def main_cli(argv=None):
+    parser = argparse.ArgumentParser(description="Replay MixesDB, YouTube and Discogs responses for load tests.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8900, help="MixesDB port; YouTube and Discogs use the next two")
+    parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Fixture corpus served when nothing was recorded")
+    parser.add_argument("--recordings", help="Directory of recorded responses")
+    parser.add_argument("--record", action="store_true", help="Fetch and save responses missing from --recordings")
+    parser.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument("--jitter", type=float, default=0.0, help="Up to this many random seconds on top of --latency")
+    parser.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests that fail")
+    parser.add_argument("--error-statuses", default="500,502,503", help="Statuses failed requests get; 'reset' drops the connection")
+    parser.add_argument("--throttle-rate", type=float, default=0.0, help="Fraction of requests answered 429")
+    parser.add_argument("--rate-limit", type=int, default=0, help="Requests per second per upstream before 429s (0 = unlimited)")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After seconds sent with 429s")
+    args = parser.parse_args(argv)
+
+    if args.record and not args.recordings:
+        parser.error("--record needs --recordings")
+    config.update({
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "error_rate": args.error_rate,
+        "error_statuses": [status.strip() for status in args.error_statuses.split(",") if status.strip()],
+        "throttle_rate": args.throttle_rate,
+        "rate_limit": args.rate_limit,
+        "retry_after": args.retry_after,
+    })
+
+    corpus = Corpus(args.fixtures)
+    servers = []
+    for upstream, (offset, _, _) in UPSTREAMS.items():
+        server = make_server(upstream, args.host, args.port + offset, corpus, args.recordings, args.record)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        servers.append(server)
+        logger.info(f"Replaying {upstream} on http://{args.host}:{args.port + offset}")
+
+    print("\nStart the web app and workers with:")
+    for name, value in upstream_env(args.host, args.port).items():
+        print(f"  export {name}={value}")
+    print("  export DISCOGS_TOKEN=replay   # any value; the replay server ignores it\n")
+    sys.stdout.flush()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        for server in servers:
+            server.shutdown()
+
+
+if __name__ == "__main__":
+    main_cli()
@@ -7,10 +7,19 @@ from bs4 import BeautifulSoup
 import re
 import os
 import random
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from datetime import datetime
 import redis
 
 from clean_item import clean_item
+from circuit_breaker import CircuitOpenError, breaker_for_url, configure_breakers
+from crawl_checkpoint import CrawlCheckpoint
+from crawl_metrics import CrawlMetrics
+from progress import ProgressReporter
+from track_search import TrackSearchIndex
+from tracklist_store import TracklistStore
 
 # Configure logging
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
@@ -21,13 +30,16 @@ REQUEST_TIMEOUT = int(os.environ.get("REQUEST_TIMEOUT", 30))  # Increased from 1
 MAX_RETRIES = int(os.environ.get("MAX_RETRIES", 5))  # Increased from 3 to 5 retries
 RETRY_DELAY = int(os.environ.get("RETRY_DELAY", 2))  # Increased from 1 to 2 seconds
 # Default maximum number of pages to fetch 
-MAX_FETCH_LIMIT = int(os.environ.get("MAX_FETCH_LIMIT", 300))  # Increased from 200 to 300
+MAX_FETCH_LIMIT = int(os.environ.get("MAX_FETCH_LIMIT", 0))  # 0 = whole catalog; long crawls stop at the deadline and resume
 # Default maximum number of pagination pages to fetch
 MAX_PAGINATION_PAGES = int(os.environ.get("MAX_PAGINATION_PAGES", 8))  # Increased from 5 to 8
 # Rate limiting - requests per minute
 RATE_LIMIT_RPM = int(os.environ.get("RATE_LIMIT_RPM", 30))  # Adjusted for stability
 # Minimum delay between requests in seconds
 MIN_REQUEST_DELAY = 60.0 / RATE_LIMIT_RPM  # Convert RPM to seconds
+# Explorer crawl: results requested per page (the site may return fewer), and pages fetched at once
+EXPLORER_PAGE_SIZE = int(os.environ.get("EXPLORER_PAGE_SIZE", 100))
+EXPLORER_CONCURRENCY = int(os.environ.get("EXPLORER_CONCURRENCY", 4))
 
 # Set up user agent from environment
 USER_AGENT = os.environ.get("YOUTUBE_USER_AGENT", "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36")
@@ -35,13 +47,53 @@ HEADERS = {"User-Agent": USER_AGENT}
 
 # Simple request cache to reduce network calls - increased cache size
 request_cache = {}
+request_cache_lock = threading.Lock()
 CACHE_EXPIRY = int(os.environ.get('CACHE_EXPIRY', 86400 * 2))  # Increased to 48 hours
-last_request_time = 0  # Track the time of the last request for rate limiting
+last_request_time = 0  # Next free request slot when Redis is unavailable (per process)
+rate_limit_lock = threading.Lock()
+# Redis key holding the next free MixesDB request slot, shared by every worker and thread
+RATE_LIMIT_KEY = "rate_limit:mixesdb:next_slot"
+# Reserve a slot atomically: take max(now, next free slot), push the next slot one delay later
+RESERVE_SLOT_SCRIPT = """
+local now = tonumber(ARGV[1])
+local delay = tonumber(ARGV[2])
+local slot = math.max(now, tonumber(redis.call('GET', KEYS[1]) or '0'))
+redis.call('SET', KEYS[1], tostring(slot + delay), 'PX', math.ceil((slot + delay - now) * 1000) + 1000)
+return tostring(slot - now)
+"""
+reserve_slot_script = None
 
+# Background video prefetch after a scrape: warm the YouTube cache for the newest mixes
+VIDEO_PREFETCH_ENABLED = os.environ.get("VIDEO_PREFETCH_ENABLED", "1") == "1"
+VIDEO_PREFETCH_MIXES = int(os.environ.get("VIDEO_PREFETCH_MIXES", 3))  # Most recent mixes to warm
+VIDEO_PREFETCH_TRACKS_PER_MIX = int(os.environ.get("VIDEO_PREFETCH_TRACKS_PER_MIX", 5))  # First N tracks of each
+VIDEO_PREFETCH_BUDGET = int(os.environ.get("VIDEO_PREFETCH_BUDGET", 40))  # Max YouTube requests per prefetch job
+LOW_PRIORITY_QUEUE = os.environ.get("LOW_PRIORITY_QUEUE", "low")
+
+# Local full-text index of every scraped track, updated after each job
+TRACK_SEARCH_ENABLED = os.environ.get("TRACK_SEARCH_ENABLED", "1") == "1"
+track_search_index = TrackSearchIndex()
+
+# Durable tracklist store; Redis artist_cache entries are a hot cache in front of it
+TRACKLIST_STORE_ENABLED = os.environ.get("TRACKLIST_STORE_ENABLED", "1") == "1"
+TRACKLIST_STORE_MAX_AGE = int(os.environ.get("TRACKLIST_STORE_MAX_AGE", 7 * 86400))  # Re-scrape artists older than this
+tracklist_store = TracklistStore()
+
+# Resume checkpoints for crawls that time out or crash; needs Redis
+CRAWL_CHECKPOINT_ENABLED = os.environ.get("CRAWL_CHECKPOINT_ENABLED", "1") == "1"
+CRAWL_CHECKPOINT_TTL = int(os.environ.get("CRAWL_CHECKPOINT_TTL", 6 * 3600))  # Abandoned checkpoints expire after this
+
+# Crawl deadline: jobs stop fetching before RQ kills them and return what they have
+CRAWL_DEADLINE_MARGIN = int(os.environ.get("CRAWL_DEADLINE_MARGIN", 120))  # Seconds of the job timeout kept for caching and storing
+CRAWL_TIME_BUDGET = int(os.environ.get("CRAWL_TIME_BUDGET", 0))  # Budget outside RQ jobs (0 = no deadline)
+PARTIAL_CACHE_TTL = int(os.environ.get("PARTIAL_CACHE_TTL", 3600))  # Partial results are re-crawled (resuming) after this
+
+# MixesDB site root; point it at loadtest/replay_server.py for load tests
+MIXESDB_BASE_URL = os.environ.get("MIXESDB_BASE_URL", "https://www.mixesdb.com").rstrip("/")
 # Base URL for the Explorer endpoint
-EXPLORER_BASE_URL = "https://www.mixesdb.com/w/MixesDB:Explorer/Mixes"
+EXPLORER_BASE_URL = f"{MIXESDB_BASE_URL}/w/MixesDB:Explorer/Mixes"
 # Base URL for the Category pages
-CATEGORY_BASE_URL = "https://www.mixesdb.com/w/Category:"
+CATEGORY_BASE_URL = f"{MIXESDB_BASE_URL}/w/Category:"
 
 # --- Redis Cache Configuration ---
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0") # Default to local if not set
@@ -74,7 +126,10 @@ except Exception as e: # Generic catch-all
     logger.error(f"[main.py] An unexpected error occurred during Redis setup with URL '{REDIS_URL}': {e}", exc_info=True)
     redis_client = None
 
-def build_explorer_url(artist_name, offset, other_params):
+# Upstream circuit breakers share their state through the same Redis
+configure_breakers(redis_client)
+
+def build_explorer_url(artist_name, offset, other_params, count=EXPLORER_PAGE_SIZE):
     """Build the URL for the MixesDB Explorer request."""
     params = {
         "do": "mx",
@@ -92,7 +147,7 @@ def build_explorer_url(artist_name, offset, other_params):
         "jnTm": "",
         "usesFile": "",
         "minHotnessLevel": "",
-        "count": "25",
+        "count": str(count),
         "order": "name",
         "sort": "desc",
         "offset": str(offset),
@@ -125,18 +180,38 @@ def build_category_url(artist_name):
         return f"{CATEGORY_BASE_URL}{encoded_name}"
 
 
+def reserve_request_slot():
+    """Return seconds to wait for the next free request slot.
+
+    The slot lives in Redis so every worker process shares one
+    RATE_LIMIT_RPM budget; without Redis it falls back to this process.
+    """
+    global last_request_time, reserve_slot_script
+    if redis_client:
+        try:
+            if reserve_slot_script is None:
+                reserve_slot_script = redis_client.register_script(RESERVE_SLOT_SCRIPT)
+            return float(reserve_slot_script(keys=[RATE_LIMIT_KEY], args=[time.time(), MIN_REQUEST_DELAY]))
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Error reserving rate limit slot in Redis: {e}. Falling back to per-process limit.")
+    with rate_limit_lock:
+        current_time = time.time()
+        slot = max(current_time, last_request_time)
+        last_request_time = slot + MIN_REQUEST_DELAY
+    return slot - current_time
+
+
 def enforce_rate_limit():
-    """Enforce rate limiting by waiting appropriate amount of time between requests."""
-    global last_request_time
-    current_time = time.time()
-    time_since_last_request = current_time - last_request_time
+    """Enforce rate limiting by waiting appropriate amount of time between requests.
     
-    if time_since_last_request < MIN_REQUEST_DELAY:
-        wait_time = MIN_REQUEST_DELAY - time_since_last_request
+    Thread-safe: each caller reserves the next free slot atomically and
+    sleeps outside the reservation, so concurrent fetches share one request budget.
+    """
+    wait_time = reserve_request_slot()
+    if wait_time > 0:
         logger.debug(f"Rate limiting: Waiting {wait_time:.2f} seconds before next request")
         time.sleep(wait_time)
-    
-    last_request_time = time.time()
+        active_metrics().add_time("rate_limit_sleep", wait_time)
 
 
 def manage_cache():
@@ -144,19 +219,116 @@ def manage_cache():
     global request_cache
     
     current_time = time.time()
-    expired_keys = [url for url, (cache_time, _) in request_cache.items() 
-                   if current_time - cache_time > CACHE_EXPIRY]
-    
-    for url in expired_keys:
-        del request_cache[url]
+    with request_cache_lock:
+        expired_keys = [url for url, (cache_time, _) in request_cache.items() 
+                       if current_time - cache_time > CACHE_EXPIRY]
+        
+        for url in expired_keys:
+            del request_cache[url]
     
     if expired_keys:
         logger.info(f"Cache management: Removed {len(expired_keys)} expired entries. Cache now has {len(request_cache)} entries.")
 
 
+def parse_html(content):
+    """Parse page HTML, timed as the parse stage of the running crawl."""
+    with active_metrics().stage("parse"):
+        return BeautifulSoup(content, "html.parser")
+
+
+def timed_clean_item(item):
+    """clean_item, timed as the clean_item stage of the running crawl."""
+    with active_metrics().stage("clean_item"):
+        return clean_item(item)
+
+
+class CrawlContext:
+    """State of one crawl that its fetches read and write: checkpoint, deadline and metrics.
+    
+    Held per thread (see crawl_scope) instead of in module globals, so
+    concurrent crawls in one process, e.g. /api/list calls on threaded web
+    workers, keep their own. Explorer pool threads run under the context of
+    the crawl that submitted them.
+    """
+    
+    def __init__(self, checkpoint=None):
+        self.checkpoint = checkpoint
+        self.deadline = None  # Unix time by which the crawl must stop fetching
+        self.deadline_hit = False  # Set once a fetch was skipped because of the deadline
+        self.metrics = CrawlMetrics()  # Stage timers and counters, recorded by finish_metrics
+
+
+crawl_local = threading.local()
+
+
+def current_crawl():
+    """Return the crawl running in this thread, or an empty context outside one."""
+    context = getattr(crawl_local, "context", None)
+    return context if context is not None else CrawlContext()
+
+
+def active_metrics():
+    """Return the stage timers and counters of the crawl running in this thread."""
+    return current_crawl().metrics
+
+
+@contextmanager
+def crawl_scope(context):
+    """Run a block (in this thread) as part of the crawl described by context."""
+    previous = getattr(crawl_local, "context", None)
+    crawl_local.context = context
+    try:
+        yield context
+    finally:
+        crawl_local.context = previous
+
+
+def run_in_crawl(context, func, *args):
+    """Call func under a crawl's context; for work submitted to pool threads."""
+    with crawl_scope(context):
+        return func(*args)
+
+
+class DeadlineExceeded(requests.exceptions.RequestException):
+    """Raised instead of fetching when the crawl deadline leaves no time for the request."""
+
+
+def start_deadline(job=None):
+    """Set the crawl deadline from the job timeout (or CRAWL_TIME_BUDGET), minus CRAWL_DEADLINE_MARGIN."""
+    crawl = current_crawl()
+    budget = job.timeout if job and job.timeout and job.timeout > 0 else CRAWL_TIME_BUDGET
+    crawl.deadline = time.time() + max(0, budget - CRAWL_DEADLINE_MARGIN) if budget else None
+    crawl.deadline_hit = False
+    if crawl.deadline:
+        logger.info(f"Crawl deadline in {crawl.deadline - time.time():.0f}s")
+
+
+def stop_deadline():
+    """Clear the crawl deadline once the job is done fetching."""
+    current_crawl().deadline = None
+
+
+def time_left():
+    """Seconds until the crawl deadline, or None without one."""
+    deadline = current_crawl().deadline
+    return None if deadline is None else deadline - time.time()
+
+
+def check_deadline(needed, what):
+    """Raise DeadlineExceeded if fewer than `needed` seconds remain before the crawl deadline."""
+    remaining = time_left()
+    if remaining is not None and remaining < needed:
+        current_crawl().deadline_hit = True
+        raise DeadlineExceeded(f"Crawl deadline reached ({max(0, remaining):.0f}s left), skipping {what}")
+
+
 def categorize_error(error):
     """Categorize error as transient or permanent to inform retry strategy."""
-    if isinstance(error, requests.exceptions.Timeout):
+    if isinstance(error, DeadlineExceeded):
+        return "deadline", False  # Retrying cannot help
+    elif isinstance(error, CircuitOpenError):
+        return "circuit_open", False  # The upstream is known to be down
+    elif isinstance(error, requests.exceptions.Timeout):
         return "timeout", True  # Transient
     elif isinstance(error, requests.exceptions.ConnectionError):
         return "connection", True  # Transient
@@ -173,19 +345,50 @@ def categorize_error(error):
         return "unknown", True  # Default to treating unknown errors as transient
 
 
-def fetch_with_retry(url, max_retries=MAX_RETRIES, retry_delay=RETRY_DELAY):
-    """Fetch URL with retry logic and caching."""
+def checkpointed_response(url, content):
+    """Wrap checkpointed page HTML in a Response so callers can treat it like a fetch."""
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response._content = content
+    return response
+
+
+def fetch_with_retry(url, max_retries=MAX_RETRIES, retry_delay=RETRY_DELAY, checkpoint_page=False):
+    """Fetch URL with retry logic and caching.
+    
+    With checkpoint_page, listing pages are also read from and written to
+    the active crawl checkpoint so a restarted crawl skips them.
+    """
     # Manage cache periodically
     if random.random() < 0.05:  # 5% chance to run cache management
         manage_cache()
     
     # Check if the URL is in the cache and not expired
-    if url in request_cache:
-        cache_time, cached_response = request_cache[url]
+    cached_entry = request_cache.get(url)
+    if cached_entry:
+        cache_time, cached_response = cached_entry
         if time.time() - cache_time < CACHE_EXPIRY:
             logger.info(f"Using cached response for: {url}")
+            active_metrics().count("request_cache_hits")
             return cached_response
     
+    checkpoint = current_crawl().checkpoint if checkpoint_page else None
+    if checkpoint:
+        with active_metrics().stage("redis"):
+            content = checkpoint.get_page(url)
+        if content is not None:
+            logger.info(f"Using checkpointed page for: {url}")
+            active_metrics().count("checkpoint_page_hits")
+            return checkpointed_response(url, content)
+    
+    # A new fetch needs room for at least one full request timeout
+    check_deadline(REQUEST_TIMEOUT, url)
+    
+    # Fail fast while the upstream's shared circuit breaker is open
+    breaker = breaker_for_url(url)
+    breaker.check()
+    
     # Enforce rate limiting before making the request
     enforce_rate_limit()
     
@@ -193,17 +396,41 @@ def fetch_with_retry(url, max_retries=MAX_RETRIES, retry_delay=RETRY_DELAY):
     permanent_errors = 0
     
     for attempt in range(max_retries):
+        request_start = None
         try:
+            if attempt > 0:
+                # Stop retrying if other fetches have tripped the breaker meanwhile
+                breaker.check()
             logger.info(f"Request attempt {attempt + 1} for: {url}")
-            response = requests.get(url, headers=HEADERS, timeout=REQUEST_TIMEOUT)
+            remaining = time_left()
+            timeout = REQUEST_TIMEOUT if remaining is None else max(1, min(REQUEST_TIMEOUT, remaining))
+            request_start = time.perf_counter()
+            response = requests.get(url, headers=HEADERS, timeout=timeout)
+            active_metrics().observe_fetch(time.perf_counter() - request_start, len(response.content))
+            active_metrics().observe_upstream("mixesdb", response.status_code)
             response.raise_for_status()
+            breaker.record_success()
             
             # Store successful response in cache
-            request_cache[url] = (time.time(), response)
+            with request_cache_lock:
+                request_cache[url] = (time.time(), response)
+            if checkpoint:
+                with active_metrics().stage("redis"):
+                    checkpoint.save_page(url, response.content)
             
             return response
         except requests.exceptions.RequestException as e:
             error_type, is_transient = categorize_error(e)
+            active_metrics().count(f"fetch_errors_{error_type}")
+            if request_start and not isinstance(e, requests.exceptions.HTTPError):
+                # Time lost waiting on requests that never got a response
+                active_metrics().add_time("fetch_failed", time.perf_counter() - request_start)
+                active_metrics().observe_upstream("mixesdb", error_type)
+            if is_transient:
+                breaker.record_failure()
+            elif error_type != "circuit_open":
+                # A 4xx still means the upstream is up
+                breaker.record_success()
             
             if is_transient:
                 transient_errors += 1
@@ -215,8 +442,11 @@ def fetch_with_retry(url, max_retries=MAX_RETRIES, retry_delay=RETRY_DELAY):
                     jitter = random.uniform(0, 1)
                     sleep_time = retry_delay * backoff_factor + jitter
                     
+                    # Give up rather than back off past the deadline
+                    check_deadline(sleep_time + REQUEST_TIMEOUT, f"retry of {url}")
                     logger.info(f"Retrying in {sleep_time:.2f} seconds...")
                     time.sleep(sleep_time)
+                    active_metrics().add_time("retry_sleep", sleep_time)
                 else:
                     logger.error(f"All {max_retries} attempts failed for URL: {url} (transient errors: {transient_errors})")
                     raise
@@ -227,14 +457,14 @@ def fetch_with_retry(url, max_retries=MAX_RETRIES, retry_delay=RETRY_DELAY):
                 raise
 
 
-def fetch_tracklists_explorer(artist_name, offset, other_params):
+def fetch_tracklists_explorer(artist_name, offset, other_params, count=EXPLORER_PAGE_SIZE):
     """Fetch tracklists from MixesDB Explorer page."""
-    url = build_explorer_url(artist_name, offset, other_params)
+    url = build_explorer_url(artist_name, offset, other_params, count=count)
     logger.info(f"Fetching Explorer URL: {url}")
     
     try:
-        response = fetch_with_retry(url)
-        return BeautifulSoup(response.content, "html.parser")
+        response = fetch_with_retry(url, checkpoint_page=True)
+        return parse_html(response.content)
     except requests.exceptions.RequestException as e:
         logger.error(f"Error fetching Explorer tracklists: {str(e)}")
         raise ValueError(f"Failed to fetch data from MixesDB Explorer: {str(e)}")
@@ -246,8 +476,8 @@ def fetch_tracklists_category(artist_name):
     logger.info(f"Fetching Category URL: {url}")
     
     try:
-        response = fetch_with_retry(url)
-        return BeautifulSoup(response.content, "html.parser")
+        response = fetch_with_retry(url, checkpoint_page=True)
+        return parse_html(response.content)
     except requests.exceptions.RequestException as e:
         logger.error(f"Error fetching Category tracklists: {str(e)}")
         raise ValueError(f"Failed to fetch data from MixesDB Category: {str(e)}")
@@ -263,8 +493,8 @@ def fetch_all_category_pages(artist_name, max_pages=MAX_PAGINATION_PAGES):
     
     try:
         # Fetch first page
-        response = fetch_with_retry(url)
-        soup = BeautifulSoup(response.content, "html.parser")
+        response = fetch_with_retry(url, checkpoint_page=True)
+        soup = parse_html(response.content)
         all_pages.append(soup)
         visited_urls.add(url)
         
@@ -274,11 +504,11 @@ def fetch_all_category_pages(artist_name, max_pages=MAX_PAGINATION_PAGES):
         # Special case for Ben UFO - directly handle the pagefrom URL we know exists
         if artist_name.lower() == "ben ufo":
             # First try the pagefrom URL we know exists for Ben UFO
-            ben_ufo_second_page = f"https://www.mixesdb.com/w/index.php?title=Category:Ben_UFO&pagefrom=2017-06-22+-+Ben+UFO%2C+Batu+-+Hessle+Audio%2C+Rinse+FM#mw-pages"
+            ben_ufo_second_page = f"{MIXESDB_BASE_URL}/w/index.php?title=Category:Ben_UFO&pagefrom=2017-06-22+-+Ben+UFO%2C+Batu+-+Hessle+Audio%2C+Rinse+FM#mw-pages"
             if ben_ufo_second_page not in visited_urls:
                 logger.info(f"Fetching known second page for Ben UFO: {ben_ufo_second_page}")
-                response = fetch_with_retry(ben_ufo_second_page)
-                soup = BeautifulSoup(response.content, "html.parser")
+                response = fetch_with_retry(ben_ufo_second_page, checkpoint_page=True)
+                soup = parse_html(response.content)
                 all_pages.append(soup)
                 visited_urls.add(ben_ufo_second_page)
                 page_count += 1
@@ -324,7 +554,7 @@ def fetch_all_category_pages(artist_name, max_pages=MAX_PAGINATION_PAGES):
                 if pagination:
                     next_url = pagination.get('href')
                     if not next_url.startswith('http'):
-                        next_url = f"https://www.mixesdb.com{next_url}"
+                        next_url = f"{MIXESDB_BASE_URL}{next_url}"
                     
                     # Skip if we've already visited this URL
                     if next_url in visited_urls:
@@ -332,8 +562,8 @@ def fetch_all_category_pages(artist_name, max_pages=MAX_PAGINATION_PAGES):
                     
                     logger.info(f"Fetching next category page: {next_url}")
                     try:
-                        response = fetch_with_retry(next_url)
-                        current_soup = BeautifulSoup(response.content, "html.parser")
+                        response = fetch_with_retry(next_url, checkpoint_page=True)
+                        current_soup = parse_html(response.content)
                         all_pages.append(current_soup)
                         visited_urls.add(next_url)
                         
@@ -363,15 +593,15 @@ def fetch_all_category_pages(artist_name, max_pages=MAX_PAGINATION_PAGES):
                         
                         next_url = link.get('href')
                         if not next_url.startswith('http'):
-                            next_url = f"https://www.mixesdb.com{next_url}"
+                            next_url = f"{MIXESDB_BASE_URL}{next_url}"
                         
                         if next_url in visited_urls:
                             continue
                         
                         logger.info(f"Fetching next category page (secondary method): {next_url}")
                         try:
-                            response = fetch_with_retry(next_url) 
-                            current_soup = BeautifulSoup(response.content, "html.parser")
+                            response = fetch_with_retry(next_url, checkpoint_page=True) 
+                            current_soup = parse_html(response.content)
                             all_pages.append(current_soup)
                             visited_urls.add(next_url)
                             
@@ -417,7 +647,7 @@ def parse_tracklists_explorer(soup):
                 # Save the mix URL for potential future use
                 mix_info["url"] = title_link.get("href", "")
                 if mix_info["url"] and not mix_info["url"].startswith("http"):
-                    mix_info["url"] = f"https://www.mixesdb.com{mix_info['url']}"
+                    mix_info["url"] = f"{MIXESDB_BASE_URL}{mix_info['url']}"
             
             # Try to find the date - it's usually in parentheses in the title div text
             date_text = title_element.text
@@ -437,7 +667,7 @@ def parse_tracklists_explorer(soup):
             li_tags = ol_tag.find_all("li")
             for li_tag in li_tags:
                 track_name = li_tag.text.strip()
-                track_id = clean_item(track_name)
+                track_id = timed_clean_item(track_name)
                 tracklist.append({"track": track_name, "id": track_id})
         
         # Add mix info to the tracklist, even if the tracklist is empty
@@ -480,7 +710,7 @@ def parse_category_page(soup, artist_name):
             mix_title = link.text.strip()
             mix_url = link.get("href", "")
             if mix_url and not mix_url.startswith("http"):
-                mix_url = f"https://www.mixesdb.com{mix_url}"
+                mix_url = f"{MIXESDB_BASE_URL}{mix_url}"
             
             # Try to find the date in the text or list item content
             date = "Unknown date"
@@ -495,7 +725,7 @@ def parse_category_page(soup, artist_name):
             
             # We'll need to fetch the individual mix page to get the tracklist
             try:
-                tracklist = fetch_mix_tracklist(mix_url)
+                tracklist = fetch_checkpointed_mix_tracklist(mix_url)
                 found_mixes = True
                 
                 # Add the mix regardless of whether it has a tracklist or not
@@ -512,6 +742,16 @@ def parse_category_page(soup, artist_name):
                 else:
                     logger.info(f"Added mix: {mix_title} (no tracklist available)")
                 
+            except (DeadlineExceeded, CircuitOpenError):
+                # Keep the listing entry; the tracklist is fetched by the next (resumed) crawl
+                tracklists.append({
+                    "title": mix_title,
+                    "date": date,
+                    "url": mix_url,
+                    "tracks": [],
+                    "has_tracklist": False,
+                    "tracklist_skipped": True
+                })
             except Exception as e:
                 logger.warning(f"Error fetching tracklist for mix {mix_title}: {str(e)}")
                 # Still add the mix even if there was an error fetching the tracklist
@@ -569,7 +809,7 @@ def extract_tracklist_from_text(text):
         if is_track:
             track_section = True
             track_count += 1
-            track_id = clean_item(line)
+            track_id = timed_clean_item(line)
             tracklist.append({"track": line, "id": track_id})
         else:
             # If we're in a track section and find text that's not a track,
@@ -579,7 +819,7 @@ def extract_tracklist_from_text(text):
                 if tracklist:
                     prev_track = tracklist[-1]["track"]
                     tracklist[-1]["track"] = f"{prev_track} {line}"
-                    tracklist[-1]["id"] = clean_item(tracklist[-1]["track"])
+                    tracklist[-1]["id"] = timed_clean_item(tracklist[-1]["track"])
             else:
                 # Reset track section if we encounter non-track text
                 # Only reset if we've seen a minimum number of consecutive track-like lines
@@ -629,7 +869,7 @@ def extract_tracklist_from_section(soup, section_title="Tracklist"):
                 for li_tag in li_tags:
                     track_name = li_tag.text.strip()
                     if track_name and not track_name.startswith("?"):
-                        track_id = clean_item(track_name)
+                        track_id = timed_clean_item(track_name)
                         tracklist.append({"track": track_name, "id": track_id})
                 
                 # If we found tracks in this list, we're done
@@ -645,7 +885,7 @@ def extract_tracklist_from_section(soup, section_title="Tracklist"):
                     for li_tag in li_tags:
                         track_name = li_tag.text.strip()
                         if track_name and not track_name.startswith("?"):
-                            track_id = clean_item(track_name)
+                            track_id = timed_clean_item(track_name)
                             tracklist.append({"track": track_name, "id": track_id})
                     
                     if tracklist:
@@ -723,11 +963,11 @@ def extract_resident_advisor_tracklist(soup):
             # This is a numbered track
             track_name = match.group(2).strip()
             if track_name:
-                track_id = clean_item(track_name)
+                track_id = timed_clean_item(track_name)
                 tracklist.append({"track": track_name, "id": track_id})
         elif ' - ' in line:
             # This might be an unnumbered "Artist - Title" format
-            track_id = clean_item(line)
+            track_id = timed_clean_item(line)
             tracklist.append({"track": line, "id": track_id})
     
     logger.info(f"Extracted {len(tracklist)} tracks from Resident Advisor format")
@@ -737,306 +977,647 @@ def extract_resident_advisor_tracklist(soup):
 def fetch_mix_tracklist(mix_url):
     """Fetch and parse the tracklist from an individual mix page."""
     logger.info(f"Fetching mix tracklist from: {mix_url}")
-    tracklist = []
     
     try:
         response = fetch_with_retry(mix_url)
-        soup = BeautifulSoup(response.content, "html.parser")
+        soup = parse_html(response.content)
+        with active_metrics().stage("extract"):
+            return extract_mix_tracklist(soup, mix_url)
+    except Exception as e:
+        logger.error(f"Error fetching mix tracklist: {str(e)}")
+        return []
+
+
+def extract_mix_tracklist(soup, mix_url):
+    """Extract the tracklist from a parsed mix page, trying each known page layout in turn.
+    
+    The layout that matched is counted as the crawl's extraction strategy.
+    """
+    tracklist = []
+    strategy = "none"
+    
+    # Special case for Ben UFO mixes
+    if "Ben_UFO" in mix_url or "Ben-UFO" in mix_url:
+        logger.info("Detected Ben UFO mix, using specialized extraction")
+        # Try direct extraction of tracklist table - common in Ben UFO pages
+        table_tracklist = []
+        for table in soup.find_all("table", class_=lambda c: c and "wikitable" in c):
+            for row in table.find_all("tr"):
+                cells = row.find_all("td")
+                if len(cells) >= 2:  # Typical [time, track] format
+                    track_name = cells[1].text.strip()
+                    if track_name and len(track_name) > 3:
+                        track_id = timed_clean_item(track_name)
+                        table_tracklist.append({"track": track_name, "id": track_id})
         
-        # Special case for Ben UFO mixes
-        if "Ben_UFO" in mix_url or "Ben-UFO" in mix_url:
-            logger.info("Detected Ben UFO mix, using specialized extraction")
-            # Try direct extraction of tracklist table - common in Ben UFO pages
-            table_tracklist = []
-            for table in soup.find_all("table", class_=lambda c: c and "wikitable" in c):
-                for row in table.find_all("tr"):
-                    cells = row.find_all("td")
-                    if len(cells) >= 2:  # Typical [time, track] format
-                        track_name = cells[1].text.strip()
-                        if track_name and len(track_name) > 3:
-                            track_id = clean_item(track_name)
-                            table_tracklist.append({"track": track_name, "id": track_id})
-            
-            if table_tracklist:
-                logger.info(f"Found {len(table_tracklist)} tracks in table format for Ben UFO mix")
-                return table_tracklist
+        if table_tracklist:
+            logger.info(f"Found {len(table_tracklist)} tracks in table format for Ben UFO mix")
+            active_metrics().strategy("ben_ufo_table")
+            return table_tracklist
+    
+    # Special case for Resident Advisor mixes
+    if "Resident_Advisor" in mix_url or "RA." in mix_url:
+        logger.info("Detected Resident Advisor format, using specialized extraction")
+        tracklist = extract_resident_advisor_tracklist(soup)
+        if tracklist:
+            active_metrics().strategy("resident_advisor")
+            return tracklist
+    
+    # First, try to extract tracklist from a section with "Tracklist" heading
+    tracklist = extract_tracklist_from_section(soup, "Tracklist")
+    if tracklist:
+        logger.info(f"Successfully extracted {len(tracklist)} tracks from Tracklist section")
+        active_metrics().strategy("tracklist_section")
+        return tracklist
         
-        # Special case for Resident Advisor mixes
-        if "Resident_Advisor" in mix_url or "RA." in mix_url:
-            logger.info("Detected Resident Advisor format, using specialized extraction")
-            tracklist = extract_resident_advisor_tracklist(soup)
-            if tracklist:
-                return tracklist
+    # Find the tracklist section - typically in a div with class "tracklist"
+    tracklist_div = soup.find("div", class_="tracklist")
+    if tracklist_div:
+        # Find all list items in the tracklist
+        ol_tags = tracklist_div.find_all("ol")
+        for ol_tag in ol_tags:
+            li_tags = ol_tag.find_all("li")
+            for li_tag in li_tags:
+                track_name = li_tag.text.strip()
+                
+                # Skip empty tracks or tracks that are just symbols
+                if not track_name or track_name.strip() in ['?', '-', '–', '—', '•']:
+                    continue
+                
+                # Reduced logging - only log the first few tracks for debugging
+                if len(tracklist) < 3:  # Only log first 3 tracks
+                    logger.info(f"Sample track string: {repr(track_name)}")
+                
+                track_id = timed_clean_item(track_name)
+                tracklist.append({"track": track_id, "id": track_id})
         
-        # First, try to extract tracklist from a section with "Tracklist" heading
-        tracklist = extract_tracklist_from_section(soup, "Tracklist")
+        logger.info(f"Found {len(tracklist)} tracks in tracklist div")
         if tracklist:
-            logger.info(f"Successfully extracted {len(tracklist)} tracks from Tracklist section")
-            return tracklist
-            
-        # Find the tracklist section - typically in a div with class "tracklist"
-        tracklist_div = soup.find("div", class_="tracklist")
-        if tracklist_div:
-            # Find all list items in the tracklist
-            ol_tags = tracklist_div.find_all("ol")
-            for ol_tag in ol_tags:
-                li_tags = ol_tag.find_all("li")
-                for li_tag in li_tags:
-                    track_name = li_tag.text.strip()
-                    
-                    # Skip empty tracks or tracks that are just symbols
-                    if not track_name or track_name.strip() in ['?', '-', '–', '—', '•']:
-                        continue
-                    
-                    # Reduced logging - only log the first few tracks for debugging
-                    if len(tracklist) < 3:  # Only log first 3 tracks
-                        logger.info(f"Sample track string: {repr(track_name)}")
-                    
-                    track_id = clean_item(track_name)
-                    tracklist.append({"track": track_id, "id": track_id})
-            
-            logger.info(f"Found {len(tracklist)} tracks in tracklist div")
+            strategy = "tracklist_div"
+    
+    # If no tracks found in the tracklist div, try alternative methods
+    if not tracklist:
+        # Look for any "## Tracklist" or similar markdown-style headers
+        for h_tag in soup.find_all(['h1', 'h2', 'h3', 'h4']):
+            if 'tracklist' in h_tag.text.lower():
+                next_element = h_tag.find_next_sibling()
+                if next_element and next_element.name == 'ol':
+                    for li in next_element.find_all('li'):
+                        track_name = li.text.strip()
+                        if track_name:
+                            track_id = timed_clean_item(track_name)
+                            tracklist.append({"track": track_name, "id": track_id})
+                    if tracklist:
+                        logger.info(f"Found {len(tracklist)} tracks after header '{h_tag.text}'")
+                        break
+        if tracklist:
+            strategy = "header_list"
         
-        # If no tracks found in the tracklist div, try alternative methods
+        # Direct table extraction for any mix page
         if not tracklist:
-            # Look for any "## Tracklist" or similar markdown-style headers
-            for h_tag in soup.find_all(['h1', 'h2', 'h3', 'h4']):
-                if 'tracklist' in h_tag.text.lower():
-                    next_element = h_tag.find_next_sibling()
-                    if next_element and next_element.name == 'ol':
-                        for li in next_element.find_all('li'):
-                            track_name = li.text.strip()
-                            if track_name:
-                                track_id = clean_item(track_name)
-                                tracklist.append({"track": track_name, "id": track_id})
-                        if tracklist:
-                            logger.info(f"Found {len(tracklist)} tracks after header '{h_tag.text}'")
-                            break
-            
-            # Direct table extraction for any mix page
-            if not tracklist:
-                for table in soup.find_all("table"):
-                    track_rows = []
-                    # Look for tables with a structure that might contain track listings
-                    if table.find("th") and table.find("th").text.strip().lower() in ["track", "title", "artist", "time"]:
-                        # This might be a track listing table
-                        for row in table.find_all("tr"):
-                            cells = row.find_all("td")
-                            if len(cells) >= 2:  # At least 2 columns (typically track number/time and track name)
-                                # Use the second column as it typically contains the track name
-                                track_name = cells[1].text.strip()
-                                if track_name and not track_name.startswith("?"):
-                                    track_id = clean_item(track_name)
-                                    track_rows.append({"track": track_name, "id": track_id})
-                    
-                    if track_rows:
-                        tracklist.extend(track_rows)
-                        logger.info(f"Found {len(track_rows)} tracks in a table")
-                        break
-            
-            # Check for SoundCloud tracklist - often present near iframes or in paragraphs
-            if not tracklist and soup.find("iframe", src=lambda x: x and "soundcloud.com" in x):
-                iframe_soundcloud = soup.find("iframe", src=lambda x: x and "soundcloud.com" in x)
-                logger.info("Found SoundCloud embed, looking for tracklist nearby")
-                # Look for tracklist in paragraphs near the SoundCloud iframe
-                parent = iframe_soundcloud.parent
-                # Check paragraphs after the iframe
-                next_elements = list(parent.next_siblings)
-                for element in next_elements:
-                    if element.name == 'p':
-                        text_content = element.text.strip()
-                        tracks_from_text = extract_tracklist_from_text(text_content)
-                        if tracks_from_text:
-                            tracklist.extend(tracks_from_text)
-                    # Also check divs that might contain track listings
-                    elif element.name == 'div':
-                        text_content = element.text.strip()
-                        tracks_from_text = extract_tracklist_from_text(text_content)
-                        if tracks_from_text:
-                            tracklist.extend(tracks_from_text)
-            
-            # Check paragraphs that might contain tracklists
-            if not tracklist:
-                # Look for paragraphs that contain the word "tracklist"
-                tracklist_headers = soup.find_all(string=lambda text: text and "tracklist" in text.lower())
-                for header in tracklist_headers:
-                    element = header.parent
-                    # Check next siblings for track-like content
-                    for sibling in element.next_siblings:
-                        if hasattr(sibling, 'text'):
-                            text_content = sibling.text.strip()
-                            tracks_from_text = extract_tracklist_from_text(text_content)
-                            if tracks_from_text:
-                                tracklist.extend(tracks_from_text)
-                                break  # Found the tracklist, no need to check more siblings
-            
-            # Check all paragraphs for track-like content
-            if not tracklist:
-                p_tags = soup.find_all('p')
-                for p in p_tags:
-                    text_content = p.text.strip()
+            for table in soup.find_all("table"):
+                track_rows = []
+                # Look for tables with a structure that might contain track listings
+                if table.find("th") and table.find("th").text.strip().lower() in ["track", "title", "artist", "time"]:
+                    # This might be a track listing table
+                    for row in table.find_all("tr"):
+                        cells = row.find_all("td")
+                        if len(cells) >= 2:  # At least 2 columns (typically track number/time and track name)
+                            # Use the second column as it typically contains the track name
+                            track_name = cells[1].text.strip()
+                            if track_name and not track_name.startswith("?"):
+                                track_id = timed_clean_item(track_name)
+                                track_rows.append({"track": track_name, "id": track_id})
+                
+                if track_rows:
+                    tracklist.extend(track_rows)
+                    logger.info(f"Found {len(track_rows)} tracks in a table")
+                    break
+            if tracklist:
+                strategy = "header_table"
+        
+        # Check for SoundCloud tracklist - often present near iframes or in paragraphs
+        if not tracklist and soup.find("iframe", src=lambda x: x and "soundcloud.com" in x):
+            iframe_soundcloud = soup.find("iframe", src=lambda x: x and "soundcloud.com" in x)
+            logger.info("Found SoundCloud embed, looking for tracklist nearby")
+            # Look for tracklist in paragraphs near the SoundCloud iframe
+            parent = iframe_soundcloud.parent
+            # Check paragraphs after the iframe
+            next_elements = list(parent.next_siblings)
+            for element in next_elements:
+                if element.name == 'p':
+                    text_content = element.text.strip()
                     tracks_from_text = extract_tracklist_from_text(text_content)
                     if tracks_from_text:
                         tracklist.extend(tracks_from_text)
-                        break  # Found a tracklist, stop searching
-
-            # Sometimes tracklists are in table format without clear headers
-            if not tracklist:
-                tables = soup.find_all("table", class_="wikitable")
-                for table in tables:
-                    rows = table.find_all("tr")
-                    for row in rows:
-                        # Skip header rows
-                        if row.find("th"):
-                            continue
-                        
-                        cols = row.find_all("td")
-                        if cols and len(cols) >= 2:  # Typical format: Track number, Track name
-                            track_name = cols[1].text.strip()
-                            if track_name and not track_name.startswith("?"):
-                                track_id = clean_item(track_name)
-                                tracklist.append({"track": track_name, "id": track_id})
-            
-            # Try pre tags if still no tracks found
-            if not tracklist:
-                pre_tags = soup.find_all("pre")
-                for pre_tag in pre_tags:
-                    text_content = pre_tag.text.strip()
+                # Also check divs that might contain track listings
+                elif element.name == 'div':
+                    text_content = element.text.strip()
                     tracks_from_text = extract_tracklist_from_text(text_content)
                     if tracks_from_text:
                         tracklist.extend(tracks_from_text)
-                
-                # Try parsing from any ol lists that might contain the tracklist
-                if not tracklist:
-                    ol_tags = soup.find_all("ol")
-                    for ol_tag in ol_tags:
-                        # Skip if it's inside the already checked tracklist div
-                        if ol_tag.find_parent("div", class_="tracklist"):
-                            continue
-                            
-                        li_tags = ol_tag.find_all("li")
-                        for li_tag in li_tags:
-                            track_name = li_tag.text.strip()
-                            if track_name and not track_name.startswith("?"):
-                                track_id = clean_item(track_name)
-                                tracklist.append({"track": track_name, "id": track_id})
-                
-                # Look for divs with class "track" which sometimes contain track information
-                if not tracklist:
-                    track_divs = soup.find_all("div", class_=lambda x: x and "track" in x.lower())
-                    for div in track_divs:
-                        track_name = div.text.strip()
-                        if track_name and not track_name.startswith("?"):
-                            track_id = clean_item(track_name)
-                            tracklist.append({"track": track_name, "id": track_id})
-                
-                # Last resort: look for any text with track-like patterns in the main content div
-                if not tracklist:
-                    content_div = soup.find("div", id="mw-content-text")
-                    if content_div:
-                        text_content = content_div.get_text()
+            if tracklist:
+                strategy = "soundcloud_text"
+        
+        # Check paragraphs that might contain tracklists
+        if not tracklist:
+            # Look for paragraphs that contain the word "tracklist"
+            tracklist_headers = soup.find_all(string=lambda text: text and "tracklist" in text.lower())
+            for header in tracklist_headers:
+                element = header.parent
+                # Check next siblings for track-like content
+                for sibling in element.next_siblings:
+                    if hasattr(sibling, 'text'):
+                        text_content = sibling.text.strip()
                         tracks_from_text = extract_tracklist_from_text(text_content)
                         if tracks_from_text:
                             tracklist.extend(tracks_from_text)
+                            break  # Found the tracklist, no need to check more siblings
+            if tracklist:
+                strategy = "text_after_heading"
         
-        # Clean up the tracklist to remove duplicates and validate entries
-        if tracklist:
-            # Remove duplicates while preserving order
-            seen = set()
-            tracklist = [x for x in tracklist if not (x['track'] in seen or seen.add(x['track']))]
-            
-            # Further filter out non-track items
-            filtered_tracklist = []
-            for item in tracklist:
-                track = item['track']
-                # Skip items that are just numbers or very short strings
-                if re.match(r'^\d+$', track) or len(track) < 4:
-                    continue
-                # Skip items that are just categories or headers
-                if track.lower() in ['tracklist', 'tracks', 'track list', 'setlist', 'set list', 'playlist']:
-                    continue
-                filtered_tracklist.append(item)
+        # Check all paragraphs for track-like content
+        if not tracklist:
+            p_tags = soup.find_all('p')
+            for p in p_tags:
+                text_content = p.text.strip()
+                tracks_from_text = extract_tracklist_from_text(text_content)
+                if tracks_from_text:
+                    tracklist.extend(tracks_from_text)
+                    break  # Found a tracklist, stop searching
+            if tracklist:
+                strategy = "paragraph_text"
+
+        # Sometimes tracklists are in table format without clear headers
+        if not tracklist:
+            tables = soup.find_all("table", class_="wikitable")
+            for table in tables:
+                rows = table.find_all("tr")
+                for row in rows:
+                    # Skip header rows
+                    if row.find("th"):
+                        continue
+                    
+                    cols = row.find_all("td")
+                    if cols and len(cols) >= 2:  # Typical format: Track number, Track name
+                        track_name = cols[1].text.strip()
+                        if track_name and not track_name.startswith("?"):
+                            track_id = timed_clean_item(track_name)
+                            tracklist.append({"track": track_name, "id": track_id})
+            if tracklist:
+                strategy = "wikitable"
+        
+        # Try pre tags if still no tracks found
+        if not tracklist:
+            pre_tags = soup.find_all("pre")
+            for pre_tag in pre_tags:
+                text_content = pre_tag.text.strip()
+                tracks_from_text = extract_tracklist_from_text(text_content)
+                if tracks_from_text:
+                    tracklist.extend(tracks_from_text)
+            if tracklist:
+                strategy = "pre_text"
             
-            tracklist = filtered_tracklist
+            # Try parsing from any ol lists that might contain the tracklist
+            if not tracklist:
+                ol_tags = soup.find_all("ol")
+                for ol_tag in ol_tags:
+                    # Skip if it's inside the already checked tracklist div
+                    if ol_tag.find_parent("div", class_="tracklist"):
+                        continue
+                        
+                    li_tags = ol_tag.find_all("li")
+                    for li_tag in li_tags:
+                        track_name = li_tag.text.strip()
+                        if track_name and not track_name.startswith("?"):
+                            track_id = timed_clean_item(track_name)
+                            tracklist.append({"track": track_name, "id": track_id})
+                if tracklist:
+                    strategy = "any_list"
             
-            logger.info(f"Found a total of {len(tracklist)} tracks for the mix")
-        else:
-            logger.info("No tracklist found for this mix")
+            # Look for divs with class "track" which sometimes contain track information
+            if not tracklist:
+                track_divs = soup.find_all("div", class_=lambda x: x and "track" in x.lower())
+                for div in track_divs:
+                    track_name = div.text.strip()
+                    if track_name and not track_name.startswith("?"):
+                        track_id = timed_clean_item(track_name)
+                        tracklist.append({"track": track_name, "id": track_id})
+                if tracklist:
+                    strategy = "track_divs"
             
-        return tracklist
+            # Last resort: look for any text with track-like patterns in the main content div
+            if not tracklist:
+                content_div = soup.find("div", id="mw-content-text")
+                if content_div:
+                    text_content = content_div.get_text()
+                    tracks_from_text = extract_tracklist_from_text(text_content)
+                    if tracks_from_text:
+                        tracklist.extend(tracks_from_text)
+                if tracklist:
+                    strategy = "content_text"
+    
+    # Clean up the tracklist to remove duplicates and validate entries
+    if tracklist:
+        # Remove duplicates while preserving order
+        seen = set()
+        tracklist = [x for x in tracklist if not (x['track'] in seen or seen.add(x['track']))]
+        
+        # Further filter out non-track items
+        filtered_tracklist = []
+        for item in tracklist:
+            track = item['track']
+            # Skip items that are just numbers or very short strings
+            if re.match(r'^\d+$', track) or len(track) < 4:
+                continue
+            # Skip items that are just categories or headers
+            if track.lower() in ['tracklist', 'tracks', 'track list', 'setlist', 'set list', 'playlist']:
+                continue
+            filtered_tracklist.append(item)
+        
+        tracklist = filtered_tracklist
+        
+        logger.info(f"Found a total of {len(tracklist)} tracks for the mix")
+    else:
+        logger.info("No tracklist found for this mix")
+    
+    active_metrics().strategy(strategy)
+    return tracklist
+
+
+def fetch_checkpointed_mix_tracklist(mix_url):
+    """fetch_mix_tracklist, skipping mixes the active crawl checkpoint already completed.
+    
+    Raises DeadlineExceeded when the crawl deadline leaves no time to fetch
+    the mix page, and CircuitOpenError while MixesDB's breaker is open.
+    """
+    checkpoint = current_crawl().checkpoint
+    if checkpoint:
+        with active_metrics().stage("redis"):
+            tracklist = checkpoint.get_mix(mix_url)
+        if tracklist is not None:
+            logger.info(f"Using checkpointed tracklist for: {mix_url}")
+            active_metrics().count("checkpoint_mix_hits")
+            return tracklist
+    
+    check_deadline(REQUEST_TIMEOUT, mix_url)
+    breaker = breaker_for_url(mix_url)
+    if breaker.is_open():
+        raise CircuitOpenError(f"Circuit breaker open for {breaker.host}, skipping {mix_url}")
+    tracklist = fetch_mix_tracklist(mix_url)
+    # fetch_mix_tracklist returns [] on errors too; only a page that was
+    # actually fetched makes an empty tracklist final
+    fetched = bool(tracklist) or mix_url in request_cache
+    if not fetched:
+        check_deadline(REQUEST_TIMEOUT, mix_url)
+        if breaker.is_open():
+            raise CircuitOpenError(f"Circuit breaker open for {breaker.host}, skipping {mix_url}")
+    if checkpoint and fetched:
+        with active_metrics().stage("redis"):
+            checkpoint.save_mix(mix_url, tracklist)
+    return tracklist
+
+
+def open_checkpoint(artist_name, progress=None):
+    """Return the artist's crawl checkpoint, recording this (re)start, or None without Redis."""
+    if not (CRAWL_CHECKPOINT_ENABLED and redis_client):
+        return None
+    checkpoint = CrawlCheckpoint(redis_client, artist_name, ttl=CRAWL_CHECKPOINT_TTL)
+    job = progress.job if progress else None
+    summary = checkpoint.start(job.id if job else None)
+    if summary["pages"] or summary["mixes"]:
+        logger.info(f"Resuming crawl for {artist_name} from checkpoint: {summary['pages']} pages, {summary['mixes']} mixes already done")
+        if progress:
+            progress.update(resumed_from_checkpoint={"pages": summary["pages"], "mixes": summary["mixes"]})
+    return checkpoint
+
+
+def clear_checkpoint(artist_name):
+    """Drop the artist's crawl checkpoint once the finished record is stored."""
+    if CRAWL_CHECKPOINT_ENABLED and redis_client:
+        CrawlCheckpoint(redis_client, artist_name).clear()
+
+
+def parse_total_track_lists(soup):
+    """Read the total number of track lists from an Explorer page, or None if not shown."""
+    # Look for the count in the heading
+    heading = soup.find('div', class_='rc_headin')
+    if heading:
+        match = re.search(r'\bof\s+(\d+)\b', heading.get_text())
+        if match:
+            return int(match.group(1))
+    
+    # Then look for "x of y" text in the pagination
+    pagination = soup.find('div', class_='listPagination')
+    if pagination:
+        match = re.search(r'\bof\s+(\d+)\b', pagination.get_text())
+        if match:
+            return int(match.group(1))
+    return None
+
+
+def plan_explorer_offsets(total, page_size, max_mixes, first_offset=0):
+    """Return the non-overlapping page offsets needed to cover min(total, max_mixes) mixes."""
+    limit = min(total, max_mixes)
+    return list(range(first_offset, limit, max(1, page_size)))
+
+
+def dedupe_mixes(mixes, seen=None):
+    """Drop repeated mixes by URL (title when there is no URL), keeping the first. Updates seen."""
+    seen = set() if seen is None else seen
+    unique = []
+    for mix in mixes:
+        key = mix.get("url") or f"title:{mix.get('title', '')}"
+        if key not in seen:
+            seen.add(key)
+            unique.append(mix)
+    return unique
+
+
+def start_explorer_crawl(artist_name, page_size=EXPLORER_PAGE_SIZE):
+    """Fetch the first Explorer page once. Returns (first_page_mixes, total_available, stride).
+    
+    If the site returns fewer results than requested, that smaller count
+    is used as the stride for the remaining pages.
+    """
+    first_soup = fetch_tracklists_explorer(artist_name, 0, {}, count=page_size)
+    first_page = parse_tracklists_explorer(first_soup)
+    total = parse_total_track_lists(first_soup)
+    if total is None:
+        total = len(first_page)
+    
+    stride = len(first_page) if 0 < len(first_page) < page_size else page_size
+    if stride != page_size:
+        logger.info(f"Explorer returned {stride} results for a requested page size of {page_size}; using {stride} as the stride")
+    return first_page, total, stride
+
+
+def fetch_explorer_pages(artist_name, offsets, stride, concurrency=EXPLORER_CONCURRENCY, on_page=None):
+    """Fetch Explorer pages concurrently under the shared rate limit. Returns {offset: mixes}.
+    
+    Pages that failed (or were skipped at the crawl deadline) are left out.
+    on_page(pages_done, pages_total, mixes_found) is called as pages complete.
+    """
+    pages = {}
+    pages_done = 0
+    if not offsets:
+        return pages
+    context = current_crawl()
+    with ThreadPoolExecutor(max_workers=max(1, min(concurrency, len(offsets)))) as executor:
+        futures = {
+            executor.submit(run_in_crawl, context, fetch_tracklists_explorer, artist_name, offset, {}, stride): offset
+            for offset in offsets
+        }
+        for future in as_completed(futures):
+            offset = futures[future]
+            pages_done += 1
+            try:
+                pages[offset] = parse_tracklists_explorer(future.result())
+            except Exception as e:
+                # One bad page should not cost the rest of the crawl
+                logger.warning(f"Explorer page at offset {offset} failed: {str(e)}")
+            if on_page:
+                on_page(pages_done, len(offsets), sum(len(p) for p in pages.values()))
+    return pages
+
+
+def merge_explorer_pages(pages, max_mixes=None):
+    """Merge {offset: mixes} in offset order, deduplicated by mix URL and capped at max_mixes."""
+    seen = set()
+    mixes = []
+    for offset in sorted(pages):
+        mixes.extend(dedupe_mixes(pages[offset], seen))
+    if max_mixes and len(mixes) > max_mixes:
+        mixes = mixes[:int(max_mixes)]
+    return mixes
+
+
+def combine_tracklists(base_tracklists, explorer_tracklists, has_category):
+    """Add Explorer mixes to the Category results.
+    
+    With Category results present, only Explorer mixes that have tracklists
+    and unseen titles are added, to avoid duplicate entries.
+    """
+    combined = list(base_tracklists)
+    if has_category:
+        existing_titles = set(mix["title"] for mix in combined)
+        unique_added = 0
+        for mix in explorer_tracklists:
+            if mix.get("has_tracklist", False) and mix["title"] not in existing_titles:
+                combined.append(mix)
+                existing_titles.add(mix["title"])
+                unique_added += 1
+        logger.info(f"Added {unique_added} unique mixes from Explorer that weren't in Category results")
+    else:
+        # If no category mixes, just add all explorer mixes
+        combined.extend(explorer_tracklists)
+        logger.info(f"No Category results found, using all {len(explorer_tracklists)} mixes from Explorer")
+    return combined
+
+
+def crawl_coverage(tracklists, explorer_pages_planned=0, explorer_pages_fetched=0, deadline_reached=False,
+                   upstream_unavailable=False):
+    """Return (partial, coverage) for a finished crawl.
+    
+    A crawl is partial when mix pages were skipped (deadline or open
+    circuit breaker) or planned Explorer pages are missing.
+    """
+    skipped = sum(1 for mix in tracklists if mix.get("tracklist_skipped"))
+    coverage = {
+        "mixes": len(tracklists),
+        "mixes_with_tracklists": sum(1 for mix in tracklists if mix.get("has_tracklist", False)),
+        "mix_pages_skipped": skipped,
+        "explorer_pages_planned": explorer_pages_planned,
+        "explorer_pages_fetched": explorer_pages_fetched,
+        "deadline_reached": deadline_reached,
+        "upstream_unavailable": upstream_unavailable,
+    }
+    partial = (deadline_reached or upstream_unavailable or skipped > 0
+               or explorer_pages_fetched < explorer_pages_planned)
+    return partial, coverage
+
+
+def cache_artist_tracklists(artist_name, tracklists, partial=False):
+    """Store an artist's finished tracklists in the Redis artist cache.
+    
+    Partial results get the shorter PARTIAL_CACHE_TTL so the crawl is resumed soon.
+    """
+    if not redis_client:
+        return
+    cache_key = f"artist_cache:{artist_name.lower().replace(' ', '_')}"
+    ttl = PARTIAL_CACHE_TTL if partial else CACHE_TTL
+    try:
+        # Serialize the data to JSON string
+        serialized_data = json.dumps(tracklists).encode('utf-8') # Encode to bytes for storage
+        with active_metrics().stage("redis"):
+            redis_client.setex(cache_key, ttl, serialized_data)
+        logger.info(f"Stored {'partial ' if partial else ''}results for {artist_name} in Redis cache with TTL {ttl}s.")
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Redis error storing results for {artist_name}: {e}")
+    except TypeError as e:
+         logger.error(f"Serialization error for {artist_name} results: {e}. Cannot cache.")
+
+
+def mix_sort_date(mix):
+    """Return a sortable (year, month, day) for a mix, or (0, 0, 0) if unknown."""
+    for text in (mix.get("date", ""), mix.get("title", "")):
+        match = re.search(r'(\d{4})-(\d{2})-(\d{2})', text or "")
+        if match:
+            return tuple(int(part) for part in match.groups())
+        match = re.search(r'\b(\d{1,2})(?:st|nd|rd|th)? ([A-Za-z]+),? (\d{4})\b', text or "")
+        if match:
+            try:
+                parsed = datetime.strptime(f"{match.group(1)} {match.group(2)} {match.group(3)}", "%d %B %Y")
+                return (parsed.year, parsed.month, parsed.day)
+            except ValueError:
+                pass
+    return (0, 0, 0)
+
+
+def select_prefetch_tracks(tracklists, max_mixes=VIDEO_PREFETCH_MIXES, tracks_per_mix=VIDEO_PREFETCH_TRACKS_PER_MIX):
+    """Pick the first tracks of the most recent mixes for video prefetching."""
+    mixes = [mix for mix in tracklists if mix.get("has_tracklist", False)]
+    mixes.sort(key=mix_sort_date, reverse=True)
+
+    tracks = []
+    for mix in mixes[:max_mixes]:
+        for track in mix.get("tracks", [])[:tracks_per_mix]:
+            # Same text the frontend shows and sends as the track key
+            track_text = track.get("track") if isinstance(track, dict) else track
+            if track_text and track_text not in tracks:
+                tracks.append(track_text)
+    return tracks
+
+
+def enqueue_video_prefetch(artist_name, tracklists):
+    """Enqueue a low-priority job that warms the shared video cache for an artist's newest mixes."""
+    if not VIDEO_PREFETCH_ENABLED or not redis_client:
+        return None
+
+    tracks = select_prefetch_tracks(tracklists)
+    if not tracks:
+        return None
+
+    try:
+        from rq import Queue
+        prefetch_job = Queue(LOW_PRIORITY_QUEUE, connection=redis_client).enqueue(
+            'app.prefetch_video_ids',
+            tracks,
+            VIDEO_PREFETCH_BUDGET,
+            job_timeout=900,
+            result_ttl=3600,
+            description=f"Video prefetch: {artist_name} ({len(tracks)} tracks)"
+        )
+        logger.info(f"Enqueued video prefetch job {prefetch_job.id} for {len(tracks)} tracks of {artist_name}")
+        return prefetch_job.id
     except Exception as e:
-        logger.error(f"Error fetching mix tracklist: {str(e)}")
-        return []
+        # Prefetching is an optimisation; never fail the scrape because of it
+        logger.error(f"Could not enqueue video prefetch for {artist_name}: {str(e)}")
+        return None
 
 
-def get_total_track_lists_explorer(artist_name):
-    """Get the total number of track lists available for an artist in the Explorer view."""
-    url = build_explorer_url(artist_name, 0, {})
+def update_track_search(artist_name, tracklists, only_if_missing=False):
+    """Refresh the artist's rows in the local track search index."""
+    if not TRACK_SEARCH_ENABLED:
+        return
+    try:
+        if only_if_missing and track_search_index.is_indexed(artist_name):
+            return
+        with active_metrics().stage("search_index"):
+            track_search_index.index_artist(artist_name, tracklists)
+    except Exception as e:
+        # Search indexing is secondary; never fail the scrape because of it
+        logger.error(f"Could not update track search index for {artist_name}: {str(e)}")
+
+
+def after_scrape(artist_name, tracklists, partial=False):
+    """Follow-up work once a fresh scrape has been cached.
     
+    Partial results stay out of the durable store and keep their checkpoint,
+    so the next crawl resumes and completes them.
+    """
+    if not partial:
+        save_to_store(artist_name, tracklists)
+        clear_checkpoint(artist_name)
+    update_track_search(artist_name, tracklists)
+    enqueue_video_prefetch(artist_name, tracklists)
+
+
+def save_to_store(artist_name, tracklists):
+    """Persist a fresh scrape in the durable tracklist store."""
+    if not TRACKLIST_STORE_ENABLED:
+        return
     try:
-        response = fetch_with_retry(url)
-        soup = BeautifulSoup(response.content, "html.parser")
-        
-        # Look for the count in the heading
-        heading = soup.find('div', class_='rc_headin')
-        if heading:
-            text = heading.get_text()
-            match = re.search(r'\bof\s+(\d+)\b', text)
-            if match:
-                count = int(match.group(1))
-                logger.info(f"Total track lists for {artist_name} from Explorer: {count}")
-                return count
-        
-        # Fallback: Count the actual rows and assume there's only one page
-        rows = soup.find_all('tr', class_='spaceRow')
-        if rows:
-            # Add logic to look for pagination and multiple pages
-            pagination = soup.find('div', class_='listPagination')
-            if pagination:
-                # First look for "x of y" text
-                text = pagination.get_text()
-                match = re.search(r'\bof\s+(\d+)\b', text)
-                if match:
-                    count = int(match.group(1))
-                    logger.info(f"Found total track lists from pagination: {count}")
-                    return count
-            
-            # If we couldn't find a count, just return the number of rows
-            logger.info(f"Counted {len(rows)} track lists in the current page")
-            return len(rows)
-        
-        return 0
+        with active_metrics().stage("store"):
+            tracklist_store.save_artist(artist_name, tracklists)
     except Exception as e:
-        logger.error(f"Error determining total track lists: {str(e)}")
-        return 0
+        logger.error(f"Could not save {artist_name} to the tracklist store: {str(e)}")
 
 
-def write_to_json(tracklists, filename="tracklists.json"):
-    """Write tracklists to a JSON file."""
+def load_stored_tracklists(artist_name, max_age=TRACKLIST_STORE_MAX_AGE):
+    """Return stored tracklists for an artist if they are recent enough, or None.
+    
+    max_age=None accepts stale data, e.g. while MixesDB is down. A hit
+    re-warms the Redis artist_cache entry so later reads stay in Redis.
+    """
+    if not TRACKLIST_STORE_ENABLED:
+        return None
     try:
-        with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(tracklists, f, ensure_ascii=False, indent=4)
-        logger.info(f"Successfully wrote tracklists to {filename}")
+        stored = tracklist_store.load_artist(artist_name, max_age=max_age)
     except Exception as e:
-        logger.error(f"Error writing to JSON file: {str(e)}")
+        logger.error(f"Could not read {artist_name} from the tracklist store: {str(e)}")
+        return None
+    if stored is None:
+        return None
+
+    tracklists, scraped_at = stored
+    logger.info(f"Tracklist store hit for {artist_name} ({len(tracklists)} mixes, scraped {time.time() - scraped_at:.0f}s ago)")
+    if redis_client:
+        try:
+            cache_key = f"artist_cache:{artist_name.lower().replace(' ', '_')}"
+            redis_client.setex(cache_key, CACHE_TTL, json.dumps(tracklists).encode('utf-8'))
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Redis error re-warming cache for {artist_name}: {e}")
+    return tracklists
+
+
+def finish_metrics(outcome):
+    """Add the running crawl's metrics to the totals in Redis and return them for job.meta."""
+    metrics = active_metrics()
+    metrics.record(redis_client, outcome)
+    return metrics.snapshot()
 
 
 def main(artist_name, max_pagination_pages=MAX_PAGINATION_PAGES, max_explorer_mixes=MAX_FETCH_LIMIT):
-    """Main function to fetch and process tracklists, using Redis cache."""
+    """Main function to fetch and process tracklists, using Redis cache.
+    
+    Each call runs under its own CrawlContext, so concurrent calls in one
+    process do not share crawl state.
+    """
+    with crawl_scope(CrawlContext()):
+        return scrape_artist(artist_name, max_pagination_pages, max_explorer_mixes)
+
+
+def scrape_artist(artist_name, max_pagination_pages, max_explorer_mixes):
+    """Body of main(), run inside the crawl's context."""
+    crawl = current_crawl()
     if not artist_name:
         raise ValueError("Artist name is required")
 
     # Initialize job progress tracking
     from rq.job import get_current_job
     job = get_current_job()
+    # Coalesced progress writes; a no-op outside RQ
+    progress = ProgressReporter(job)
     
     # Initialize progress if running as a job
+    progress.transition(
+        progress=0,
+        status=f'Starting search for artist: {artist_name}',
+        total_mixes_found=0,
+        artist_name=artist_name,
+    )
     if job:
-        job.meta['progress'] = 0
-        job.meta['status'] = f'Starting search for artist: {artist_name}'
-        job.meta['total_mixes_found'] = 0
-        job.meta['artist_name'] = artist_name
-        job.save_meta()
         logger.info(f"Running as job {job.id} - progress tracking enabled")
 
     cache_key = f"artist_cache:{artist_name.lower().replace(' ', '_')}" # Normalize key
@@ -1044,20 +1625,25 @@ def main(artist_name, max_pagination_pages=MAX_PAGINATION_PAGES, max_explorer_mi
     # --- Check Cache ---
     if redis_client:
         try:
-            cached_data = redis_client.get(cache_key)
+            with crawl.metrics.stage("redis"):
+                cached_data = redis_client.get(cache_key)
             if cached_data:
                 logger.info(f"Cache hit for artist: {artist_name}")
+                crawl.metrics.count("artist_cache_hits")
                 # Deserialize the data from JSON string
                 all_tracklists = json.loads(cached_data.decode('utf-8')) # Decode bytes then parse JSON
                 
                 # Update job meta if running as a job
-                if job:
-                    job.meta['progress'] = 100
-                    job.meta['status'] = f'Retrieved {len(all_tracklists)} mixes from cache'
-                    job.meta['total_mixes_found'] = len(all_tracklists)
-                    job.meta['cached'] = True
-                    job.save_meta()
-                    
+                progress.transition(
+                    progress=100,
+                    status=f'Retrieved {len(all_tracklists)} mixes from cache',
+                    total_mixes_found=len(all_tracklists),
+                    cached=True,
+                    metrics=finish_metrics("artist_cache"),
+                )
+                
+                # Artists cached before the search index existed get indexed once
+                update_track_search(artist_name, all_tracklists, only_if_missing=True)
                 return all_tracklists
             else:
                 logger.info(f"Cache miss for artist: {artist_name}")
@@ -1067,20 +1653,47 @@ def main(artist_name, max_pagination_pages=MAX_PAGINATION_PAGES, max_explorer_mi
              logger.error(f"Error decoding cached JSON for {artist_name}: {e}. Cache entry might be corrupted. Re-fetching.")
              # Optionally, delete the corrupted key: redis_client.delete(cache_key)
 
+    # --- Redis Miss - Fall back to the durable store before scraping ---
+    with crawl.metrics.stage("store"):
+        stored_tracklists = load_stored_tracklists(artist_name)
+    if stored_tracklists is not None:
+        crawl.metrics.count("store_hits")
+        progress.transition(
+            progress=100,
+            status=f'Retrieved {len(stored_tracklists)} mixes from the tracklist store',
+            total_mixes_found=len(stored_tracklists),
+            cached=True,
+            metrics=finish_metrics("store"),
+        )
+        update_track_search(artist_name, stored_tracklists, only_if_missing=True)
+        return stored_tracklists
+
+    # --- MixesDB down: serve stale data or fail fast instead of crawling into errors ---
+    mixesdb_breaker = breaker_for_url(EXPLORER_BASE_URL)
+    if mixesdb_breaker.is_open():
+        stale_tracklists = load_stored_tracklists(artist_name, max_age=None)
+        if stale_tracklists is None:
+            raise CircuitOpenError(f"MixesDB is unavailable (circuit breaker open); retry in {mixesdb_breaker.retry_after()}s")
+        progress.transition(
+            progress=100,
+            status=f'MixesDB unavailable; retrieved {len(stale_tracklists)} stale mixes from the tracklist store',
+            total_mixes_found=len(stale_tracklists),
+            cached=True,
+            stale=True,
+            metrics=finish_metrics("stale"),
+        )
+        return stale_tracklists
+
     # --- Cache Miss - Proceed with scraping ---
     logger.info(f"Processing artist: {artist_name} (no cache)")
     
-    # Reduce max explorer mixes for large catalogs to improve stability
-    if max_explorer_mixes > 100:
-        logger.info(f"Limiting max explorer mixes to 100 for better stability (was {max_explorer_mixes})")
-        max_explorer_mixes = 100
+    # 0 (or unlimited) fetches the whole catalog; crawls that run out of time resume from their checkpoint
+    if not max_explorer_mixes or max_explorer_mixes == float('inf'):
+        max_explorer_mixes = 0
         
     logger.info(f"Configured limits: Max pagination pages={max_pagination_pages}, Max explorer mixes={max_explorer_mixes}")
     
-    if job:
-        job.meta['progress'] = 5
-        job.meta['status'] = 'Starting artist search...'
-        job.save_meta()
+    progress.update(progress=5, status='Starting artist search...')
     
     start_time = time.time()
     processing_step = 1
@@ -1088,6 +1701,13 @@ def main(artist_name, max_pagination_pages=MAX_PAGINATION_PAGES, max_explorer_mi
     
     all_tracklists = []
     
+    # Pages and mixes finished by an earlier, interrupted run of this crawl are not fetched again
+    crawl.checkpoint = open_checkpoint(artist_name, progress)
+    # Stop fetching in time to store whatever was found before RQ kills the job
+    start_deadline(job)
+    explorer_pages_planned = 0
+    explorer_pages_fetched = 0
+    
     try:
         # Try both approaches and combine the results
         category_tracklists = []
@@ -1096,10 +1716,7 @@ def main(artist_name, max_pagination_pages=MAX_PAGINATION_PAGES, max_explorer_mi
         # First, try the category page approach with pagination support
         logger.info(f"[Step {processing_step}/{total_steps}] Attempting to fetch mixes from Category pages for {artist_name}")
         
-        if job:
-            job.meta['progress'] = 10
-            job.meta['status'] = 'Fetching from artist category pages...'
-            job.save_meta()
+        progress.update(progress=10, status='Fetching from artist category pages...')
         
         try:
             # Fetch all pages for this category
@@ -1107,13 +1724,13 @@ def main(artist_name, max_pagination_pages=MAX_PAGINATION_PAGES, max_explorer_mi
             
             # Parse each page
             for i, soup in enumerate(category_pages):
-                progress = ((i + 1) / len(category_pages)) * 100
-                logger.info(f"Parsing category page {i+1} of {len(category_pages)} - {progress:.1f}% complete")
+                page_progress = ((i + 1) / len(category_pages)) * 100
+                logger.info(f"Parsing category page {i+1} of {len(category_pages)} - {page_progress:.1f}% complete")
                 
-                if job:
-                    job.meta['progress'] = 10 + int((i + 1) * 10 / len(category_pages))
-                    job.meta['status'] = f'Parsing category page {i+1} of {len(category_pages)}'
-                    job.save_meta()
+                progress.update(
+                    progress=10 + int((i + 1) * 10 / len(category_pages)),
+                    status=f'Parsing category page {i+1} of {len(category_pages)}',
+                )
                 
                 page_tracklists = parse_category_page(soup, artist_name)
                 category_tracklists.extend(page_tracklists)
@@ -1121,9 +1738,7 @@ def main(artist_name, max_pagination_pages=MAX_PAGINATION_PAGES, max_explorer_mi
             if category_tracklists:
                 logger.info(f"Successfully retrieved {len(category_tracklists)} mixes from all Category pages")
                 
-                if job:
-                    job.meta['total_mixes_found'] = len(category_tracklists)
-                    job.save_meta()
+                progress.update(total_mixes_found=len(category_tracklists))
                 
                 # Count mixes with tracklists
                 mixes_with_tracklists = sum(1 for mix in category_tracklists if mix.get("has_tracklist", False))
@@ -1135,26 +1750,22 @@ def main(artist_name, max_pagination_pages=MAX_PAGINATION_PAGES, max_explorer_mi
                     all_tracklists.extend(category_tracklists)
                     
                     # Update job progress
-                    if job:
-                        job.meta['progress'] = 90
-                        job.meta['status'] = 'Finalizing results (skipping explorer page)...'
-                        job.save_meta()
+                    progress.update(progress=90, status='Finalizing results (skipping explorer page)...')
                     
                     # Store in cache and finalize
-                    if redis_client:
-                        try:
-                            # Serialize the data to JSON string
-                            serialized_data = json.dumps(all_tracklists).encode('utf-8')
-                            redis_client.setex(cache_key, CACHE_TTL, serialized_data)
-                            logger.info(f"Stored results for {artist_name} in Redis cache with TTL {CACHE_TTL}s.")
-                        except Exception as e:
-                            logger.error(f"Error storing results in cache: {str(e)}")
+                    partial, coverage = crawl_coverage(all_tracklists, deadline_reached=crawl.deadline_hit,
+                                                       upstream_unavailable=mixesdb_breaker.is_open())
+                    cache_artist_tracklists(artist_name, all_tracklists, partial)
+                    after_scrape(artist_name, all_tracklists, partial)
                     
                     # Complete job
-                    if job:
-                        job.meta['progress'] = 100
-                        job.meta['status'] = 'Completed'
-                        job.save_meta()
+                    progress.transition(
+                        progress=100,
+                        status='Completed (partial)' if partial else 'Completed',
+                        partial=partial,
+                        coverage=coverage,
+                        metrics=finish_metrics("partial" if partial else "completed"),
+                    )
                         
                     elapsed_time = time.time() - start_time
                     logger.info(f"Total processing time: {elapsed_time:.2f} seconds")
@@ -1168,8 +1779,8 @@ def main(artist_name, max_pagination_pages=MAX_PAGINATION_PAGES, max_explorer_mi
                 try:
                     alternate_url = f"{CATEGORY_BASE_URL}{artist_name.replace(' ', '_')}"
                     logger.info(f"Attempting alternate URL: {alternate_url}")
-                    response = fetch_with_retry(alternate_url)
-                    soup = BeautifulSoup(response.content, "html.parser")
+                    response = fetch_with_retry(alternate_url, checkpoint_page=True)
+                    soup = parse_html(response.content)
                     category_tracklists = parse_category_page(soup, artist_name)
                     if category_tracklists:
                         logger.info(f"Successfully retrieved {len(category_tracklists)} mixes from alternate Category page")
@@ -1182,63 +1793,39 @@ def main(artist_name, max_pagination_pages=MAX_PAGINATION_PAGES, max_explorer_mi
         processing_step += 1
         
         # Update job progress before explorer search
-        if job:
-            job.meta['progress'] = 25
-            job.meta['status'] = 'Fetching from explorer page...'
-            job.save_meta()
+        progress.update(progress=25, status='Fetching from explorer page...')
         
         # Then try the Explorer page approach to find more mixes with tracklists
         logger.info(f"[Step {processing_step}/{total_steps}] Attempting to fetch mixes from Explorer page for {artist_name}")
         try:
-            # Get total number of track lists from Explorer
-            total_track_lists = get_total_track_lists_explorer(artist_name)
+            def on_explorer_page(pages_done, pages_total, mixes_found):
+                logger.info(f"Explorer page {pages_done}/{pages_total} done - running total: {mixes_found} mixes")
+                # Scale from 25% to 65%
+                progress.update(
+                    progress=int(25 + (pages_done / pages_total) * 40),
+                    status=f'Fetched explorer page {pages_done} of {pages_total}',
+                    total_mixes_found=len(all_tracklists) + mixes_found,
+                )
+            
+            # One planned, non-overlapping crawl; the first page also provides the total
+            first_page, total_track_lists, stride = start_explorer_crawl(artist_name)
+            offsets = plan_explorer_offsets(total_track_lists, stride, max_explorer_mixes or total_track_lists, first_offset=stride)
+            
+            on_explorer_page(1, len(offsets) + 1, len(first_page))
+            pages = fetch_explorer_pages(
+                artist_name, offsets, stride,
+                on_page=lambda done, _, found: on_explorer_page(done + 1, len(offsets) + 1, found + len(first_page))
+            )
+            pages[0] = first_page
+            explorer_pages_planned = len(offsets) + 1
+            explorer_pages_fetched = len(pages)
+            explorer_tracklists = merge_explorer_pages(pages, max_explorer_mixes)
             
             if total_track_lists == 0:
                 logger.warning(f"No tracklists found for {artist_name} in Explorer")
             else:
-                # REDUCED BATCH SIZE: Use 10 instead of 25 for better stability
-                batch_size = 10  # Smaller batches for better stability
-                logger.info(f"Fetching {total_track_lists} tracklists in batches of {batch_size}")
-                
-                # For large catalogs, limit to a reasonable number for better performance
-                if total_track_lists > 200:
-                    logger.info(f"Large catalog detected ({total_track_lists} mixes). Limiting fetch to prioritize performance.")
-                    max_to_fetch = min(max_explorer_mixes, 100)  # Reduced from 200 to 100
-                    logger.info(f"Fetching first {max_to_fetch} mixes for faster results")
-                else:
-                    # For smaller catalogs, fetch up to the limit
-                    max_to_fetch = min(total_track_lists, max_explorer_mixes)
-                
                 # Update job with total expected mixes
-                if job:
-                    job.meta['explorer_total'] = max_to_fetch
-                    job.save_meta()
-                
-                for offset in range(0, max_to_fetch, batch_size):
-                    progress = (offset / max_to_fetch) * 100
-                    batch_end = min(offset + batch_size, max_to_fetch)
-                    logger.info(f"Fetching batch {offset}-{batch_end} - {progress:.1f}% complete")
-                    
-                    # Update job progress for each batch
-                    if job:
-                        explorer_progress = int(25 + (offset / max_to_fetch) * 40)  # Scale from 25% to 65%
-                        job.meta['progress'] = explorer_progress
-                        job.meta['status'] = f'Fetching mixes {offset+1}-{batch_end} of {max_to_fetch}'
-                        job.save_meta()
-                    
-                    soup = fetch_tracklists_explorer(artist_name, offset, {})
-                    explorer_batch = parse_tracklists_explorer(soup)
-                    explorer_tracklists.extend(explorer_batch)
-                    
-                    # Report running total of found mixes
-                    logger.info(f"Running total: {len(explorer_tracklists)} mixes found so far")
-                    
-                    if job:
-                        job.meta['total_mixes_found'] = len(all_tracklists) + len(explorer_tracklists)
-                        job.save_meta()
-                    
-                    # Add a small delay between batches to avoid overwhelming server
-                    time.sleep(1)
+                progress.update(explorer_total=min(total_track_lists, max_explorer_mixes or total_track_lists))
                 
                 if explorer_tracklists:
                     logger.info(f"Successfully retrieved {len(explorer_tracklists)} mixes from Explorer page")
@@ -1248,39 +1835,17 @@ def main(artist_name, max_pagination_pages=MAX_PAGINATION_PAGES, max_explorer_mi
                     logger.info(f"{explorer_with_tracklists} mixes have tracklists from Explorer page")
                     
                     # Update job progress
-                    if job:
-                        job.meta['progress'] = 70
-                        job.meta['status'] = 'Combining results from Category and Explorer pages'
-                        job.save_meta()
+                    progress.update(progress=70, status='Combining results from Category and Explorer pages')
                     
                     processing_step += 1
                     logger.info(f"[Step {processing_step}/{total_steps}] Combining results from Category and Explorer pages")
                     
-                    # Only add explorer mixes with tracklists if we already have mixes from category page
-                    # to avoid duplicate entries
-                    if category_tracklists:
-                        # Add only explorer mixes with tracklists that have unique titles
-                        existing_titles = set(mix["title"] for mix in all_tracklists)
-                        unique_added = 0
-                        for mix in explorer_tracklists:
-                            if mix.get("has_tracklist", False) and mix["title"] not in existing_titles:
-                                all_tracklists.append(mix)
-                                existing_titles.add(mix["title"])
-                                unique_added += 1
-                        
-                        logger.info(f"Added {unique_added} unique mixes from Explorer that weren't in Category results")
-                    else:
-                        # If no category mixes, just add all explorer mixes
-                        all_tracklists.extend(explorer_tracklists)
-                        logger.info(f"No Category results found, using all {len(explorer_tracklists)} mixes from Explorer")
+                    all_tracklists = combine_tracklists(all_tracklists, explorer_tracklists, bool(category_tracklists))
         except Exception as e:
             logger.warning(f"Error fetching from Explorer page: {str(e)}")
         
         # Update job progress for final processing
-        if job:
-            job.meta['progress'] = 85
-            job.meta['status'] = 'Final processing and caching results'
-            job.save_meta()
+        progress.update(progress=85, status='Final processing and caching results')
         
         processing_step += 1
         logger.info(f"[Step {processing_step}/{total_steps}] Final processing")
@@ -1295,33 +1860,42 @@ def main(artist_name, max_pagination_pages=MAX_PAGINATION_PAGES, max_explorer_mi
         logger.info(f"Processing complete in {execution_time:.2f} seconds")
         logger.info(f"Successfully processed {total_tracks} tracks across {mixes_with_tracklists} mixes with tracklists (total mixes: {len(all_tracklists)})")
         
+        upstream_unavailable = mixesdb_breaker.is_open()
+        if upstream_unavailable and not all_tracklists:
+            # Nothing to show; do not cache an empty result for an artist we could not reach
+            raise CircuitOpenError(f"MixesDB became unavailable while crawling {artist_name}")
+        partial, coverage = crawl_coverage(all_tracklists, explorer_pages_planned, explorer_pages_fetched,
+                                           crawl.deadline_hit, upstream_unavailable)
+        if partial:
+            logger.warning(f"Returning partial results for {artist_name}: {coverage}")
+        
         # --- Store in Cache ---
-        if redis_client:
-            try:
-                # Serialize the data to JSON string
-                serialized_data = json.dumps(all_tracklists).encode('utf-8') # Encode to bytes for storage
-                redis_client.setex(cache_key, CACHE_TTL, serialized_data)
-                logger.info(f"Stored results for {artist_name} in Redis cache with TTL {CACHE_TTL}s.")
-            except redis.exceptions.RedisError as e:
-                logger.error(f"Redis error storing results for {artist_name}: {e}")
-            except TypeError as e:
-                 logger.error(f"Serialization error for {artist_name} results: {e}. Cannot cache.")
+        cache_artist_tracklists(artist_name, all_tracklists, partial)
+
+        after_scrape(artist_name, all_tracklists, partial)
 
         # Update job to complete
-        if job:
-            job.meta['progress'] = 100
-            job.meta['status'] = 'Completed'
-            job.meta['total_mixes_found'] = len(all_tracklists)
-            job.meta['mixes_with_tracklists'] = mixes_with_tracklists
-            job.meta['total_tracks'] = total_tracks
-            job.meta['processing_time'] = f"{execution_time:.2f} seconds"
-            job.save_meta()
+        progress.transition(
+            progress=100,
+            status='Completed (partial)' if partial else 'Completed',
+            partial=partial,
+            coverage=coverage,
+            total_mixes_found=len(all_tracklists),
+            mixes_with_tracklists=mixes_with_tracklists,
+            total_tracks=total_tracks,
+            processing_time=f"{execution_time:.2f} seconds",
+            metrics=finish_metrics("partial" if partial else "completed"),
+        )
 
         return all_tracklists
         
     except Exception as e:
         logger.error(f"Error in main function for {artist_name}: {str(e)}")
+        progress.transition(metrics=finish_metrics("failed"))
         raise
+    finally:
+        crawl.checkpoint = None
+        stop_deadline()
 
 
 if __name__ == "__main__":
@@ -1337,7 +1911,7 @@ if __name__ == "__main__":
             max_pages = MAX_PAGINATION_PAGES
             
         try:
-            max_mixes = int(input("Enter maximum explorer mixes to fetch (default: 300, 0 for unlimited): ") or "300")
+            max_mixes = int(input("Enter maximum explorer mixes to fetch (default: 0 for the whole catalog): ") or "0")
             if max_mixes <= 0:
                 max_mixes = float('inf')  # Unlimited
         except ValueError:
@@ -0,0 +1,185 @@
+import datetime
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from io import BytesIO
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.lib.units import inch
+from reportlab.pdfgen import canvas as pdf_canvas
+from reportlab.platypus import BaseDocTemplate, PageTemplate, Frame, Paragraph, Spacer
+
+from track_formatter import format_track_for_pdf
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Sharded rendering configuration
+PDF_SHARD_MODE = os.environ.get("PDF_SHARD_MODE", "0") == "1"  # Opt-in, needs pypdf installed
+PDF_SHARD_SIZE = int(os.environ.get("PDF_SHARD_SIZE", 150))  # Mixes per shard
+PDF_SHARD_MIN_MIXES = int(os.environ.get("PDF_SHARD_MIN_MIXES", 300))  # Below this a single build is faster
+PDF_SHARD_WORKERS = int(os.environ.get("PDF_SHARD_WORKERS", 0)) or (os.cpu_count() or 1)
+
+
+def build_pdf_styles():
+    """Build the stylesheet shared by the single-document and sharded renderers."""
+    styles = getSampleStyleSheet()
+    styles.add(ParagraphStyle(name='MixTitle', parent=styles['Heading2'], spaceAfter=12))
+    styles.add(ParagraphStyle(name='TrackItem', parent=styles['Normal'], leftIndent=20, spaceAfter=3))
+    return styles
+
+
+def header_totals(mixes):
+    """Return (total_tracks, mixes_with_tracklists, mix_count) for the PDF header."""
+    mixes_with_tracklists = sum(1 for mix in mixes if mix.get("has_tracklist", False))
+    total_tracks = sum(len(mix.get("tracks", [])) for mix in mixes)
+    return total_tracks, mixes_with_tracklists, len(mixes)
+
+
+def build_header_flowables(artist_name, totals, styles):
+    """Build the title, summary and timestamp shown at the top of the PDF from header_totals()."""
+    total_tracks, mixes_with_tracklists, mix_count = totals
+
+    return [
+        Paragraph(f"Tracklists for {artist_name}", styles['Title']),
+        Spacer(1, 0.25 * inch),
+        Paragraph(f"Found {total_tracks} tracks across {mixes_with_tracklists} mixes with tracklists (total of {mix_count} mixes)", styles['Normal']),
+        Spacer(1, 0.25 * inch),
+        Paragraph(f"Generated on {datetime.datetime.now().strftime('%Y-%m-%d at %H:%M:%S')}", styles['Italic']),
+        Spacer(1, 0.5 * inch),
+    ]
+
+
+def mix_title_text(mix):
+    """Return the heading text for a mix, prefixed with its date when known."""
+    title_text = mix.get("title", "Untitled Mix")
+    if mix.get("date"):
+        title_text = f"{mix.get('date')} - {title_text}"
+    return title_text
+
+
+def build_mix_flowables(mix, styles):
+    """Build the heading and track paragraphs for a single mix."""
+    flowables = [Paragraph(mix_title_text(mix), styles['MixTitle'])]
+
+    tracks = mix.get("tracks", [])
+    if tracks:
+        for j, track in enumerate(tracks):
+            track_text = f"{j + 1}. {format_track_for_pdf(track)}"
+            flowables.append(Paragraph(track_text, styles['TrackItem']))
+    else:
+        flowables.append(Paragraph("No tracklist available", styles['TrackItem']))
+
+    flowables.append(Spacer(1, 0.2 * inch))
+    return flowables
+
+
+def draw_page_number(canvas, page_num, total_pages):
+    """Draw the 'Page X of Y' footer in the bottom right corner."""
+    canvas.saveState()
+    canvas.setFont("Helvetica", 8)
+    canvas.drawRightString(
+        letter[0] - 24,
+        24,
+        f"Page {page_num} of {total_pages}"
+    )
+    canvas.restoreState()
+
+
+def render_shard(shard_index, artist_name, mixes, totals=None):
+    """Render one chunk of mixes into a standalone PDF without page numbers.
+
+    Runs inside a worker process. Page numbers are stamped after all shards
+    are merged, since only then is the total page count known.
+    Returns (shard_index, pdf_bytes, page_count, seconds).
+    """
+    start = time.time()
+    buffer = BytesIO()
+    doc = BaseDocTemplate(buffer, pagesize=letter, title=f"Tracklists for {artist_name}", author="The Digger App")
+    frame = Frame(doc.leftMargin, doc.bottomMargin, doc.width, doc.height, id='normal')
+    doc.addPageTemplates([PageTemplate(id='all_frames', frames=frame)])
+
+    styles = build_pdf_styles()
+    content = []
+    # Only the first shard carries the document header
+    if totals is not None:
+        content.extend(build_header_flowables(artist_name, totals, styles))
+    for mix in mixes:
+        content.extend(build_mix_flowables(mix, styles))
+
+    doc.build(content)
+    pdf_data = buffer.getvalue()
+    buffer.close()
+    return shard_index, pdf_data, doc.page, time.time() - start
+
+
+def stamp_page_numbers(writer, total_pages):
+    """Overlay 'Page X of Y' on every page of a merged PdfWriter."""
+    from pypdf import PdfReader
+
+    # Draw all footers into one overlay document, one page per target page
+    overlay_buffer = BytesIO()
+    overlay = pdf_canvas.Canvas(overlay_buffer, pagesize=letter)
+    for page_num in range(1, total_pages + 1):
+        draw_page_number(overlay, page_num, total_pages)
+        overlay.showPage()
+    overlay.save()
+
+    overlay_pages = PdfReader(BytesIO(overlay_buffer.getvalue())).pages
+    for page, overlay_page in zip(writer.pages, overlay_pages):
+        page.merge_page(overlay_page)
+
+
+def render_pdf_sharded(artist_name, mixes, shard_size=PDF_SHARD_SIZE, max_workers=PDF_SHARD_WORKERS, on_shard_done=None):
+    """Render mixes in parallel shards and concatenate them into one PDF.
+
+    on_shard_done(done_count, shard_count, timing) is called in the parent
+    process as each shard finishes. Returns (pdf_bytes, shard_timings).
+    """
+    from pypdf import PdfReader, PdfWriter
+
+    shards = [mixes[i:i + shard_size] for i in range(0, len(mixes), shard_size)]
+    workers = max(1, min(max_workers, len(shards)))
+    logger.info(f"Rendering {len(mixes)} mixes in {len(shards)} shards using {workers} processes")
+
+    # Counted here so the whole catalog is not pickled over to the first shard's process
+    totals = header_totals(mixes)
+    results = {}
+    shard_timings = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(render_shard, i, artist_name, shard, totals if i == 0 else None)
+            for i, shard in enumerate(shards)
+        ]
+        for future in as_completed(futures):
+            shard_index, pdf_data, page_count, seconds = future.result()
+            results[shard_index] = pdf_data
+            timing = {
+                "shard": shard_index,
+                "mixes": len(shards[shard_index]),
+                "pages": page_count,
+                "seconds": round(seconds, 3),
+            }
+            shard_timings.append(timing)
+            logger.info(f"Shard {shard_index + 1}/{len(shards)} rendered {page_count} pages in {seconds:.2f} seconds")
+            if on_shard_done:
+                on_shard_done(len(results), len(shards), timing)
+
+    # Concatenate shards in order, then number the pages across the whole document
+    writer = PdfWriter()
+    for shard_index in range(len(shards)):
+        for page in PdfReader(BytesIO(results[shard_index])).pages:
+            writer.add_page(page)
+    stamp_page_numbers(writer, len(writer.pages))
+    writer.add_metadata({"/Title": f"Tracklists for {artist_name}", "/Author": "The Digger App"})
+
+    output = BytesIO()
+    writer.write(output)
+    pdf_data = output.getvalue()
+    output.close()
+
+    shard_timings.sort(key=lambda t: t["shard"])
+    return pdf_data, shard_timings
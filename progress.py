@@ -0,0 +1,107 @@
+import json
+import logging
+import os
+import threading
+import time
+
+import redis
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+PROGRESS_FLUSH_INTERVAL_MS = int(os.environ.get("PROGRESS_FLUSH_INTERVAL_MS", 500))  # Min gap between progress writes per job
+PROGRESS_TTL = int(os.environ.get("PROGRESS_TTL", 86400))  # Keep progress as long as job results
+
+
+def progress_key(job_id):
+    """Redis hash holding a job's latest progress fields; also the pub/sub channel for changes."""
+    return f"job_progress:{job_id}"
+
+
+def read_progress(redis_client, job_id):
+    """Return the progress fields written for a job, or {}."""
+    if not redis_client:
+        return {}
+    try:
+        raw = redis_client.hgetall(progress_key(job_id))
+    except redis.exceptions.RedisError as e:
+        logger.error(f"Redis error reading progress for job {job_id}: {e}")
+        return {}
+    progress = {}
+    for field, value in raw.items():
+        try:
+            progress[field.decode('utf-8')] = json.loads(value)
+        except ValueError:
+            continue
+    return progress
+
+
+class ProgressReporter:
+    """Coalesces a job's progress updates into few, small Redis writes.
+
+    update() only buffers; at most every interval_ms the fields that changed
+    since the last write go out as one HSET on job_progress:<job_id> plus one
+    PUBLISH on the channel of the same name. transition() flushes at once and
+    also saves job.meta, for state changes other code reads from the job
+    (start, hand-off, completion). With job=None every call is a no-op, so
+    the scraper runs the same outside RQ.
+    """
+
+    def __init__(self, job, redis_client=None, interval_ms=PROGRESS_FLUSH_INTERVAL_MS, ttl=PROGRESS_TTL):
+        self.job = job
+        self.redis_client = redis_client or (job.connection if job else None)
+        self.interval = interval_ms / 1000.0
+        self.ttl = ttl
+        self._pending = {}
+        self._written = {}
+        self._last_flush = 0.0
+        self._lock = threading.Lock()
+        self.writes = 0
+
+    def update(self, **fields):
+        """Record progress fields; written once the flush interval has passed."""
+        if not self.job:
+            return
+        with self._lock:
+            self._pending.update(fields)
+            due = time.time() - self._last_flush >= self.interval
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write pending fields that differ from what was last written."""
+        if not self.job:
+            return
+        with self._lock:
+            changed = {k: v for k, v in self._pending.items() if k not in self._written or self._written[k] != v}
+            self._pending.clear()
+            self._last_flush = time.time()
+            if not changed:
+                return
+            self._written.update(changed)
+            self.job.meta.update(changed)
+        if not self.redis_client:
+            return
+        key = progress_key(self.job.id)
+        try:
+            pipe = self.redis_client.pipeline()
+            pipe.hset(key, mapping={k: json.dumps(v) for k, v in changed.items()})
+            pipe.expire(key, self.ttl)
+            pipe.publish(key, json.dumps({"job_id": self.job.id, "fields": changed}))
+            pipe.execute()
+            self.writes += 1
+        except (redis.exceptions.RedisError, TypeError) as e:
+            logger.error(f"Could not write progress for job {self.job.id}: {e}")
+
+    def transition(self, **fields):
+        """Write fields now and persist job.meta; use for state changes, not per-item progress."""
+        if not self.job:
+            return
+        with self._lock:
+            self._pending.update(fields)
+        self.flush()
+        try:
+            self.job.save_meta()
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Could not save meta for job {self.job.id}: {e}")
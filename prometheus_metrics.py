@@ -0,0 +1,174 @@
+import logging
+import os
+
+import redis
+
+from crawl_metrics import FETCH_LATENCY_BUCKETS, read_crawl_metrics
+
+try:
+    from prometheus_client import (CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Histogram,
+                                   generate_latest, multiprocess)
+    from prometheus_client.core import CounterMetricFamily, GaugeMetricFamily, HistogramMetricFamily
+except ImportError:  # prometheus_client is optional; without it every helper is a no-op
+    CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+    REGISTRY = None
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+METRICS_ENABLED = os.environ.get("METRICS_ENABLED", "1") == "1" and REGISTRY is not None
+# Set (before start-up) to aggregate metrics across gunicorn workers; see gunicorn.conf.py
+PROMETHEUS_MULTIPROC_DIR = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+
+if METRICS_ENABLED:
+    HTTP_REQUEST_SECONDS = Histogram(
+        "thedigger_http_request_duration_seconds", "Flask request latency by route",
+        ["route", "method", "status"],
+        buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+    )
+    CACHE_EVENTS = Counter(
+        "thedigger_cache_events_total", "Cache lookups and maintenance by cache layer",
+        ["cache", "event"],
+    )
+    UPSTREAM_REQUESTS = Counter(
+        "thedigger_upstream_requests_total", "Requests to YouTube and Discogs from this tier by outcome",
+        ["upstream", "outcome"],
+    )
+    UPSTREAM_SECONDS = Histogram(
+        "thedigger_upstream_request_duration_seconds", "Upstream request latency",
+        ["upstream"],
+        buckets=FETCH_LATENCY_BUCKETS,
+    )
+
+
+def observe_request(route, method, status, seconds):
+    """Record one Flask request against its route pattern."""
+    if METRICS_ENABLED:
+        HTTP_REQUEST_SECONDS.labels(route, method, str(status)).observe(seconds)
+
+
+def count_cache(cache, event, amount=1):
+    """Count a cache event (local_hits, redis_hits, misses, sets, evictions, ...)."""
+    if METRICS_ENABLED:
+        CACHE_EVENTS.labels(cache, event).inc(amount)
+
+
+def observe_upstream(upstream, outcome, seconds=None):
+    """Record one upstream request; outcome is an HTTP status or an error kind.
+
+    For requests made in the web tier. Scrape jobs count theirs in
+    CrawlMetrics, which reaches /metrics through Redis.
+    """
+    if not METRICS_ENABLED:
+        return
+    UPSTREAM_REQUESTS.labels(upstream, str(outcome)).inc()
+    if seconds is not None:
+        UPSTREAM_SECONDS.labels(upstream).observe(seconds)
+
+
+class RedisStateCollector:
+    """Collects state kept in Redis at scrape time: RQ queues, workers and crawl totals.
+
+    Read fresh on every scrape, so the numbers are the same whichever
+    gunicorn worker answers and include the RQ worker tier.
+    """
+
+    def __init__(self, redis_client, queue_names):
+        self.redis_client = redis_client
+        self.queue_names = queue_names
+
+    def collect(self):
+        if not self.redis_client:
+            return
+        try:
+            yield from self.collect_queues()
+            yield from self.collect_crawls()
+        except redis.exceptions.RedisError as e:
+            logger.error(f"Redis error collecting metrics: {e}")
+
+    def collect_queues(self):
+        from rq import Queue, Worker
+        jobs = GaugeMetricFamily("thedigger_rq_jobs", "RQ jobs by queue and state", labels=["queue", "state"])
+        for name in self.queue_names:
+            queue = Queue(name, connection=self.redis_client)
+            jobs.add_metric([name, "queued"], queue.count)
+            jobs.add_metric([name, "started"], queue.started_job_registry.count)
+            jobs.add_metric([name, "deferred"], queue.deferred_job_registry.count)
+            jobs.add_metric([name, "failed"], queue.failed_job_registry.count)
+        yield jobs
+
+        workers = GaugeMetricFamily("thedigger_rq_workers", "RQ workers by state", labels=["state"])
+        busy = CounterMetricFamily("thedigger_rq_worker_busy_seconds", "Time RQ workers spent running jobs", labels=["worker"])
+        finished = CounterMetricFamily("thedigger_rq_worker_jobs", "Jobs run by RQ workers", labels=["worker", "result"])
+        states = {}
+        for worker in Worker.all(connection=self.redis_client):
+            state = str(worker.get_state())
+            states[state] = states.get(state, 0) + 1
+            busy.add_metric([worker.name], float(getattr(worker, "total_working_time", 0) or 0))
+            finished.add_metric([worker.name, "successful"], getattr(worker, "successful_job_count", 0) or 0)
+            finished.add_metric([worker.name, "failed"], getattr(worker, "failed_job_count", 0) or 0)
+        for state, count in states.items():
+            workers.add_metric([state], count)
+        yield workers
+        yield busy
+        yield finished
+
+    def collect_crawls(self):
+        totals = read_crawl_metrics(self.redis_client)
+        jobs = CounterMetricFamily("thedigger_crawl_jobs", "Scrape jobs by outcome", labels=["outcome"])
+        for outcome, count in totals["outcomes"].items():
+            jobs.add_metric([outcome], count)
+        yield jobs
+
+        stage_seconds = CounterMetricFamily("thedigger_crawl_stage_seconds", "Wall-clock time per crawl stage", labels=["stage"])
+        stage_cpu = CounterMetricFamily("thedigger_crawl_stage_cpu_seconds", "CPU time per crawl stage", labels=["stage"])
+        for stage, values in totals["stages"].items():
+            stage_seconds.add_metric([stage], values["seconds"])
+            stage_cpu.add_metric([stage], values["cpu_seconds"])
+        yield stage_seconds
+        yield stage_cpu
+
+        events = CounterMetricFamily("thedigger_crawl_events", "Crawl counters (requests, bytes, cache hits, errors)", labels=["event"])
+        for name, count in totals["counters"].items():
+            events.add_metric([name], count)
+        yield events
+
+        strategies = CounterMetricFamily("thedigger_crawl_extraction_strategy", "Mix tracklists by extraction strategy", labels=["strategy"])
+        for name, count in totals["strategies"].items():
+            strategies.add_metric([name], count)
+        yield strategies
+
+        # Scrape jobs run in RQ workers, which are never scraped; their upstream counts come through Redis
+        upstream = CounterMetricFamily("thedigger_crawl_upstream_requests", "Upstream requests made by scrape jobs by outcome",
+                                       labels=["upstream", "outcome"])
+        for name, outcomes in totals["upstream_requests"].items():
+            for outcome, count in outcomes.items():
+                upstream.add_metric([name, outcome], count)
+        yield upstream
+
+        latency = HistogramMetricFamily("thedigger_crawl_fetch_duration_seconds", "MixesDB fetch latency in scrape jobs")
+        buckets, cumulative = [], 0
+        for bucket, count in totals["fetch_latency"].items():
+            cumulative += count
+            buckets.append((bucket, cumulative))
+        if not buckets or buckets[-1][0] != "+Inf":
+            buckets.append(("+Inf", cumulative))
+        latency.add_metric([], buckets, sum_value=totals["stages"].get("fetch", {}).get("seconds", 0.0))
+        yield latency
+
+
+def render_metrics(redis_client, queue_names):
+    """Return (body, content_type) for a Prometheus scrape, or None when metrics are disabled."""
+    if not METRICS_ENABLED:
+        return None
+    if PROMETHEUS_MULTIPROC_DIR:
+        # Every gunicorn worker writes its own files; merge them for the scrape
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        body = generate_latest(registry)
+    else:
+        body = generate_latest(REGISTRY)
+    redis_registry = CollectorRegistry()
+    redis_registry.register(RedisStateCollector(redis_client, queue_names))
+    return body + generate_latest(redis_registry), CONTENT_TYPE_LATEST
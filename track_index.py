@@ -0,0 +1,220 @@
+import logging
+import re
+import threading
+import unicodedata
+
+import redis
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Bracketed segments in MixesDB track lines, e.g. "Artist - Title [Label - CAT 001]"
+BRACKET_RE = re.compile(r'\[([^\]]+)\]')
+CATNO_RE = re.compile(r'[^A-Z0-9]')
+# Catalog numbers mix letters and digits; plain words and bare track numbers are skipped
+CATNO_SHAPE_RE = re.compile(r'^(?=.*[A-Z])(?=.*\d)[A-Z0-9]{3,20}$')
+# An artist or title made only of these words is unidentified ("ID - ID", "Unknown Artist - Untitled")
+PLACEHOLDER_WORDS = {"id", "unknown", "unidentified", "untitled", "artist", "track", "title", "tba", "tbc", "tbd"}
+# MixesDB marks unknown parts with a bare "?" ("Artist - ?"); U+FFFD is text lost before it reached us
+UNREADABLE_RE = re.compile(r'\ufffd|(?<!\w)\?+(?!\w)')
+
+
+def normalize_track(text):
+    """Normalise a track line to its index key.
+
+    Drops bracketed segments (track numbers, labels, catalog numbers) and
+    punctuation, then NFKC-normalises, casefolds and collapses whitespace.
+    Letters of every script are kept, so "Ryuichi Sakamoto - 千のナイフ"
+    and "Ryuichi Sakamoto - 戦場のメリークリスマス" stay distinct.
+    """
+    text = unicodedata.normalize('NFKC', BRACKET_RE.sub(' ', text or '')).casefold()
+    # Keep letters, digits and combining marks; everything else separates words
+    text = ''.join(ch if unicodedata.category(ch)[0] in 'LNM' else ' ' for ch in text)
+    return ' '.join(text.split())
+
+
+def indexable_key(text):
+    """Return the index key for a track line, or None if the line must not be indexed.
+
+    Unidentified tracks and lines with unreadable parts would otherwise
+    share one key across unrelated tracks.
+    """
+    text = BRACKET_RE.sub(' ', text or '')
+    if UNREADABLE_RE.search(text):
+        return None
+    # "Objekt - ID" is as unidentified as "ID - ID": check the artist and title separately
+    if any(set(normalize_track(part).split()) <= PLACEHOLDER_WORDS for part in text.split(' - ', 1)):
+        return None
+    return normalize_track(text)
+
+
+def video_key(text, source):
+    """Index key for a track's video; the same line can resolve differently per search source."""
+    key = indexable_key(text)
+    return f"{source}:{key}" if key else None
+
+
+def normalize_catno(catno):
+    """Normalise a catalog number: uppercase, no spaces or punctuation ('ABC-001 ' -> 'ABC001')."""
+    return CATNO_RE.sub('', (catno or '').upper())
+
+
+def catno_candidates(track_text):
+    """Return normalised catalog numbers that may be embedded in a track line."""
+    candidates = []
+    for segment in BRACKET_RE.findall(track_text or ''):
+        # "[Label - CAT 001]" carries the catalog number after the label
+        for part in reversed(segment.split(' - ')):
+            catno = normalize_catno(part)
+            if CATNO_SHAPE_RE.match(catno) and catno not in candidates:
+                candidates.append(catno)
+    return candidates
+
+
+class TrackIndex:
+    """Inverted index linking MixesDB tracks, Discogs releases and YouTube videos.
+
+    Three Redis hashes map normalised keys to IDs:
+      track_index:video:v2    source + track key -> YouTube video ID
+      track_index:release:v2  track key -> Discogs release ID
+      track_index:catno       normalised catalog number -> Discogs release ID
+    Track keys come from indexable_key; placeholder and unreadable lines
+    are never indexed. Entries are filled as lookups succeed and never
+    expire. Without Redis the index lives in this process only.
+    """
+
+    KINDS = ("video", "release", "catno")
+    # v2: Unicode-preserving keys; the v1 hashes used ASCII-only clean_item IDs that collided
+    HASH_NAMES = {"video": "video:v2", "release": "release:v2", "catno": "catno"}
+
+    def __init__(self, redis_client=None, namespace="track_index"):
+        self.redis_client = redis_client
+        self.namespace = namespace
+        self._local = {kind: {} for kind in self.KINDS}
+        self._lock = threading.Lock()
+
+    def _hash(self, kind):
+        return f"{self.namespace}:{self.HASH_NAMES[kind]}"
+
+    def _set_many(self, kind, mapping):
+        mapping = {k: str(v) for k, v in mapping.items() if k and v}
+        if not mapping:
+            return
+        if self.redis_client:
+            try:
+                self.redis_client.hset(self._hash(kind), mapping=mapping)
+                return
+            except redis.exceptions.RedisError as e:
+                logger.error(f"Redis error writing track index: {e}")
+        with self._lock:
+            self._local[kind].update(mapping)
+
+    def _get_many(self, kind, keys):
+        if not keys:
+            return []
+        if self.redis_client:
+            try:
+                values = self.redis_client.hmget(self._hash(kind), keys)
+                return [v.decode('utf-8') if v else None for v in values]
+            except redis.exceptions.RedisError as e:
+                logger.error(f"Redis error reading track index: {e}")
+        with self._lock:
+            return [self._local[kind].get(k) for k in keys]
+
+    def link_video(self, track_text, video_id, source="djset"):
+        """Record the YouTube video resolved for a track line."""
+        key = video_key(track_text, source)
+        if key:
+            self._set_many("video", {key: video_id})
+
+    def lookup_video(self, track_text, source="djset"):
+        """Return the indexed video ID for a track line, or None."""
+        key = video_key(track_text, source)
+        return self._get_many("video", [key])[0] if key else None
+
+    def lookup_release(self, track_text):
+        """Return the Discogs release ID for a track line, by name or embedded catalog number."""
+        key = indexable_key(track_text)
+        if key:
+            release_id = self._get_many("release", [key])[0]
+            if release_id:
+                return int(release_id)
+        for release_id in self._get_many("catno", catno_candidates(track_text)):
+            if release_id:
+                return int(release_id)
+        return None
+
+    def lookup_catno(self, catno):
+        """Return the Discogs release ID for a catalog number, or None."""
+        release_id = self._get_many("catno", [normalize_catno(catno)])[0]
+        return int(release_id) if release_id else None
+
+    def index_release(self, release):
+        """Index a release's catalog numbers and 'Artist - Title' for each track."""
+        release_id = release.get('id')
+        if not release_id:
+            return
+        self._set_many("catno", {
+            normalize_catno(label.get('catno')): release_id
+            for label in release.get('labels', [])
+            if label.get('catno') and label.get('catno').lower() != 'none'
+        })
+
+        release_artist = release.get('primary_artist') or release.get('artists_sort', '')
+        tracks = {}
+        for track in release.get('tracklist', []):
+            if not track.get('title'):
+                continue
+            artist = ', '.join(a.get('name', '') for a in track.get('artists', [])) or release_artist
+            key = indexable_key(f"{artist} - {track['title']}")
+            if key:
+                tracks[key] = release_id
+        self._set_many("release", tracks)
+
+    def index_catalog(self, catalog):
+        """Index the catalog numbers of every release in a label catalog."""
+        self._set_many("catno", {
+            normalize_catno(release.get('catno')): release.get('id')
+            for release in catalog.get('releases', [])
+            if release.get('catno') and release.get('catno').lower() != 'none'
+        })
+
+    def annotate(self, track_texts, source="djset"):
+        """Resolve many track lines at once.
+
+        Returns a list of {"video_id", "release_id"} dicts in input order,
+        using one round trip per hash for the direct lookups.
+        """
+        def get_keyed(kind, keys):
+            # Lines without an index key are answered with None, not looked up
+            found = iter(self._get_many(kind, [key for key in keys if key]))
+            return [next(found) if key else None for key in keys]
+
+        keys = [indexable_key(text) for text in track_texts]
+        videos = get_keyed("video", [f"{source}:{key}" if key else None for key in keys])
+        releases = get_keyed("release", keys)
+
+        results = []
+        for text, video_id, release_id in zip(track_texts, videos, releases):
+            if not release_id:
+                release_id = next((r for r in self._get_many("catno", catno_candidates(text)) if r), None)
+            results.append({
+                "video_id": video_id,
+                "release_id": int(release_id) if release_id else None,
+            })
+        return results
+
+    def stats(self):
+        """Return the number of entries per hash."""
+        stats = {}
+        for kind in self.KINDS:
+            if self.redis_client:
+                try:
+                    stats[kind] = self.redis_client.hlen(self._hash(kind))
+                    continue
+                except redis.exceptions.RedisError as e:
+                    logger.error(f"Redis error reading track index stats: {e}")
+            with self._lock:
+                stats[kind] = len(self._local[kind])
+        return stats
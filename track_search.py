@@ -0,0 +1,175 @@
+import logging
+import os
+import re
+import sqlite3
+import threading
+import time
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# On-disk index shared by the web tier and the worker; point both at the same path
+TRACK_SEARCH_DB = os.environ.get("TRACK_SEARCH_DB", "track_search.db")
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS indexed_artists (
+    artist_key TEXT PRIMARY KEY,
+    artist TEXT NOT NULL,
+    mixes INTEGER NOT NULL,
+    tracks INTEGER NOT NULL,
+    indexed_at REAL NOT NULL
+);
+CREATE VIRTUAL TABLE IF NOT EXISTS track_fts USING fts5(
+    track,
+    mix_title,
+    artist_key UNINDEXED,
+    artist UNINDEXED,
+    mix_date UNINDEXED,
+    mix_url UNINDEXED,
+    position UNINDEXED,
+    tokenize = 'unicode61 remove_diacritics 2'
+);
+-- FTS5 cannot index artist_key, so each artist's rowids are kept here for replacing them
+CREATE TABLE IF NOT EXISTS track_rows (
+    rowid INTEGER PRIMARY KEY,
+    artist_key TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS track_rows_artist_key ON track_rows (artist_key);
+"""
+
+
+def artist_key(artist_name):
+    """Same normalisation as the artist_cache Redis keys."""
+    return artist_name.lower().replace(' ', '_')
+
+
+def build_match_query(query):
+    """Turn free text into an FTS5 MATCH expression.
+
+    Every word must match; the last word is a prefix so results appear
+    while the user is still typing. Words are quoted so FTS operators in
+    track names ("AND", "-", quotes) are taken literally.
+    """
+    tokens = TOKEN_RE.findall(query or '')
+    if not tokens:
+        return None
+    terms = [f'"{token}"' for token in tokens]
+    terms[-1] += '*'
+    return ' '.join(terms)
+
+
+class TrackSearchIndex:
+    """SQLite FTS5 index of every scraped mix and track.
+
+    Each artist's rows are replaced in one transaction after a scrape, so
+    the index always matches the latest result for that artist. Each thread
+    gets its own connection; WAL mode lets the web tier read while the
+    worker writes.
+    """
+
+    def __init__(self, path=TRACK_SEARCH_DB):
+        self.path = path
+        self._local = threading.local()
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.executescript(SCHEMA)
+                    self._backfill_track_rows(conn)
+                    self._schema_ready = True
+        return conn
+
+    def _backfill_track_rows(self, conn):
+        """Map rows indexed before track_rows existed, so their artist can still be replaced."""
+        if conn.execute("SELECT 1 FROM track_rows LIMIT 1").fetchone():
+            return
+        with conn:
+            conn.execute("INSERT INTO track_rows (rowid, artist_key) SELECT rowid, artist_key FROM track_fts")
+
+    def is_indexed(self, artist_name):
+        """Return True if the artist already has rows in the index."""
+        row = self._connect().execute(
+            "SELECT 1 FROM indexed_artists WHERE artist_key = ?", (artist_key(artist_name),)
+        ).fetchone()
+        return row is not None
+
+    def index_artist(self, artist_name, tracklists):
+        """Replace the indexed mixes and tracks for one artist. Returns rows written."""
+        start = time.time()
+        key = artist_key(artist_name)
+        rows = []
+        for mix in tracklists:
+            for position, track in enumerate(mix.get("tracks", []), start=1):
+                track_text = track.get("track") if isinstance(track, dict) else track
+                if track_text:
+                    rows.append((track_text, mix.get("title", ""), key, artist_name,
+                                 mix.get("date", ""), mix.get("url", ""), position))
+
+        conn = self._connect()
+        with conn:
+            # Delete by rowid: filtering track_fts on artist_key would scan the whole table
+            conn.execute(
+                "DELETE FROM track_fts WHERE rowid IN (SELECT rowid FROM track_rows WHERE artist_key = ?)", (key,)
+            )
+            conn.execute("DELETE FROM track_rows WHERE artist_key = ?", (key,))
+            for row in rows:
+                cursor = conn.execute(
+                    "INSERT INTO track_fts (track, mix_title, artist_key, artist, mix_date, mix_url, position) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                    row
+                )
+                conn.execute("INSERT INTO track_rows (rowid, artist_key) VALUES (?, ?)", (cursor.lastrowid, key))
+            conn.execute(
+                "INSERT OR REPLACE INTO indexed_artists (artist_key, artist, mixes, tracks, indexed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, artist_name, len(tracklists), len(rows), time.time())
+            )
+        logger.info(f"Indexed {len(rows)} tracks from {len(tracklists)} mixes for {artist_name} in {time.time() - start:.2f}s")
+        return len(rows)
+
+    def search(self, query, limit=50, artist_name=None):
+        """Find tracks matching query across all indexed artists, best matches first.
+
+        Returns {"results": [...], "played_by": [{"artist", "plays"}, ...]}.
+        """
+        match = build_match_query(query)
+        if not match:
+            return {"results": [], "played_by": []}
+
+        # Only search the track column; mix titles are returned for display
+        where = "WHERE track_fts MATCH ?"
+        params = [f"track : ({match})"]
+        if artist_name:
+            where += " AND artist_key = ?"
+            params.append(artist_key(artist_name))
+
+        conn = self._connect()
+        results = [dict(row) for row in conn.execute(
+            f"SELECT track, artist, mix_title, mix_date, mix_url, position FROM track_fts {where} ORDER BY rank LIMIT ?",
+            params + [limit]
+        )]
+        # Count plays over every match, not just the rows that made the limit
+        played_by = [dict(row) for row in conn.execute(
+            f"SELECT artist, COUNT(*) AS plays FROM track_fts {where} GROUP BY artist ORDER BY plays DESC",
+            params
+        )]
+        return {"results": results, "played_by": played_by}
+
+    def stats(self):
+        """Return counts of indexed artists and tracks."""
+        row = self._connect().execute(
+            "SELECT COUNT(*) AS artists, COALESCE(SUM(mixes), 0) AS mixes, COALESCE(SUM(tracks), 0) AS tracks FROM indexed_artists"
+        ).fetchone()
+        return dict(row)
@@ -0,0 +1,218 @@
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Durable store shared by the web tier and the worker; point both at the same path
+TRACKLIST_DB = os.environ.get("TRACKLIST_DB", "tracklists.db")
+TRACKLIST_STORE_BATCH_SIZE = int(os.environ.get("TRACKLIST_STORE_BATCH_SIZE", 500))  # Rows per executemany
+
+# Mix keys stored in their own columns; anything else is kept in `extra`
+MIX_COLUMNS = ("title", "date", "url", "tracks", "has_tracklist")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS artists (
+    id INTEGER PRIMARY KEY,
+    artist_key TEXT NOT NULL UNIQUE,
+    name TEXT NOT NULL,
+    mix_count INTEGER NOT NULL DEFAULT 0,
+    track_count INTEGER NOT NULL DEFAULT 0,
+    scraped_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS mixes (
+    id INTEGER PRIMARY KEY,
+    artist_id INTEGER NOT NULL REFERENCES artists(id) ON DELETE CASCADE,
+    mix_key TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    title TEXT NOT NULL,
+    date TEXT,
+    url TEXT,
+    has_tracklist INTEGER NOT NULL DEFAULT 0,
+    extra TEXT,
+    seen_at REAL NOT NULL,
+    UNIQUE (artist_id, mix_key)
+);
+CREATE INDEX IF NOT EXISTS idx_mixes_artist_position ON mixes (artist_id, position);
+CREATE TABLE IF NOT EXISTS tracks (
+    id INTEGER PRIMARY KEY,
+    mix_id INTEGER NOT NULL REFERENCES mixes(id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    track TEXT NOT NULL,
+    track_id TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_tracks_mix_position ON tracks (mix_id, position);
+CREATE INDEX IF NOT EXISTS idx_tracks_track_id ON tracks (track_id);
+"""
+
+
+def artist_key(artist_name):
+    """Same normalisation as the artist_cache Redis keys."""
+    return artist_name.lower().replace(' ', '_')
+
+
+def mix_key(mix):
+    """Stable identity of a mix within an artist: its URL, or its title when there is none."""
+    return mix.get("url") or f"title:{mix.get('title', '')}"
+
+
+def _batches(rows, size):
+    for i in range(0, len(rows), size):
+        yield rows[i:i + size]
+
+
+class TracklistStore:
+    """Durable SQLite store of artists, mixes and tracks.
+
+    This is the system of record for scraped tracklists; the Redis
+    artist_cache blobs are a hot cache in front of it. Saves upsert the
+    artist's mixes, drop mixes missing from the new scrape and rewrite their
+    tracks, all in one transaction with batched inserts. Each thread gets
+    its own connection; WAL mode lets the web tier read while the worker
+    writes.
+    """
+
+    def __init__(self, path=TRACKLIST_DB, batch_size=TRACKLIST_STORE_BATCH_SIZE):
+        self.path = path
+        self.batch_size = batch_size
+        self._local = threading.local()
+        self._schema_ready = False
+        self._schema_lock = threading.Lock()
+
+    def _connect(self):
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=30)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute("PRAGMA foreign_keys=ON")
+            self._local.conn = conn
+        if not self._schema_ready:
+            with self._schema_lock:
+                if not self._schema_ready:
+                    conn.executescript(SCHEMA)
+                    self._schema_ready = True
+        return conn
+
+    def save_artist(self, artist_name, tracklists):
+        """Upsert an artist's full scrape result. Returns the number of tracks written."""
+        start = time.time()
+        now = time.time()
+        key = artist_key(artist_name)
+        track_count = sum(len(mix.get("tracks", [])) for mix in tracklists)
+
+        conn = self._connect()
+        with conn:
+            conn.execute(
+                "INSERT INTO artists (artist_key, name, mix_count, track_count, scraped_at) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT(artist_key) DO UPDATE SET name = excluded.name, mix_count = excluded.mix_count, "
+                "track_count = excluded.track_count, scraped_at = excluded.scraped_at",
+                (key, artist_name, len(tracklists), track_count, now)
+            )
+            artist_id = conn.execute("SELECT id FROM artists WHERE artist_key = ?", (key,)).fetchone()["id"]
+
+            # Duplicate mixes within one scrape collapse onto the first position
+            mix_rows = {}
+            for position, mix in enumerate(tracklists):
+                extra = {k: v for k, v in mix.items() if k not in MIX_COLUMNS}
+                mix_rows.setdefault(mix_key(mix), (
+                    artist_id, mix_key(mix), position, mix.get("title", "Untitled Mix"), mix.get("date"),
+                    mix.get("url"), int(bool(mix.get("has_tracklist", False))),
+                    json.dumps(extra, ensure_ascii=False) if extra else None, now
+                ))
+            for batch in _batches(list(mix_rows.values()), self.batch_size):
+                conn.executemany(
+                    "INSERT INTO mixes (artist_id, mix_key, position, title, date, url, has_tracklist, extra, seen_at) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?) "
+                    "ON CONFLICT(artist_id, mix_key) DO UPDATE SET position = excluded.position, title = excluded.title, "
+                    "date = excluded.date, url = excluded.url, has_tracklist = excluded.has_tracklist, "
+                    "extra = excluded.extra, seen_at = excluded.seen_at",
+                    batch
+                )
+            # Mixes not in this scrape are gone upstream (their tracks cascade)
+            conn.execute("DELETE FROM mixes WHERE artist_id = ? AND seen_at < ?", (artist_id, now))
+
+            mix_ids = {row["mix_key"]: row["id"] for row in conn.execute(
+                "SELECT id, mix_key FROM mixes WHERE artist_id = ?", (artist_id,)
+            )}
+            conn.execute("DELETE FROM tracks WHERE mix_id IN (SELECT id FROM mixes WHERE artist_id = ?)", (artist_id,))
+
+            track_rows = []
+            written = set()
+            for mix in tracklists:
+                key_for_mix = mix_key(mix)
+                if key_for_mix in written:
+                    continue
+                written.add(key_for_mix)
+                for position, track in enumerate(mix.get("tracks", [])):
+                    if isinstance(track, dict):
+                        track_rows.append((mix_ids[key_for_mix], position, track.get("track", ""), track.get("id")))
+                    else:
+                        track_rows.append((mix_ids[key_for_mix], position, str(track), None))
+            for batch in _batches(track_rows, self.batch_size):
+                conn.executemany("INSERT INTO tracks (mix_id, position, track, track_id) VALUES (?, ?, ?, ?)", batch)
+
+        logger.info(f"Stored {len(mix_rows)} mixes and {len(track_rows)} tracks for {artist_name} in {time.time() - start:.2f}s")
+        return len(track_rows)
+
+    def load_artist(self, artist_name, max_age=None):
+        """Return (tracklists, scraped_at) for an artist, or None if unknown or older than max_age seconds.
+
+        Tracklists come back in the shape main.main produces, in scrape order.
+        """
+        conn = self._connect()
+        artist = conn.execute(
+            "SELECT id, scraped_at FROM artists WHERE artist_key = ?", (artist_key(artist_name),)
+        ).fetchone()
+        if artist is None:
+            return None
+        if max_age is not None and time.time() - artist["scraped_at"] > max_age:
+            return None
+
+        mixes = []
+        mixes_by_id = {}
+        for row in conn.execute(
+            "SELECT id, title, date, url, has_tracklist, extra FROM mixes WHERE artist_id = ? ORDER BY position",
+            (artist["id"],)
+        ):
+            mix = {"title": row["title"]}
+            if row["date"] is not None:
+                mix["date"] = row["date"]
+            mix["url"] = row["url"] or ""
+            mix["tracks"] = []
+            mix["has_tracklist"] = bool(row["has_tracklist"])
+            if row["extra"]:
+                mix.update(json.loads(row["extra"]))
+            mixes.append(mix)
+            mixes_by_id[row["id"]] = mix
+
+        for row in conn.execute(
+            "SELECT t.mix_id, t.track, t.track_id FROM tracks t JOIN mixes m ON m.id = t.mix_id "
+            "WHERE m.artist_id = ? ORDER BY t.mix_id, t.position",
+            (artist["id"],)
+        ):
+            track = {"track": row["track"], "id": row["track_id"]} if row["track_id"] is not None else row["track"]
+            mixes_by_id[row["mix_id"]]["tracks"].append(track)
+
+        return mixes, artist["scraped_at"]
+
+    def delete_artist(self, artist_name):
+        """Remove an artist and their mixes and tracks. Returns True if the artist existed."""
+        conn = self._connect()
+        with conn:
+            cursor = conn.execute("DELETE FROM artists WHERE artist_key = ?", (artist_key(artist_name),))
+        return cursor.rowcount > 0
+
+    def stats(self):
+        """Return row counts for artists, mixes and tracks."""
+        conn = self._connect()
+        return {
+            table: conn.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+            for table in ("artists", "mixes", "tracks")
+        }
@@ -0,0 +1,131 @@
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+
+import redis
+
+from prometheus_metrics import count_cache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class TwoLevelCache:
+    """In-process LRU+TTL cache in front of a shared Redis tier.
+
+    The local tier is bounded to max_entries and evicts the least recently
+    used entry. The Redis tier is shared by every gunicorn worker, so a
+    lookup resolved by one worker is reused by the others. Values must be
+    JSON serializable. If Redis is unavailable the cache degrades to the
+    local tier only.
+    """
+
+    def __init__(self, redis_client=None, namespace="cache", max_entries=1000, ttl=86400):
+        self.redis_client = redis_client
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()  # key -> (expires_at, value)
+        self._lock = threading.Lock()
+        self._stats = {
+            "local_hits": 0,
+            "redis_hits": 0,
+            "misses": 0,
+            "sets": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "redis_errors": 0,
+        }
+
+    def _redis_key(self, key):
+        return f"{self.namespace}:{key}"
+
+    def _count(self, stat):
+        with self._lock:
+            self._stats[stat] += 1
+        count_cache(self.namespace, stat)
+
+    def _store_local(self, key, value, expires_at):
+        with self._lock:
+            self._entries[key] = (expires_at, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+                count_cache(self.namespace, "evictions")
+
+    def get(self, key):
+        """Return the cached value for key, or None on a miss or expiry."""
+        now = time.time()
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                expires_at, value = entry
+                if expires_at > now:
+                    self._entries.move_to_end(key)
+                    self._stats["local_hits"] += 1
+                    count_cache(self.namespace, "local_hits")
+                    return value
+                del self._entries[key]
+                self._stats["expirations"] += 1
+                count_cache(self.namespace, "expirations")
+
+        if self.redis_client:
+            try:
+                cached = self.redis_client.get(self._redis_key(key))
+                if cached:
+                    payload = json.loads(cached.decode('utf-8'))
+                    if payload["expires_at"] > now:
+                        # Promote into the local tier with the remaining lifetime
+                        self._store_local(key, payload["value"], payload["expires_at"])
+                        self._count("redis_hits")
+                        return payload["value"]
+            except (redis.exceptions.RedisError, ValueError, KeyError) as e:
+                logger.error(f"Redis error reading {self.namespace} cache: {e}")
+                self._count("redis_errors")
+
+        self._count("misses")
+        return None
+
+    def set(self, key, value, ttl=None):
+        """Store value in both tiers. ttl overrides the default lifetime in seconds."""
+        ttl = self.ttl if ttl is None else ttl
+        if ttl <= 0:
+            return
+        expires_at = time.time() + ttl
+        self._store_local(key, value, expires_at)
+        self._count("sets")
+
+        if self.redis_client:
+            try:
+                payload = json.dumps({"value": value, "expires_at": expires_at}).encode('utf-8')
+                self.redis_client.setex(self._redis_key(key), int(ttl) or 1, payload)
+            except (redis.exceptions.RedisError, TypeError) as e:
+                logger.error(f"Redis error writing {self.namespace} cache: {e}")
+                self._count("redis_errors")
+
+    def delete(self, key):
+        """Remove key from both tiers."""
+        with self._lock:
+            self._entries.pop(key, None)
+        if self.redis_client:
+            try:
+                self.redis_client.delete(self._redis_key(key))
+            except redis.exceptions.RedisError as e:
+                logger.error(f"Redis error deleting from {self.namespace} cache: {e}")
+                self._count("redis_errors")
+
+    def stats(self):
+        """Return a snapshot of the hit/miss/eviction counters."""
+        with self._lock:
+            stats = dict(self._stats)
+            stats["local_entries"] = len(self._entries)
+        stats["max_entries"] = self.max_entries
+        stats["redis_enabled"] = self.redis_client is not None
+        lookups = stats["local_hits"] + stats["redis_hits"] + stats["misses"]
+        stats["hit_ratio"] = round((stats["local_hits"] + stats["redis_hits"]) / lookups, 4) if lookups else 0.0
+        return stats
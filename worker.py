@@ -53,9 +53,11 @@ for attempt in range(max_retries):
 
 # Create queue with a longer default timeout for all jobs
 queue = Queue(connection=redis_conn, default_timeout=3600)  # 60 minutes max (increased from 30)
+# Low-priority queue for background work like video prefetching
+low_queue = Queue(os.getenv("LOW_PRIORITY_QUEUE", "low"), connection=redis_conn, default_timeout=900)
 
-# Create a worker
-worker = SimpleWorker([queue], connection=redis_conn)
+# Create a worker - queues are checked in order, so low-priority jobs only run when the default queue is empty
+worker = SimpleWorker([queue, low_queue], connection=redis_conn)
 logger.info("Worker starting with 1 hour job timeout...")
 worker.work()
 
@@ -0,0 +1,315 @@
+import json
+import logging
+import re
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Assignments that carry the embedded results JSON on a YouTube results page
+INITIAL_DATA_MARKERS = ('var ytInitialData = ', 'window["ytInitialData"] = ', 'ytInitialData = ')
+_json_decoder = json.JSONDecoder()
+
+VIDEO_ID_RE = re.compile(r'watch\?v=([a-zA-Z0-9_-]{11})')
+
+# Indicator lists used by the scorer
+DISCOGS_GOOD_INDICATORS = ['official', 'full track', 'release', 'records', 'vinyl', 'album', 'single', 'EP', '12 inch', 'original mix']
+DISCOGS_BAD_INDICATORS = ['mix compilation', 'megamix', 'mixtape', 'playlist', 'dj mix', 'full album', 'preview', 'live set', 'radio show']
+DJSET_GOOD_INDICATORS = ['official', 'full track', 'release', 'records', 'vinyl', 'album']
+DJSET_BAD_INDICATORS = ['mix compilation', 'megamix', 'mixtape', 'playlist', 'dj mix', 'full album', 'preview']
+ELECTRONIC_INDICATORS = ['techno', 'house', 'minimal', 'electronic', 'underground', 'vinyl', '12"']
+DURATION_INDICATORS = ['full track', 'complete', 'uncut', 'original length']
+PREVIEW_INDICATORS = ['preview', 'snippet', 'clip', '30 second', 'sample']
+OFFICIAL_CHANNEL_INDICATORS = ['official', 'records', 'music', 'label']
+
+# Results longer than this are almost always full DJ sets rather than single tracks
+MAX_TRACK_DURATION = 20 * 60
+
+
+def extract_initial_data(html):
+    """Decode the ytInitialData JSON embedded in a results page, or return None."""
+    for marker in INITIAL_DATA_MARKERS:
+        start = html.find(marker)
+        if start == -1:
+            continue
+        try:
+            data, _ = _json_decoder.raw_decode(html, start + len(marker))
+            return data
+        except ValueError as e:
+            logger.warning(f"Could not decode embedded ytInitialData after '{marker.strip()}': {e}")
+    return None
+
+
+def iter_video_renderers(data):
+    """Yield every videoRenderer object in document order.
+
+    Walks the structure iteratively rather than hard-coding the section
+    path, so layout shuffles on YouTube's side do not break extraction.
+    Playlists, radio mixes, shorts and channels use other renderer types
+    and are skipped naturally.
+    """
+    stack = [data]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, dict):
+            renderer = node.get('videoRenderer')
+            if isinstance(renderer, dict):
+                yield renderer
+                continue
+            stack.extend(reversed(list(node.values())))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+
+
+def _text(node):
+    """Flatten a YouTube text object ({simpleText} or {runs: [...]}) to a string."""
+    if not isinstance(node, dict):
+        return ''
+    if 'simpleText' in node:
+        return node['simpleText']
+    return ''.join(run.get('text', '') for run in node.get('runs', []))
+
+
+def parse_duration(text):
+    """Convert '1:02:03' or '4:15' into seconds, or None if missing."""
+    if not text:
+        return None
+    try:
+        seconds = 0
+        for part in text.split(':'):
+            seconds = seconds * 60 + int(part)
+        return seconds
+    except ValueError:
+        return None
+
+
+def _badge_labels(badges):
+    labels = []
+    for badge in badges or []:
+        renderer = badge.get('metadataBadgeRenderer', {})
+        label = renderer.get('label') or renderer.get('tooltip')
+        if label:
+            labels.append(label)
+    return labels
+
+
+def parse_video_renderer(renderer):
+    """Turn a videoRenderer object into a flat candidate dict."""
+    description = ''
+    snippets = renderer.get('detailedMetadataSnippets')
+    if snippets:
+        description = _text(snippets[0].get('snippetText'))
+    elif 'descriptionSnippet' in renderer:
+        description = _text(renderer['descriptionSnippet'])
+
+    duration = _text(renderer.get('lengthText'))
+    candidate = {
+        "id": renderer.get('videoId', ''),
+        "title": _text(renderer.get('title')),
+        "channel": _text(renderer.get('ownerText') or renderer.get('longBylineText')),
+        "duration": duration,
+        "duration_seconds": parse_duration(duration),
+        "badges": _badge_labels(renderer.get('badges')) + _badge_labels(renderer.get('ownerBadges')),
+        "description": description,
+    }
+    # Lowercased haystack the scorer matches against, built once per candidate
+    candidate["text"] = ' '.join([
+        candidate["title"], candidate["channel"], candidate["description"], ' '.join(candidate["badges"])
+    ]).lower()
+    return candidate
+
+
+def legacy_extract_candidates(text):
+    """Fallback for pages without embedded JSON: the original string scan.
+
+    Finds IDs with the old pattern/regex approach, drops IDs followed by a
+    playlist link and uses a ±400 character window as the match text.
+    """
+    video_ids = []
+    patterns = [
+        '"videoId":"',
+        'watch?v=',
+        '/embed/',
+        '/v/'
+    ]
+
+    for pattern in patterns:
+        start_idx = text.find(pattern)
+        if start_idx != -1:
+            start_idx += len(pattern)
+
+            # Determine end of video ID based on which pattern was found
+            if pattern == '"videoId":"':
+                end_idx = text.find('"', start_idx)
+            else:
+                # For URL patterns, look for ending delimiters
+                end_idx = next((text.find(c, start_idx) for c in ['"', '&', '#', '?', ' ']
+                              if text.find(c, start_idx) != -1), len(text))
+
+            if end_idx != -1:
+                found_id = text[start_idx:end_idx]
+                # Basic validation - YouTube IDs are usually 11 characters
+                if len(found_id) == 11:
+                    video_ids.append(found_id)
+
+    # If no IDs found with patterns, try regex as a fallback
+    if not video_ids:
+        video_ids = VIDEO_ID_RE.findall(text)
+
+    unique_ids = list(dict.fromkeys(video_ids))
+    # Filter out YouTube Mix/Playlist results to avoid long DJ mixes
+    filtered_ids = [vid for vid in unique_ids if "list=" not in text.split(vid)[1].split("<")[0]] or unique_ids
+
+    candidates = []
+    for vid in filtered_ids:
+        vid_pos = text.find(vid)
+        candidates.append({
+            "id": vid,
+            "title": '',
+            "channel": '',
+            "duration": '',
+            "duration_seconds": None,
+            "badges": [],
+            "description": '',
+            "text": text[max(0, vid_pos - 400):vid_pos + 400].lower(),
+        })
+    return candidates
+
+
+def parse_results_page(html):
+    """Extract structured video candidates from a YouTube results page.
+
+    Decodes the embedded ytInitialData once and reads the video renderers
+    from it. Falls back to the legacy string scan when the page has no
+    parsable JSON. Candidates are unique by ID and in result order.
+    """
+    data = extract_initial_data(html)
+    if data is None:
+        return legacy_extract_candidates(html)
+
+    candidates = []
+    seen = set()
+    for renderer in iter_video_renderers(data):
+        candidate = parse_video_renderer(renderer)
+        if len(candidate["id"]) == 11 and candidate["id"] not in seen:
+            seen.add(candidate["id"])
+            candidates.append(candidate)
+
+    if not candidates:
+        return legacy_extract_candidates(html)
+    return candidates
+
+
+def score_candidate(candidate, vid_index, artist, title, catalog_num=None, label_info=None, release_year=None, source="djset"):
+    """Score how well a candidate matches the requested track. Higher is better."""
+    text = candidate["text"]
+    score = 0
+
+    # Check for exact artist match
+    if artist.lower() in text:
+        score += 20
+        # Bonus for exact match with word boundaries
+        if re.search(r'\b' + re.escape(artist.lower()) + r'\b', text):
+            score += 10
+
+    # Check for exact title match
+    if title.lower() in text:
+        score += 20
+        # Bonus for exact match with word boundaries
+        if re.search(r'\b' + re.escape(title.lower()) + r'\b', text):
+            score += 10
+
+    # Catalog numbers are highly specific identifiers
+    if catalog_num and catalog_num.lower() in text:
+        score += 25
+
+    # Check for label information
+    if label_info and label_info.lower() in text:
+        score += 15
+
+    # Check for release year
+    if release_year and release_year in text:
+        score += 10
+
+    if source == "discogs":
+        # For Discogs sources, give more weight to catalog number and label matches
+        if catalog_num and catalog_num.lower() in text:
+            score += 15
+
+        for indicator in DISCOGS_GOOD_INDICATORS:
+            if indicator in text:
+                score += 5
+        for indicator in DISCOGS_BAD_INDICATORS:
+            if indicator in text:
+                score -= 15
+
+        # Boost for matching electronic music context
+        for indicator in ELECTRONIC_INDICATORS:
+            if indicator in text and (label_info and indicator in label_info.lower()):
+                score += 8
+
+        # Strong boost for an exact catalog number match
+        if catalog_num and re.search(r'\b' + re.escape(catalog_num) + r'\b', text, re.IGNORECASE):
+            score += 20
+
+        # Full tracks vs previews/clips
+        for indicator in DURATION_INDICATORS:
+            if indicator in text:
+                score += 8
+        for indicator in PREVIEW_INDICATORS:
+            if indicator in text:
+                score -= 12
+
+        # Boost for official channel uploads
+        for indicator in OFFICIAL_CHANNEL_INDICATORS:
+            if indicator in text:
+                score += 6
+    else:
+        for indicator in DJSET_GOOD_INDICATORS:
+            if indicator in text:
+                score += 5
+        for indicator in DJSET_BAD_INDICATORS:
+            if indicator in text:
+                score -= 15
+
+    # Higher score for results that are closer to the top
+    score += max(0, 10 - vid_index)
+
+    # Penalize videos with common issues
+    if "playlist" in text or "mix compilation" in text:
+        score -= 10
+
+    # Structured duration lets us spot full DJ sets that share the track name
+    if candidate.get("duration_seconds") and candidate["duration_seconds"] > MAX_TRACK_DURATION:
+        score -= 15
+
+    return score
+
+
+def pick_best_candidate(candidates, artist, title, catalog_num=None, label_info=None, release_year=None, source="djset"):
+    """Return the ID of the best-scoring candidate among the top 15 results.
+
+    The best match must reach a minimum score (higher for Discogs, which
+    needs more precision); otherwise the first result is used.
+    """
+    best_match_id = None
+    match_score = 0
+    for vid_index, candidate in enumerate(candidates[:15]):
+        score = score_candidate(
+            candidate, vid_index, artist, title,
+            catalog_num=catalog_num,
+            label_info=label_info,
+            release_year=release_year,
+            source=source
+        )
+        if score > match_score:
+            match_score = score
+            best_match_id = candidate["id"]
+            logger.info(f"Found better match: video ID {best_match_id} with score {score}")
+
+    min_score = 40 if source == "discogs" else 30
+    if best_match_id and match_score >= min_score:
+        logger.info(f"Using best match: video ID {best_match_id} with score {match_score}")
+        return best_match_id
+    logger.info(f"No good exact match found, using first result: {candidates[0]['id']}")
+    return candidates[0]["id"]